@@ -0,0 +1 @@
+# Benchmarks for Key Mapper application
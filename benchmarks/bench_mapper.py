@@ -0,0 +1,285 @@
+"""
+Benchmark suite for the Key Mapper mapping engine
+
+Replays synthetic or recorded key-event streams through KeyMapper on the fake
+``keyboard`` backend and measures registration time, dispatch throughput,
+per-event latency and memory for each mapping-set size and dispatch mode.
+
+Usage:
+    python benchmarks/bench_mapper.py --sizes 10 100 1000 10000 --output results.json
+    python benchmarks/bench_mapper.py --replay events.jsonl --rate 500
+    python benchmarks/bench_mapper.py --compare baseline.json --output results.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import platform
+import argparse
+import tempfile
+import tracemalloc
+from typing import Dict, List, Optional
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks import fake_keyboard
+
+fake_keyboard.install()
+
+from dispatcher import KeyEvent, KEY_DOWN, KEY_UP, MODIFIER_BITS  # noqa: E402
+from executor import LaunchExecutor  # noqa: E402
+from key_mapper import KeyMapper, DISPATCH_HOTKEY, DISPATCH_HOOK  # noqa: E402
+from mapping_list import MappingListModel  # noqa: E402
+from search import MappingSearchIndex  # noqa: E402
+from metrics import percentiles  # noqa: E402
+
+RESULTS_VERSION = 1
+
+TRIGGER_KEYS = ([chr(c) for c in range(ord('a'), ord('z') + 1)]
+                + [str(d) for d in range(10)]
+                + [f"f{n}" for n in range(1, 25)])
+MODIFIER_SETS = [[name for name in MODIFIER_BITS if mask & MODIFIER_BITS[name]]
+                 for mask in range(1, 1 << len(MODIFIER_BITS))]
+
+
+def generate_combos(count: int) -> List[str]:
+    """Return count distinct key combinations
+
+    Real trigger keys run out after a few hundred combinations, so larger
+    sets continue with synthetic key names; the engine treats them alike.
+    """
+    combos = []
+    index = 0
+    while len(combos) < count:
+        key_index, mods_index = divmod(index, len(MODIFIER_SETS))
+        key = TRIGGER_KEYS[key_index] if key_index < len(TRIGGER_KEYS) else f"vk{key_index}"
+        combos.append('+'.join(MODIFIER_SETS[mods_index] + [key]))
+        index += 1
+    return combos
+
+
+def synthetic_events(combos: List[str], count: int, miss_ratio: float,
+                     rng: random.Random) -> List[KeyEvent]:
+    """Build a stream of key taps, mostly on mapped combinations"""
+    events = []
+    while len(events) < count:
+        if rng.random() < miss_ratio:
+            keys = ['ctrl', 'alt', 'shift', 'win', 'unmapped']
+        else:
+            keys = rng.choice(combos).split('+')
+        events.extend(KeyEvent(KEY_DOWN, key) for key in keys)
+        events.extend(KeyEvent(KEY_UP, key) for key in reversed(keys))
+    return events[:count]
+
+
+def load_events(path: str) -> List[KeyEvent]:
+    """Load a recorded stream: one {"event_type": ..., "name": ...} object per line"""
+    events = []
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                events.append(KeyEvent(record['event_type'], record['name']))
+    return events
+
+
+def replay(events: List[KeyEvent], rate: float) -> List[float]:
+    """Feed events into the fake backend and return per-event latencies in seconds"""
+    latencies = []
+    interval = 1.0 / rate if rate > 0 else 0.0
+    next_time = time.perf_counter()
+    for event in events:
+        if interval:
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            next_time += interval
+        start = time.perf_counter()
+        fake_keyboard.feed(event)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def run_case(mode: str, size: int, events: Optional[List[KeyEvent]], event_count: int,
+             rate: float, miss_ratio: float, seed: int, work_dir: str) -> Dict:
+    """Benchmark one dispatch mode at one mapping-set size"""
+    fake_keyboard.unhook_all()
+    app_path = os.path.join(work_dir, 'bench_app.exe')
+    with open(app_path, 'w') as f:
+        f.write('bench')
+
+    combos = generate_combos(size)
+    launches = []
+    mapper = KeyMapper(config_file=os.path.join(work_dir, f'bench_{mode}_{size}.json'),
+                       dispatch_mode=mode,
+                       executor=LaunchExecutor(workers=0, debounce=0))
+    mapper.launch_application = launches.append
+
+    tracemalloc.start()
+    mapper.apply_mappings({combo: app_path for combo in combos})
+    mapper.start_mapping()
+    memory_current, memory_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Time registration again without tracemalloc slowing allocations down
+    mapper.stop_mapping()
+    start = time.perf_counter()
+    mapper.start_mapping()
+    start_time = time.perf_counter() - start
+
+    stream = events if events is not None else synthetic_events(
+        combos, event_count, miss_ratio, random.Random(seed))
+    wall_start = time.perf_counter()
+    latencies = replay(stream, rate)
+    wall_time = time.perf_counter() - wall_start
+
+    # What a GUI refresh pays after one edit: fetch the mappings and sync the
+    # list model and search index to them, as KeyMapperGUI.refresh_mappings does
+    other_path = os.path.join(work_dir, 'bench_other.exe')
+    with open(other_path, 'w') as f:
+        f.write('bench')
+    model = MappingListModel()
+    index = MappingSearchIndex()
+    model.sync(mapper.get_all_mappings())
+    index.sync(mapper.get_all_mappings())
+    refresh_time = 0.0
+    for i in range(100):
+        mapper.add_mapping(combos[0], other_path if i % 2 == 0 else app_path)
+        start = time.perf_counter()
+        mappings = mapper.get_all_mappings()
+        model.sync(mappings)
+        index.sync(mappings)
+        refresh_time += time.perf_counter() - start
+    refresh_time /= 100
+
+    start = time.perf_counter()
+    mapper.stop_mapping()
+    stop_time = time.perf_counter() - start
+    os.remove(app_path)
+    os.remove(other_path)
+
+    latency_us = {name: value * 1e6 for name, value in percentiles(latencies).items()}
+    latency_us['mean'] = sum(latencies) / len(latencies) * 1e6 if latencies else 0.0
+    return {
+        'mode': mode,
+        'mappings': size,
+        'events': len(stream),
+        'matched': len(launches),
+        'start_ms': start_time * 1000.0,
+        'stop_ms': stop_time * 1000.0,
+        'refresh_us': refresh_time * 1e6,
+        'throughput_eps': len(stream) / wall_time if wall_time else 0.0,
+        'latency_us': latency_us,
+        'memory_kib': memory_current / 1024.0,
+        'memory_peak_kib': memory_peak / 1024.0,
+    }
+
+
+def run_benchmarks(sizes: List[int], modes: List[str], event_count: int = 10000,
+                   rate: float = 0.0, miss_ratio: float = 0.1, seed: int = 1234,
+                   replay_path: Optional[str] = None) -> Dict:
+    """Run every (mode, size) case and return the results document"""
+    events = load_events(replay_path) if replay_path else None
+    results = []
+    root_logger = logging.getLogger()
+    level = root_logger.level
+    root_logger.setLevel(logging.WARNING)
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            for mode in modes:
+                for size in sizes:
+                    results.append(run_case(mode, size, events, event_count, rate,
+                                            miss_ratio, seed, work_dir))
+    finally:
+        root_logger.setLevel(level)
+    return {
+        'version': RESULTS_VERSION,
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'events': event_count if replay_path is None else None,
+            'replay': replay_path,
+            'rate': rate,
+            'miss_ratio': miss_ratio,
+            'seed': seed,
+        },
+        'results': results,
+    }
+
+
+def compare(baseline: Dict, current: Dict) -> List[str]:
+    """Describe per-case changes of the headline metrics against a baseline"""
+    previous = {(r['mode'], r['mappings']): r for r in baseline.get('results', [])}
+    lines = []
+    for result in current['results']:
+        old = previous.get((result['mode'], result['mappings']))
+        if old is None:
+            continue
+        changes = []
+        for label, new_value, old_value in (
+                ('p50', result['latency_us']['p50'], old['latency_us']['p50']),
+                ('p99', result['latency_us']['p99'], old['latency_us']['p99']),
+                ('eps', result['throughput_eps'], old['throughput_eps']),
+                ('start', result['start_ms'], old['start_ms'])):
+            ratio = new_value / old_value if old_value else 0.0
+            changes.append(f"{label} x{ratio:.2f}")
+        lines.append(f"{result['mode']:>6} {result['mappings']:>6}: " + ', '.join(changes))
+    return lines
+
+
+def format_results(document: Dict) -> List[str]:
+    """Format results as a human-readable table"""
+    lines = [f"{'mode':>6} {'maps':>6} {'start ms':>9} {'stop ms':>8} {'events/s':>10} "
+             f"{'p50 us':>8} {'p99 us':>8} {'KiB':>9} {'refresh us':>10}"]
+    for r in document['results']:
+        lines.append(f"{r['mode']:>6} {r['mappings']:>6} {r['start_ms']:>9.2f} "
+                     f"{r['stop_ms']:>8.2f} {r['throughput_eps']:>10.0f} "
+                     f"{r['latency_us']['p50']:>8.2f} {r['latency_us']['p99']:>8.2f} "
+                     f"{r['memory_kib']:>9.1f} {r.get('refresh_us', 0.0):>10.2f}")
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark the Key Mapper mapping engine")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000],
+                        help="mapping-set sizes to benchmark")
+    parser.add_argument('--modes', nargs='+', default=[DISPATCH_HOTKEY, DISPATCH_HOOK],
+                        choices=[DISPATCH_HOTKEY, DISPATCH_HOOK], help="dispatch modes")
+    parser.add_argument('--events', type=int, default=10000,
+                        help="synthetic events per case")
+    parser.add_argument('--rate', type=float, default=0.0,
+                        help="events per second to replay at (0 = as fast as possible)")
+    parser.add_argument('--miss-ratio', type=float, default=0.1,
+                        help="fraction of synthetic taps that match no mapping")
+    parser.add_argument('--seed', type=int, default=1234, help="random seed")
+    parser.add_argument('--replay', help="JSON Lines file of recorded events to replay")
+    parser.add_argument('--output', help="write machine-readable results to this file")
+    parser.add_argument('--compare', help="results file to compare against")
+    args = parser.parse_args(argv)
+
+    document = run_benchmarks(args.sizes, args.modes, args.events, args.rate,
+                              args.miss_ratio, args.seed, args.replay)
+    print('\n'.join(format_results(document)))
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            print('\nCompared to ' + args.compare + ':')
+            print('\n'.join(compare(json.load(f), document)))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(document, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
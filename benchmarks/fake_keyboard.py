@@ -0,0 +1,122 @@
+"""
+Fake ``keyboard`` backend for benchmarks
+
+Implements the parts of the ``keyboard`` API used by Key Mapper on top of an
+in-process event feed, so the mapping engine can be exercised without a real
+keyboard hook or administrator privileges. Install it with ``install()``
+before importing ``key_mapper``.
+"""
+
+import sys
+from typing import Callable, Dict, FrozenSet, List, Set
+
+KEY_DOWN = 'down'
+KEY_UP = 'up'
+
+# Modules that bind ``keyboard`` at import time
+PATCHED_MODULES = ('dispatcher', 'key_mapper')
+
+_hooks: List[Callable] = []
+_bindings: Dict[FrozenSet[str], List[Callable]] = {}
+# Remove handles by hotkey, callback and handle, kept like keyboard 0.13.5 does:
+# a second add_hotkey of one hotkey overwrites the first one's entry
+_hotkeys: Dict[object, Callable] = {}
+_pressed: Set[str] = set()
+_saved: Dict[str, object] = {}
+_normalize: Callable[[str], str] = str.lower
+
+
+def _combo_keys(hotkey: str) -> FrozenSet[str]:
+    return frozenset(_normalize(part) for part in hotkey.split('+') if part.strip())
+
+
+def add_hotkey(hotkey: str, callback: Callable, args=(), suppress=False, timeout=1,
+               trigger_on_release=False):
+    """Register a hotkey and return its remove handle, like keyboard.add_hotkey"""
+    keys = _combo_keys(hotkey)
+    if args:
+        callback = lambda callback=callback: callback(*args)
+    _bindings.setdefault(keys, []).append(callback)
+
+    def remove_():
+        callbacks = _bindings.get(keys, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+        if not callbacks:
+            _bindings.pop(keys, None)
+        del _hotkeys[hotkey]
+        del _hotkeys[remove_]
+        del _hotkeys[callback]
+    _hotkeys[hotkey] = _hotkeys[remove_] = _hotkeys[callback] = remove_
+    return remove_
+
+
+def remove_hotkey(hotkey_or_callback):
+    """Remove a hotkey by the value add_hotkey returned, its hotkey or its callback"""
+    _hotkeys[hotkey_or_callback]()
+
+
+def hook(callback: Callable) -> Callable:
+    """Install a low-level hook receiving every event"""
+    _hooks.append(callback)
+    return callback
+
+
+def unhook(remove: Callable):
+    """Remove a hook installed with hook()"""
+    if remove in _hooks:
+        _hooks.remove(remove)
+
+
+def unhook_all():
+    """Remove every hook and hotkey and forget pressed keys"""
+    _hooks.clear()
+    _bindings.clear()
+    _hotkeys.clear()
+    _pressed.clear()
+
+
+def feed(event):
+    """Deliver one event to hooks and matching hotkeys"""
+    for callback in list(_hooks):
+        callback(event)
+
+    name = _normalize(event.name)
+    if event.event_type == KEY_UP:
+        _pressed.discard(name)
+        return
+    _pressed.add(name)
+    for callback in list(_bindings.get(frozenset(_pressed), ())):
+        callback()
+
+
+def install():
+    """Make ``import keyboard`` resolve to this module, including in loaded modules"""
+    global _normalize
+    fake = sys.modules[__name__]
+    if 'keyboard' not in _saved:
+        _saved['keyboard'] = sys.modules.get('keyboard')
+    sys.modules['keyboard'] = fake
+    for name in PATCHED_MODULES:
+        module = sys.modules.get(name)
+        if module is not None and getattr(module, 'keyboard', None) is not fake:
+            _saved[name] = module.keyboard
+            module.keyboard = fake
+
+    # Share the dispatcher's key names so both modes see the same keys
+    from dispatcher import normalize_key
+    _normalize = normalize_key
+
+
+def uninstall():
+    """Restore the modules replaced by install()"""
+    unhook_all()
+    for name, original in _saved.items():
+        if name == 'keyboard':
+            if original is None:
+                sys.modules.pop('keyboard', None)
+            else:
+                sys.modules['keyboard'] = original
+        elif name in sys.modules:
+            sys.modules[name].keyboard = original
+    _saved.clear()
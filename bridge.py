@@ -0,0 +1,86 @@
+"""
+Engine bridge - run blocking KeyMapper work off the GUI thread
+"""
+
+import logging
+import queue
+import threading
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# callback(result, error) - exactly one of the two is meaningful
+Callback = Callable[[Any, Optional[BaseException]], None]
+
+
+class EngineBridge:
+    """Runs commands on one worker thread and hands results back to the caller
+
+    Commands execute in submission order. Results are put on a thread-safe
+    queue and their callbacks only run when the owning thread calls
+    ``poll()`` (the GUI does this from ``root.after``), so callbacks may
+    touch widgets.
+    """
+
+    def __init__(self):
+        self.commands: queue.Queue = queue.Queue()
+        self.results: queue.Queue = queue.Queue()
+        self.pending = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, func: Callable, *args, callback: Optional[Callback] = None):
+        """Queue func(*args) to run on the worker thread"""
+        with self._lock:
+            self.pending += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="engine-bridge",
+                                                daemon=True)
+                self._thread.start()
+        self.commands.put((func, args, callback))
+
+    @property
+    def busy(self) -> bool:
+        """True while a submitted command has not been polled yet"""
+        return self.pending > 0
+
+    def poll(self, limit: int = 50) -> int:
+        """Run callbacks for up to limit finished commands; return how many ran"""
+        handled = 0
+        while handled < limit:
+            try:
+                callback, result, error = self.results.get_nowait()
+            except queue.Empty:
+                break
+            handled += 1
+            with self._lock:
+                self.pending -= 1
+            if callback is None:
+                if error is not None:
+                    logger.error(f"Background command failed: {error}")
+                continue
+            try:
+                callback(result, error)
+            except Exception as e:
+                logger.error(f"Error in command callback: {e}")
+        return handled
+
+    def close(self, timeout: Optional[float] = None):
+        """Let queued commands finish and stop the worker thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self.commands.put(None)
+            thread.join(timeout)
+
+    def _run(self):
+        while True:
+            item = self.commands.get()
+            if item is None:
+                return
+            func, args, callback = item
+            try:
+                result, error = func(*args), None
+            except Exception as e:
+                result, error = None, e
+            self.results.put((callback, result, error))
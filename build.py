@@ -1,14 +1,39 @@
 """
 Build script for Key Mapper application
 Creates a Windows executable using PyInstaller
+
+Usage:
+    python build.py                      # single-file executable
+    python build.py --profile onedir     # folder build, nothing to unpack at startup
+    python build.py --report             # also report import and startup timings
 """
 
 import os
 import sys
+import json
+import time
+import argparse
 import subprocess
 import shutil
 from pathlib import Path
 
+# Build profiles
+PROFILE_ONEFILE = 'onefile'  # one executable, unpacked to a temp folder on every start
+PROFILE_ONEDIR = 'onedir'  # executable plus its files in a folder, starts faster
+
+# Modules imported through lazy.LazyModule, which PyInstaller cannot see
+HIDDEN_IMPORTS = ['keyboard', 'json', 'subprocess', 'hashlib', 'ctypes', 'csv',
+                  'concurrent.futures', 'sqlite3']
+
+REPORT_FILE = 'startup_report.json'
+
+
+def executable_path(profile):
+    """Return where PyInstaller puts the executable for a profile"""
+    if profile == PROFILE_ONEDIR:
+        return os.path.join('dist', 'KeyMapper', 'KeyMapper.exe')
+    return os.path.join('dist', 'KeyMapper.exe')
+
 
 def clean_build_dirs():
     """Clean previous build directories"""
@@ -25,20 +50,21 @@ def clean_build_dirs():
         print(f"Removed {spec_file}")
 
 
-def build_executable():
+def build_executable(profile=PROFILE_ONEFILE):
     """Build the executable using PyInstaller"""
-    print("Building Key Mapper executable...")
+    print(f"Building Key Mapper executable ({profile})...")
     
     # PyInstaller command
     cmd = [
         'pyinstaller',
         '--name=KeyMapper',
-        '--onefile',
+        f'--{profile}',
         '--windowed',
         '--icon=NONE',
         '--add-data=key_mappings.json;.' if os.path.exists('key_mappings.json') else '',
-        'gui.py'
     ]
+    cmd += [f'--hidden-import={module}' for module in HIDDEN_IMPORTS]
+    cmd.append('gui.py')
     
     # Remove empty strings from command
     cmd = [arg for arg in cmd if arg]
@@ -47,7 +73,7 @@ def build_executable():
         result = subprocess.run(cmd, check=True, capture_output=True, text=True)
         print(result.stdout)
         print("\n[SUCCESS] Build successful!")
-        print(f"Executable created: dist/KeyMapper.exe")
+        print(f"Executable created: {executable_path(profile)}")
         return True
     except subprocess.CalledProcessError as e:
         print(f"\n[FAILED] Build failed!")
@@ -55,9 +81,9 @@ def build_executable():
         return False
 
 
-def create_distribution():
+def create_distribution(profile=PROFILE_ONEFILE):
     """Create distribution package"""
-    if not os.path.exists('dist/KeyMapper.exe'):
+    if not os.path.exists(executable_path(profile)):
         print("Error: Executable not found")
         return False
         
@@ -65,8 +91,11 @@ def create_distribution():
     dist_dir = Path('distribution')
     dist_dir.mkdir(exist_ok=True)
     
-    # Copy executable
-    shutil.copy('dist/KeyMapper.exe', dist_dir / 'KeyMapper.exe')
+    # Copy executable (and its folder for onedir builds)
+    if profile == PROFILE_ONEDIR:
+        shutil.copytree(os.path.join('dist', 'KeyMapper'), dist_dir, dirs_exist_ok=True)
+    else:
+        shutil.copy(executable_path(profile), dist_dir / 'KeyMapper.exe')
     
     # Copy README if exists
     if os.path.exists('README.md'):
@@ -88,8 +117,73 @@ def create_distribution():
     return True
 
 
+def import_report(limit=15):
+    """Time every import made by the GUI module, from source, with -X importtime"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import gui'],
+                            capture_output=True, text=True)
+    imports = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        imports.append({'module': name.strip(), 'self_ms': int(self_us) / 1000,
+                        'cumulative_ms': int(cumulative_us) / 1000})
+    imports.sort(key=lambda entry: entry['cumulative_ms'], reverse=True)
+    
+    print(f"\nSlowest imports ({len(imports)} modules imported):")
+    for entry in imports[:limit]:
+        print(f"  {entry['cumulative_ms']:8.1f} ms  {entry['module']}")
+    return imports
+
+
+def startup_report(profile=PROFILE_ONEFILE, timeout=60):
+    """Start the built executable once and collect its startup milestones"""
+    report_file = os.path.abspath(os.path.join('dist', 'startup_milestones.json'))
+    env = dict(os.environ, KEYMAPPER_STARTUP_REPORT=report_file)
+    started = time.perf_counter()
+    try:
+        subprocess.run([executable_path(profile)], env=env, timeout=timeout, check=True)
+    except (OSError, subprocess.SubprocessError) as e:
+        print(f"\n[FAILED] Could not time the executable: {e}")
+        return None
+    wall_ms = (time.perf_counter() - started) * 1000
+    
+    with open(report_file, encoding='utf-8') as f:
+        report = json.load(f)
+    os.remove(report_file)
+    report['process_ms'] = wall_ms
+    
+    print(f"\nStartup of {executable_path(profile)}:")
+    for name, elapsed in report['milestones'].items():
+        print(f"  {elapsed:8.1f} ms  {name} (after interpreter start)")
+    print(f"  {wall_ms:8.1f} ms  process start to exit, including unpacking")
+    return report
+
+
+def write_report(profile):
+    """Write import and startup timings to dist/startup_report.json"""
+    report = {
+        'profile': profile,
+        'imports': import_report(),
+        'startup': startup_report(profile),
+    }
+    path = os.path.join('dist', REPORT_FILE)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nStartup report written to {path}")
+    return report['startup'] is not None
+
+
 def main():
     """Main build process"""
+    parser = argparse.ArgumentParser(description="Build the Key Mapper executable")
+    parser.add_argument('--profile', choices=[PROFILE_ONEFILE, PROFILE_ONEDIR],
+                        default=PROFILE_ONEFILE, help="PyInstaller build layout")
+    parser.add_argument('--report', action='store_true',
+                        help="report per-import and startup timings after building")
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("Key Mapper - Build Script")
     print("=" * 60)
@@ -98,11 +192,15 @@ def main():
     clean_build_dirs()
     
     # Build executable
-    if not build_executable():
+    if not build_executable(args.profile):
         sys.exit(1)
     
     # Create distribution package
-    if not create_distribution():
+    if not create_distribution(args.profile):
+        sys.exit(1)
+    
+    # Time imports and startup of the build
+    if args.report and not write_report(args.profile):
         sys.exit(1)
     
     print("\n" + "=" * 60)
@@ -0,0 +1,164 @@
+"""
+Bulk import/export - stream mapping catalogs as JSON Lines or CSV
+"""
+
+import os
+import contextlib
+import logging
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+from lazy import LazyModule
+
+# Only needed once a catalog is imported or exported
+csv = LazyModule('csv')
+futures = LazyModule('concurrent.futures')
+json = LazyModule('json')
+
+logger = logging.getLogger(__name__)
+
+FORMAT_JSONL = 'jsonl'  # one {"key": ..., "path": ...} object per line
+FORMAT_CSV = 'csv'  # key,path columns, with an optional header row
+
+FORMATS = (FORMAT_JSONL, FORMAT_CSV)
+
+Record = Tuple[int, str, str]  # line number, key combination, application path
+
+Source = Union[str, Path, TextIO]
+
+
+def detect_format(source: Source, fmt: Optional[str] = None) -> str:
+    """Return fmt, or the format implied by the file name's extension"""
+    if fmt is None:
+        name = getattr(source, 'name', source)
+        suffix = Path(name).suffix.lower() if isinstance(name, (str, Path)) else ''
+        fmt = FORMAT_CSV if suffix == '.csv' else FORMAT_JSONL
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown mapping format: {fmt}")
+    return fmt
+
+
+def read_records(f: TextIO, fmt: str, errors: List[str]) -> Iterator[Record]:
+    """Yield (line, key, path) records one at a time
+
+    Malformed lines are described in errors and skipped.
+    """
+    if fmt == FORMAT_CSV:
+        for line, row in enumerate(csv.reader(f), 1):
+            if not row or (len(row) == 1 and not row[0].strip()):
+                continue
+            if line == 1 and [cell.strip().lower() for cell in row[:2]] == ['key', 'path']:
+                continue  # header
+            if len(row) != 2:
+                errors.append(f"line {line}: expected 2 columns, got {len(row)}")
+                continue
+            yield line, row[0].strip(), row[1].strip()
+        return
+
+    for line, text in enumerate(f, 1):
+        if not text.strip():
+            continue
+        try:
+            entry = json.loads(text)
+        except ValueError as e:
+            errors.append(f"line {line}: {e}")
+            continue
+        if (not isinstance(entry, dict) or not isinstance(entry.get('key'), str) or
+                not isinstance(entry.get('path'), str)):
+            errors.append(f"line {line}: expected an object with string key and path")
+            continue
+        yield line, entry['key'].strip(), entry['path'].strip()
+
+
+def write_records(f: TextIO, mappings: Iterable[Tuple[str, str]], fmt: str) -> int:
+    """Write (key, path) pairs and return how many were written"""
+    count = 0
+    if fmt == FORMAT_CSV:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(('key', 'path'))
+        for key_combo, app_path in mappings:
+            writer.writerow((key_combo, app_path))
+            count += 1
+        return count
+    for key_combo, app_path in mappings:
+        f.write(json.dumps({'key': key_combo, 'path': app_path}) + '\n')
+        count += 1
+    return count
+
+
+def check_paths(paths: Iterable[str], workers: int = 8, batch_size: int = 256,
+                probe: Callable[[str], bool] = os.path.exists) -> Dict[str, bool]:
+    """Check which application paths exist, probing in parallel batches
+
+    Each distinct path is probed once. Stats on network drives block for
+    milliseconds each, so the batches are spread over a thread pool.
+    """
+    unique = list(dict.fromkeys(paths))
+    if workers <= 1 or len(unique) <= batch_size:
+        return {path: probe(path) for path in unique}
+
+    def check(batch: List[str]) -> List[bool]:
+        return [probe(path) for path in batch]
+
+    batches = [unique[i:i + batch_size] for i in range(0, len(unique), batch_size)]
+    exists: Dict[str, bool] = {}
+    with futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix='path-check') as pool:
+        for batch, results in zip(batches, pool.map(check, batches)):
+            exists.update(zip(batch, results))
+    return exists
+
+
+class ImportReport:
+    """What an import did, or would do when it is a dry run"""
+
+    def __init__(self, dry_run: bool = False):
+        self.dry_run = dry_run
+        self.added: Dict[str, str] = {}
+        self.replaced: Dict[str, Tuple[str, str]] = {}  # key -> (current path, new path)
+        self.unchanged: List[str] = []
+        self.invalid_paths: Dict[str, str] = {}  # key -> missing path
+        self.invalid_combos: Dict[str, str] = {}  # key -> reason
+        self.duplicates: List[str] = []  # keys that appear more than once; the last one wins
+        self.errors: List[str] = []  # malformed lines
+        self.committed = False
+
+    @property
+    def ok(self) -> bool:
+        """Whether every record was valid"""
+        return not (self.invalid_paths or self.invalid_combos or self.errors)
+
+    def changes(self) -> Dict[str, str]:
+        """Return the mappings the import adds or replaces"""
+        changes = dict(self.added)
+        changes.update((key_combo, new) for key_combo, (_, new) in self.replaced.items())
+        return changes
+
+    def to_dict(self) -> dict:
+        """Return the report as plain data, e.g. for JSON output"""
+        return {
+            'dry_run': self.dry_run,
+            'committed': self.committed,
+            'added': dict(self.added),
+            'replaced': {key_combo: {'current': current, 'new': new}
+                         for key_combo, (current, new) in self.replaced.items()},
+            'unchanged': list(self.unchanged),
+            'invalid_paths': dict(self.invalid_paths),
+            'invalid_combos': dict(self.invalid_combos),
+            'duplicates': list(self.duplicates),
+            'errors': list(self.errors),
+        }
+
+    def summary(self) -> str:
+        """Return a one-line description of the report"""
+        verb = "Would import" if self.dry_run else "Imported"
+        return (f"{verb} {len(self.added)} new and {len(self.replaced)} replaced mappings; "
+                f"{len(self.unchanged)} unchanged, {len(self.invalid_paths)} invalid paths, "
+                f"{len(self.invalid_combos)} invalid key combinations, "
+                f"{len(self.errors)} malformed lines")
+
+
+def open_text(source: Source, mode: str):
+    """Open a path for streaming text I/O, or pass an open file through unclosed"""
+    if hasattr(source, 'read' if 'r' in mode else 'write'):
+        return contextlib.nullcontext(source)
+    return open(source, mode, encoding='utf-8', newline='')
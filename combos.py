@@ -0,0 +1,186 @@
+"""
+Key combination canonicalization and conflict detection
+"""
+
+import sys
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Set, Tuple
+
+from dispatcher import MODIFIER_BITS, normalize_key
+
+STEP_SEPARATOR = ', '  # between the steps of a key sequence
+
+# Conflict kinds
+CONFLICT_DUPLICATE = 'duplicate'  # another spelling of an existing mapping
+CONFLICT_PREFIX = 'prefix'  # a combination that starts a mapped key sequence, or vice versa
+CONFLICT_SYSTEM = 'system'  # shadows a shortcut the system or most applications rely on
+
+Chord = FrozenSet[str]
+
+# Canonical spelling per raw combination, and one shared instance per chord
+_canonical_cache: Dict[str, str] = {}
+_chord_cache: Dict[str, Tuple[Chord, ...]] = {}
+_interned_chords: Dict[Chord, Chord] = {}
+
+
+def _canonical_step(step: str) -> str:
+    """Return the canonical spelling of one combination
+
+    Modifiers come first in ctrl, alt, shift, win order, then the other keys
+    sorted. In a modifier-only combination the last modifier is the trigger
+    key, so it stays last.
+    """
+    names = [normalize_key(part) for part in step.split('+') if part.strip()]
+    if not names:
+        raise ValueError(f"Empty key combination: {step!r}")
+    keys = sorted({name for name in names if name not in MODIFIER_BITS})
+    if keys:
+        modifiers = set(names)
+    else:
+        keys = [names[-1]]
+        modifiers = set(names[:-1]) - set(keys)
+    return '+'.join([name for name in MODIFIER_BITS if name in modifiers] + keys)
+
+
+def canonical_combo(key_combo: str) -> str:
+    """Return one spelling shared by every equivalent key combination or sequence
+
+    ``Shift+Ctrl+A`` and ``ctrl + shift + a`` both become ``ctrl+shift+a``;
+    sequence steps are joined with ``", "``. Strings that cannot be parsed
+    are only lower-cased, and the empty string stays empty.
+    """
+    canonical = _canonical_cache.get(key_combo)
+    if canonical is None:
+        try:
+            steps = key_combo.split(',')
+            canonical = STEP_SEPARATOR.join(_canonical_step(step) for step in steps)
+        except ValueError:
+            canonical = ' '.join(key_combo.lower().split())
+        canonical = _canonical_cache[key_combo] = sys.intern(canonical)
+        _canonical_cache.setdefault(canonical, canonical)
+    return canonical
+
+
+def seed_canonical_cache(key_combos: Iterable[str]):
+    """Mark combinations as already canonical, e.g. keys from the config cache"""
+    for key_combo in key_combos:
+        _canonical_cache[key_combo] = key_combo
+
+
+def parse_chords(key_combo: str) -> Tuple[Chord, ...]:
+    """Return the set of keys pressed at each step, as interned frozensets"""
+    chords = _chord_cache.get(key_combo)
+    if chords is None:
+        canonical = canonical_combo(key_combo)
+        chords = []
+        for step in canonical.split(STEP_SEPARATOR) if canonical else ():
+            chord = frozenset(step.split('+'))
+            chords.append(_interned_chords.setdefault(chord, chord))
+        chords = _chord_cache[key_combo] = tuple(chords)
+    return chords
+
+
+# Shortcuts of Windows itself, and editing shortcuts nearly every application uses
+SYSTEM_SHORTCUTS = {
+    parse_chords(shortcut)[0]: shortcut for shortcut in (
+        'alt+tab', 'alt+f4', 'alt+escape', 'ctrl+escape', 'ctrl+alt+delete',
+        'ctrl+shift+escape', 'win', 'win+a', 'win+d', 'win+e', 'win+i', 'win+l', 'win+m',
+        'win+p', 'win+r', 'win+s', 'win+v', 'win+x', 'win+tab', 'win+up', 'win+down',
+        'win+left', 'win+right', 'shift+win+s', 'ctrl+a', 'ctrl+c', 'ctrl+v', 'ctrl+x',
+        'ctrl+z', 'ctrl+y', 'ctrl+s',
+    )
+}
+
+
+class Conflict(NamedTuple):
+    """A problem with one mapping's key combination"""
+    kind: str
+    key_combo: str
+    other: str  # the clashing mapping, or the system shortcut
+
+
+def describe_conflict(conflict: Conflict) -> str:
+    """Return a one-line description of a conflict"""
+    if conflict.kind == CONFLICT_DUPLICATE:
+        return f"{conflict.key_combo} is another spelling of {conflict.other}"
+    if conflict.kind == CONFLICT_PREFIX:
+        return f"{conflict.key_combo} and {conflict.other} start with the same keys"
+    return f"{conflict.key_combo} shadows the system shortcut {conflict.other}"
+
+
+def _prefixes(canonical: str) -> List[str]:
+    """Return the proper leading step runs of a canonical sequence"""
+    steps = canonical.split(STEP_SEPARATOR)
+    return [STEP_SEPARATOR.join(steps[:i]) for i in range(1, len(steps))]
+
+
+class ConflictIndex:
+    """Canonical combinations with the sequences each leading run starts
+
+    Adding, removing and checking one combination cost a few dict lookups
+    per sequence step, independent of the number of mappings.
+    """
+
+    def __init__(self, key_combos: Iterable[str] = ()):
+        self.combos: Set[str] = set()
+        self.extensions: Dict[str, Set[str]] = {}  # leading steps -> sequences starting so
+        for key_combo in key_combos:
+            self.add(key_combo)
+
+    def __len__(self) -> int:
+        return len(self.combos)
+
+    def __contains__(self, key_combo: str) -> bool:
+        return canonical_combo(key_combo) in self.combos
+
+    def add(self, key_combo: str):
+        """Index a combination"""
+        canonical = canonical_combo(key_combo)
+        if canonical in self.combos:
+            return
+        self.combos.add(canonical)
+        for prefix in _prefixes(canonical):
+            self.extensions.setdefault(prefix, set()).add(canonical)
+
+    def remove(self, key_combo: str):
+        """Drop a combination from the index"""
+        canonical = canonical_combo(key_combo)
+        if canonical not in self.combos:
+            return
+        self.combos.discard(canonical)
+        for prefix in _prefixes(canonical):
+            sequences = self.extensions[prefix]
+            sequences.discard(canonical)
+            if not sequences:
+                del self.extensions[prefix]
+
+    def check(self, key_combo: str) -> List[Conflict]:
+        """Return the conflicts key_combo has, or would have, with the index"""
+        canonical = canonical_combo(key_combo)
+        conflicts = []
+        if canonical in self.combos and key_combo != canonical:
+            conflicts.append(Conflict(CONFLICT_DUPLICATE, key_combo, canonical))
+        for sequence in sorted(self.extensions.get(canonical, ())):
+            conflicts.append(Conflict(CONFLICT_PREFIX, canonical, sequence))
+        for prefix in _prefixes(canonical):
+            if prefix in self.combos:
+                conflicts.append(Conflict(CONFLICT_PREFIX, canonical, prefix))
+        conflicts.extend(self._system(canonical))
+        return conflicts
+
+    def conflicts(self) -> List[Conflict]:
+        """Return every prefix clash and system shortcut shadowed in the index"""
+        conflicts = []
+        for prefix in sorted(self.extensions):
+            if prefix in self.combos:
+                conflicts.extend(Conflict(CONFLICT_PREFIX, prefix, sequence)
+                                 for sequence in sorted(self.extensions[prefix]))
+        for canonical in sorted(self.combos):
+            conflicts.extend(self._system(canonical))
+        return conflicts
+
+    @staticmethod
+    def _system(canonical: str) -> List[Conflict]:
+        """Return the system shortcut the first step of canonical shadows, if any"""
+        chords = parse_chords(canonical)
+        shortcut = SYSTEM_SHORTCUTS.get(chords[0]) if chords else None
+        return [] if shortcut is None else [Conflict(CONFLICT_SYSTEM, canonical, shortcut)]
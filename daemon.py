@@ -0,0 +1,372 @@
+"""
+Headless Key Mapper service with a local control socket
+
+Runs KeyMapper without the GUI (tkinter is never imported) and accepts
+JSON Lines commands on a Unix domain socket only its owner can open, or on a
+loopback TCP port where Unix sockets are unavailable (Windows). Each request
+is one JSON object per line, e.g. {"cmd": "add", "key": "ctrl+shift+n",
+"path": "C:\\\\app.exe"}, and is answered with {"ok": true, "result": ...} or
+{"ok": false, "error": ...}. Over TCP every request must also carry the
+per-user token from the token file, as "token".
+
+Usage:
+    python daemon.py --config key_mappings.json     # default Unix socket
+    python daemon.py --port 8765                    # loopback TCP with a token
+    python daemon.py --send list
+"""
+
+import startup  # first, so the startup clock covers every other import
+import os
+import sys
+import hmac
+import json
+import socket
+import signal
+import asyncio
+import logging
+import secrets
+import argparse
+from typing import Dict, Optional
+
+from combos import describe_conflict
+from instances import INSTANCE_MODES
+from key_mapper import KeyMapper, DISPATCH_HOOK, DISPATCH_HOTKEY
+from prewarm import DEFAULT_IDLE_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+SOCKET_NAME = 'keymapper.sock'
+TOKEN_FILE = '.keymapper_token'
+COMMANDS = ('ping', 'list', 'add', 'remove', 'start', 'stop', 'status', 'stats', 'reload',
+            'profiles', 'switch', 'prewarm', 'import', 'export', 'conflicts',
+            'history', 'undo')
+
+
+def default_socket_path() -> Optional[str]:
+    """Return the per-user control socket path, or None without Unix sockets"""
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+    directory = os.environ.get('XDG_RUNTIME_DIR') or os.path.expanduser('~')
+    return os.path.join(directory, SOCKET_NAME)
+
+
+def default_token_path() -> str:
+    """Return the per-user file holding the TCP control token"""
+    return os.path.join(os.path.expanduser('~'), TOKEN_FILE)
+
+
+def load_token(path: Optional[str] = None, create: bool = False) -> str:
+    """Read the TCP control token, creating it (readable by its owner only) if asked"""
+    path = path or default_token_path()
+    if create and not os.path.exists(path):
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            pass  # another daemon created it first
+        else:
+            with os.fdopen(fd, 'w') as f:
+                f.write(secrets.token_hex(32))
+    with open(path) as f:
+        token = f.read().strip()
+    if not token:
+        raise ValueError(f"Empty control token in {path}")
+    return token
+
+
+class ControlServer:
+    """Serves control commands for a KeyMapper to many concurrent clients
+
+    The Unix socket is created owner-only. On TCP, which any local process
+    (or a web page) can reach, requests without the right token are
+    rejected and the connection is closed.
+    """
+
+    def __init__(self, mapper: KeyMapper, socket_path: Optional[str] = None,
+                 host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 token: Optional[str] = None, token_path: Optional[str] = None):
+        self.mapper = mapper
+        self.socket_path = socket_path
+        self.host = host
+        self.port = port
+        self.token = token
+        self.token_path = token_path
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        """Start listening"""
+        if self.socket_path:
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)  # stale socket from an earlier run
+            # Owner-only from the moment it exists, not after a chmod
+            umask = os.umask(0o077)
+            try:
+                self.server = await asyncio.start_unix_server(self.handle_client,
+                                                              path=self.socket_path)
+            finally:
+                os.umask(umask)
+            logger.info(f"Control socket listening on {self.socket_path}")
+        else:
+            if self.token is None:
+                self.token = load_token(self.token_path, create=True)
+            self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+            self.port = self.server.sockets[0].getsockname()[1]
+            logger.info(f"Control socket listening on {self.host}:{self.port}")
+
+    async def close(self):
+        """Stop listening and remove the socket file"""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+        if self.socket_path and os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Answer every request line from one client until it disconnects"""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                authorized = True
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("Request must be a JSON object")
+                    authorized = self._authorized(request)
+                    if not authorized:
+                        raise PermissionError("Invalid or missing token")
+                    response = {'ok': True, 'result': await self.dispatch(request)}
+                except Exception as e:
+                    response = {'ok': False, 'error': str(e)}
+                writer.write(json.dumps(response).encode('utf-8') + b'\n')
+                await writer.drain()
+                if not authorized:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _authorized(self, request: Dict) -> bool:
+        """Check and strip a TCP request's token; Unix socket requests need none"""
+        token = request.pop('token', None)
+        if self.token is None:
+            return True
+        return isinstance(token, str) and hmac.compare_digest(token, self.token)
+
+    async def dispatch(self, request: Dict):
+        """Run one command; blocking mapper work goes to a thread"""
+        cmd = request.get('cmd')
+        if cmd not in COMMANDS:
+            raise ValueError(f"Unknown command: {cmd}")
+        if cmd == 'ping':
+            return 'pong'
+        if cmd == 'list':
+            return self.mapper.get_all_mappings().copy()
+        if cmd == 'status':
+            return {'active': self.mapper.is_mapping_active(),
+                    'mappings': len(self.mapper.mappings),
+                    'dispatch_mode': self.mapper.dispatch_mode,
+                    'profile': self.mapper.active_profile,
+                    'broken_paths': sorted(self.mapper.get_broken_paths())}
+        if cmd == 'profiles':
+            return {'active': self.mapper.active_profile,
+                    'profiles': self.mapper.get_profiles()}
+        if cmd == 'stats':
+            return {'latency': self.mapper.get_latency_stats(),
+                    'launches': dict(self.mapper.executor.stats)}
+        if cmd == 'history':
+            return self.mapper.get_history(int(request.get('limit', 20)))
+        return await asyncio.get_running_loop().run_in_executor(None, self._run_blocking,
+                                                                cmd, request)
+
+    def _run_blocking(self, cmd: str, request: Dict):
+        if cmd == 'add':
+            if not self.mapper.add_mapping(request['key'], request['path'],
+                                           instance_mode=request.get('instance')):
+                raise ValueError("Failed to add mapping. Check that the application path exists.")
+            self.mapper.schedule_save()
+            return True
+        if cmd == 'remove':
+            if not self.mapper.remove_mapping(request['key']):
+                raise ValueError(f"No mapping for {request['key']}")
+            self.mapper.schedule_save()
+            return True
+        if cmd == 'prewarm':
+            if not self.mapper.set_prewarm(request['key'], int(request.get('size', 1)),
+                                           float(request.get('idle_timeout',
+                                                             DEFAULT_IDLE_TIMEOUT))):
+                raise ValueError(f"Cannot prewarm {request['key']}")
+            self.mapper.schedule_save()
+            return True
+        if cmd == 'import':
+            # Paths are resolved by the daemon; the import saves once itself
+            report = self.mapper.import_mappings(request['file'], request.get('format'),
+                                                 request.get('profile'),
+                                                 bool(request.get('dry_run')))
+            return report.to_dict()
+        if cmd == 'export':
+            count = self.mapper.export_mappings(request['file'], request.get('format'),
+                                                request.get('profile'))
+            if count < 0:
+                raise ValueError(f"Failed to export mappings to {request['file']}")
+            return count
+        if cmd == 'conflicts':
+            # For one key, what it clashes with (or would once added); otherwise every clash
+            if request.get('key'):
+                conflicts = self.mapper.check_conflicts(request['key'])
+            else:
+                conflicts = self.mapper.get_conflicts()
+            return [dict(conflict._asdict(), message=describe_conflict(conflict))
+                    for conflict in conflicts]
+        if cmd == 'switch':
+            if not self.mapper.switch_profile(request['profile']):
+                raise ValueError(f"Unknown profile: {request['profile']}")
+            self.mapper.schedule_save()
+            return True
+        if cmd == 'undo':
+            record = self.mapper.undo()
+            if record is None:
+                raise ValueError("Nothing to undo")
+            return record
+        if cmd == 'start':
+            return self.mapper.start_mapping()
+        if cmd == 'stop':
+            return self.mapper.stop_mapping()
+        return self.mapper.reload_mappings()
+
+
+def send_command(request: Dict, socket_path: Optional[str] = None,
+                 host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 timeout: float = 5.0, token: Optional[str] = None) -> Dict:
+    """Send one request to a running daemon and return its response
+
+    Over TCP the request carries token, read from the token file by default.
+    """
+    if socket_path:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        address = socket_path
+    else:
+        request = dict(request, token=token or load_token())
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        address = (host, port)
+    with sock:
+        sock.settimeout(timeout)
+        sock.connect(address)
+        sock.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        with sock.makefile('rb') as f:
+            return json.loads(f.readline())
+
+
+async def serve(mapper: KeyMapper, server: ControlServer, start: bool = True):
+    """Run the service until SIGINT/SIGTERM"""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            signal.signal(sig, lambda *_: loop.call_soon_threadsafe(stop.set))
+
+    await server.start()
+    if start and mapper.get_all_mappings():
+        await loop.run_in_executor(None, mapper.start_mapping)
+    if startup.report_path():
+        startup.write_report(startup.report_path())
+    try:
+        await stop.wait()
+    finally:
+        await server.close()
+        await loop.run_in_executor(None, mapper.shutdown)
+
+
+def main(argv=None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Run Key Mapper without the GUI")
+    parser.add_argument('--config', default='key_mappings.json',
+                        help="mappings file (.json, or .db for SQLite)")
+    parser.add_argument('--socket', help="Unix socket path for the control channel "
+                        f"(default: {SOCKET_NAME} in $XDG_RUNTIME_DIR or the home directory)")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="TCP host when no socket is given")
+    parser.add_argument('--port', type=int,
+                        help="use loopback TCP on this port instead of a Unix socket "
+                        f"(the default, port {DEFAULT_PORT}, where Unix sockets are unavailable); "
+                        f"clients need the token in ~/{TOKEN_FILE}")
+    parser.add_argument('--mode', choices=[DISPATCH_HOTKEY, DISPATCH_HOOK],
+                        default=DISPATCH_HOOK, help="hotkey dispatch mode")
+    parser.add_argument('--no-start', action='store_true',
+                        help="do not start mapping until a 'start' command arrives")
+    parser.add_argument('--no-watch', action='store_true',
+                        help="do not reload the config file when it changes")
+    parser.add_argument('--journal', action='store_true',
+                        help="journal edits for undo instead of rewriting the config file; "
+                        "only when no other process edits the same JSON config")
+    parser.add_argument('--metrics-interval', type=float, metavar='SECONDS',
+                        help="log latency stats every SECONDS (and on shutdown)")
+    parser.add_argument('--metrics-file', metavar='PATH',
+                        help="also dump the latency stats as JSON to PATH "
+                        "(implies --metrics-interval 60)")
+    parser.add_argument('--send', metavar='CMD',
+                        help="send a command to a running daemon instead of starting one")
+    parser.add_argument('--key', help="key combination for --send add/remove/conflicts")
+    parser.add_argument('--path', help="application path for --send add")
+    parser.add_argument('--profile', help="profile name for --send switch/import/export")
+    parser.add_argument('--file', help="JSON Lines or CSV file for --send import/export")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="with --send import, only report what would change")
+    parser.add_argument('--size', type=int,
+                        help="idle instances for --send prewarm (0 turns prewarming off)")
+    parser.add_argument('--instance', choices=INSTANCE_MODES,
+                        help="what --send add's mapping does while its application runs")
+    parser.add_argument('--limit', type=int, help="records for --send history")
+    args = parser.parse_args(argv)
+
+    if args.socket and not hasattr(socket, 'AF_UNIX'):
+        parser.error("Unix sockets are not available on this platform; use --port")
+    if args.socket and args.port is not None:
+        parser.error("--socket and --port are mutually exclusive")
+    if args.metrics_interval is not None and args.metrics_interval <= 0:
+        parser.error("--metrics-interval must be positive")
+    if args.port is None:
+        args.socket = args.socket or default_socket_path()
+        args.port = DEFAULT_PORT
+
+    if args.send:
+        request = {'cmd': args.send}
+        if args.key:
+            request['key'] = args.key
+        if args.path:
+            request['path'] = args.path
+        if args.profile:
+            request['profile'] = args.profile
+        if args.instance:
+            request['instance'] = args.instance
+        if args.size is not None:
+            request['size'] = args.size
+        if args.limit is not None:
+            request['limit'] = args.limit
+        if args.file:
+            request['file'] = os.path.abspath(args.file)
+        if args.dry_run:
+            request['dry_run'] = True
+        response = send_command(request, args.socket, args.host, args.port)
+        print(json.dumps(response, indent=2))
+        return 0 if response.get('ok') else 1
+
+    mapper = KeyMapper(config_file=args.config, dispatch_mode=args.mode, use_cache=True,
+                       journal=args.journal)
+    if not args.no_watch:
+        mapper.start_watching()
+    mapper.start_path_checks()
+    if args.metrics_interval is not None or args.metrics_file:
+        mapper.start_metrics_reporter(args.metrics_interval or 60.0, args.metrics_file)
+    server = ControlServer(mapper, args.socket, args.host, args.port)
+    asyncio.run(serve(mapper, server, start=not args.no_start))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,466 @@
+"""
+Hotkey dispatcher - resolve key combinations through a single keyboard hook
+"""
+
+import logging
+import time
+from typing import Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+
+from lazy import LazyModule
+
+keyboard = LazyModule('keyboard')  # imported when the hook is installed
+
+logger = logging.getLogger(__name__)
+
+KEY_DOWN = 'down'
+KEY_UP = 'up'
+
+# Seconds allowed between the steps of a key sequence such as "ctrl+k, n"
+DEFAULT_SEQUENCE_TIMEOUT = 1.0
+
+# Modifier bits, in canonical combo order
+MODIFIER_BITS = {
+    'ctrl': 1,
+    'alt': 2,
+    'shift': 4,
+    'win': 8,
+}
+
+MODIFIER_ALIASES = {
+    'control': 'ctrl',
+    'left ctrl': 'ctrl',
+    'right ctrl': 'ctrl',
+    'left control': 'ctrl',
+    'right control': 'ctrl',
+    'left alt': 'alt',
+    'right alt': 'alt',
+    'alt gr': 'alt',
+    'left shift': 'shift',
+    'right shift': 'shift',
+    'windows': 'win',
+    'left windows': 'win',
+    'right windows': 'win',
+    'cmd': 'win',
+    'command': 'win',
+    'super': 'win',
+}
+
+KEY_ALIASES = {
+    'return': 'enter',
+    'esc': 'escape',
+    'del': 'delete',
+    'ins': 'insert',
+    'pgup': 'page up',
+    'pgdn': 'page down',
+    'spacebar': 'space',
+}
+
+# Characters ``keyboard`` reports for a key pressed with shift, by the key's
+# own name (US layout), so shift+1 matches whether it arrives as '1' or '!'
+SHIFTED_KEYS = {
+    '!': '1', '@': '2', '#': '3', '$': '4', '%': '5',
+    '^': '6', '&': '7', '*': '8', '(': '9', ')': '0',
+    '_': '-', '+': '=', '{': '[', '}': ']', '|': '\\',
+    ':': ';', '"': "'", '<': ',', '>': '.', '?': '/', '~': '`',
+}
+SHIFT_BIT = MODIFIER_BITS['shift']
+
+# Raw event names resolved so far; key names form a small closed set
+_name_cache: Dict[str, str] = {}
+
+# Key combinations parsed so far, seeded from the config cache on startup
+_combo_cache: Dict[str, Tuple[int, str]] = {}
+
+Steps = Tuple[Tuple[int, str], ...]
+
+
+class KeyEvent(NamedTuple):
+    """A key press or release, as produced by an event source"""
+    event_type: str
+    name: str
+
+
+def normalize_key(name: str) -> str:
+    """Return the canonical name for a single key"""
+    canonical = _name_cache.get(name)
+    if canonical is None:
+        lowered = name.strip().lower()
+        canonical = MODIFIER_ALIASES.get(lowered) or KEY_ALIASES.get(lowered, lowered)
+        _name_cache[name] = canonical
+    return canonical
+
+
+def parse_combo(key_combo: str) -> Tuple[int, str]:
+    """Parse a key combination into a (modifier mask, trigger key) pair
+
+    The trigger key is the single non-modifier key in the combination, or
+    the last modifier for modifier-only combinations such as ``ctrl+shift``.
+    """
+    parsed = _combo_cache.get(key_combo)
+    if parsed is None:
+        parsed = _combo_cache[key_combo] = _parse_combo(key_combo)
+    return parsed
+
+
+def _parse_combo(key_combo: str) -> Tuple[int, str]:
+    if ',' in key_combo:
+        raise ValueError(f"Expected a single combination, not a key sequence: {key_combo!r}")
+
+    names = [normalize_key(part) for part in key_combo.split('+') if part.strip()]
+    if not names:
+        raise ValueError(f"Empty key combination: {key_combo!r}")
+
+    keys = [name for name in names if name not in MODIFIER_BITS]
+    if len(keys) > 1:
+        raise ValueError(f"More than one non-modifier key in {key_combo!r}")
+
+    trigger = keys[0] if keys else names[-1]
+    mask = 0
+    for name in names:
+        if name != trigger:
+            mask |= MODIFIER_BITS.get(name, 0)
+    if trigger in SHIFTED_KEYS:
+        # 'ctrl+!' is typed as ctrl+shift+1
+        trigger = SHIFTED_KEYS[trigger]
+        mask |= SHIFT_BIT
+    return mask, trigger
+
+
+def parse_sequence(key_combo: str) -> Steps:
+    """Parse a comma-separated key sequence into its (mask, trigger) steps
+
+    A plain combination parses to a single step.
+    """
+    if ',' not in key_combo:
+        return (parse_combo(key_combo),)
+    parts = key_combo.split(',')
+    if not all(part.strip() for part in parts):
+        raise ValueError(f"Empty step in key sequence: {key_combo!r}")
+    return tuple(parse_combo(part.strip()) for part in parts)
+
+
+def compile_combos(key_combos: Iterable[str]) -> Dict[str, Tuple[int, str]]:
+    """Parse every valid combination, skipping the ones that cannot be dispatched"""
+    parsed = {}
+    for key_combo in key_combos:
+        try:
+            parsed[key_combo] = parse_combo(key_combo)
+        except ValueError:
+            pass
+    return parsed
+
+
+def seed_combo_cache(parsed: Dict[str, Tuple[int, str]]):
+    """Preload parse results, e.g. from a config cache, so parsing is skipped"""
+    for key_combo, (mask, trigger) in parsed.items():
+        _combo_cache[key_combo] = (mask, trigger)
+
+
+class SequenceState:
+    """A state of the key sequence automaton: the steps that may come next
+
+    Its index has the same (modifier mask, trigger key) layout as the
+    DispatchTable's and maps to either a handler or the next state. When a
+    combination is also the start of a longer sequence (``ctrl+k`` and
+    ``ctrl+k, n``), its handler is the state's own: reaching the state fires
+    it and the sequence can still complete, whatever order they were bound
+    in, as in hotkey mode. States are never modified after they are built.
+    """
+
+    __slots__ = ('index', 'timeout', 'handler')
+
+    def __init__(self, index: Dict[int, Dict[str, object]], timeout: float,
+                 handler: Optional[Callable] = None):
+        self.index = index
+        self.timeout = timeout
+        self.handler = handler
+
+    def lookup(self, mask: int, trigger: str):
+        """Return the handler or state reached by a step"""
+        keys = self.index.get(mask)
+        if keys is None:
+            return None
+        return keys.get(trigger)
+
+
+def _attach(existing, rest: Steps, handler: Callable, timeout: float):
+    """Return what a trie slot holding existing holds after binding rest
+
+    States along the path are copied, never modified, so tables sharing
+    them are unaffected. A handler and a state meeting in one slot become a
+    state with that handler as its own.
+    """
+    if isinstance(existing, SequenceState):
+        index, own = dict(existing.index), existing.handler
+    else:
+        index, own = {}, existing
+    if not rest:
+        return SequenceState(index, timeout, handler) if index else handler
+    mask, trigger = rest[0]
+    keys = index[mask] = dict(index.get(mask, {}))
+    keys[trigger] = _attach(keys.get(trigger), rest[1:], handler, timeout)
+    return SequenceState(index, timeout, own)
+
+
+class DispatchTable:
+    """Precompiled index from (modifier mask, trigger key) to handler
+
+    The index is a two-level trie: the first level is keyed by the modifier
+    bitmask and the second by the trigger key, so resolving a key event costs
+    two dict lookups regardless of how many combinations are registered.
+    Key sequences such as ``ctrl+k, n`` map their first step to a
+    SequenceState, making the table the start state of a deterministic
+    automaton.
+    """
+
+    def __init__(self, index: Optional[Dict[int, Dict[str, object]]] = None,
+                 combos: Optional[Dict[str, Steps]] = None,
+                 handlers: Optional[Dict[str, Callable]] = None,
+                 sequence_timeout: float = DEFAULT_SEQUENCE_TIMEOUT):
+        self.index = index or {}
+        self.combos = combos or {}
+        self.handlers = handlers or {}
+        self.sequence_timeout = sequence_timeout
+
+    @classmethod
+    def compile(cls, handlers: Dict[str, Callable],
+                sequence_timeout: float = DEFAULT_SEQUENCE_TIMEOUT) -> 'DispatchTable':
+        """Build a table from a mapping of key combination to handler"""
+        return cls(sequence_timeout=sequence_timeout).updated(handlers)
+
+    def updated(self, bind: Dict[str, Callable],
+                unbind: Iterable[str] = ()) -> 'DispatchTable':
+        """Return a new table with combinations bound and unbound
+
+        The current table is left untouched, so it stays valid for any thread
+        still dispatching through it; only the modifier levels touched by the
+        change are copied.
+        """
+        index = dict(self.index)
+        combos = dict(self.combos)
+        handlers = dict(self.handlers)
+        timeout = self.sequence_timeout
+        copied = set()
+
+        def level(mask: int) -> Dict[str, object]:
+            if mask not in copied:
+                index[mask] = dict(index.get(mask, {}))
+                copied.add(mask)
+            return index[mask]
+
+        # Unbound first steps are rebuilt from the combinations that remain,
+        # so a combination spelled differently or sharing a sequence prefix
+        # takes over the slot
+        cleared = set()
+        for key_combo in unbind:
+            steps = combos.pop(key_combo, None)
+            handlers.pop(key_combo, None)
+            if steps is not None:
+                cleared.add(steps[0])
+        if cleared:
+            for mask, trigger in cleared:
+                level(mask).pop(trigger, None)
+            for key_combo, steps in combos.items():
+                if steps[0] in cleared:
+                    keys = level(steps[0][0])
+                    keys[steps[0][1]] = _attach(keys.get(steps[0][1]), steps[1:],
+                                                handlers[key_combo], timeout)
+            for mask, _ in cleared:
+                if not index.get(mask, True):
+                    del index[mask]
+                    copied.discard(mask)
+
+        for key_combo, handler in bind.items():
+            try:
+                steps = parse_sequence(key_combo)
+            except ValueError as e:
+                logger.error(f"Error registering hotkey {key_combo}: {e}")
+                continue
+            mask, trigger = steps[0]
+            keys = level(mask)
+            existing = keys.get(trigger)
+            if existing is not None and combos.get(key_combo) != steps:
+                own = existing.handler if isinstance(existing, SequenceState) else existing
+                if len(steps) == 1 and own is not None:
+                    logger.warning(f"Hotkey {key_combo} shadows an existing combination")
+                elif (len(steps) == 1) != (own is not None):
+                    logger.warning(f"Hotkey {key_combo} and a key sequence start with the "
+                                   f"same keys; pressing them fires both")
+            keys[trigger] = _attach(existing, steps[1:], handler, timeout)
+            combos[key_combo] = steps
+            handlers[key_combo] = handler
+
+        return DispatchTable(index, combos, handlers, timeout)
+
+    def lookup(self, mask: int, trigger: str):
+        """Return the handler or sequence state bound to a modifier mask and trigger key"""
+        keys = self.index.get(mask)
+        if keys is None:
+            return None
+        return keys.get(trigger)
+
+    def __len__(self) -> int:
+        return len(self.combos)
+
+    def __contains__(self, key_combo: str) -> bool:
+        return key_combo in self.combos
+
+
+class EventSource:
+    """Source of raw key events feeding a dispatcher"""
+
+    def start(self, callback: Callable[[KeyEvent], None]):
+        """Start delivering events to callback"""
+        raise NotImplementedError
+
+    def stop(self):
+        """Stop delivering events"""
+        raise NotImplementedError
+
+
+class KeyboardEventSource(EventSource):
+    """Event source backed by a single low-level ``keyboard`` hook"""
+
+    def __init__(self):
+        self._hook = None
+
+    def start(self, callback: Callable[[KeyEvent], None]):
+        if self._hook is None:
+            self._hook = keyboard.hook(callback)
+
+    def stop(self):
+        if self._hook is not None:
+            keyboard.unhook(self._hook)
+            self._hook = None
+
+
+class SyntheticEventSource(EventSource):
+    """Event source driven programmatically, for tests and benchmarks"""
+
+    def __init__(self):
+        self.callback: Optional[Callable[[KeyEvent], None]] = None
+
+    def start(self, callback: Callable[[KeyEvent], None]):
+        self.callback = callback
+
+    def stop(self):
+        self.callback = None
+
+    def emit(self, event: KeyEvent):
+        """Deliver a single event if the source is running"""
+        if self.callback is not None:
+            self.callback(event)
+
+    def press(self, name: str):
+        """Deliver a key down event"""
+        self.emit(KeyEvent(KEY_DOWN, name))
+
+    def release(self, name: str):
+        """Deliver a key up event"""
+        self.emit(KeyEvent(KEY_UP, name))
+
+    def tap(self, key_combo: str):
+        """Press every key of a combination in order, then release them
+
+        Each step of a key sequence such as ``ctrl+k, n`` is tapped in turn.
+        """
+        for step in key_combo.split(','):
+            names = [part.strip() for part in step.split('+') if part.strip()]
+            for name in names:
+                self.press(name)
+            for name in reversed(names):
+                self.release(name)
+
+
+class HotkeyDispatcher:
+    """Dispatches key events from one event source through a DispatchTable
+
+    Key sequences are matched by walking SequenceStates: a step that leads
+    to a state is remembered together with the state's deadline, and the
+    next key-down continues from there. A key that does not continue the
+    sequence, or arrives after the deadline, restarts matching from the
+    table. Each event costs a fixed number of dict lookups and allocates
+    nothing.
+    """
+
+    def __init__(self, event_source: Optional[EventSource] = None):
+        self.event_source = event_source or KeyboardEventSource()
+        self.table = DispatchTable()
+        self.is_running = False
+        self._mask = 0
+        self._state: Optional[SequenceState] = None
+        self._deadline = 0.0
+
+    def set_table(self, table: DispatchTable):
+        """Swap in a new dispatch table; in-flight events finish on the old one"""
+        self.table = table
+        self._state = None
+
+    def start(self):
+        """Install the hook on the event source"""
+        if not self.is_running:
+            self._mask = 0
+            self._state = None
+            self.event_source.start(self.handle_event)
+            self.is_running = True
+
+    def stop(self):
+        """Remove the hook from the event source"""
+        if self.is_running:
+            self.event_source.stop()
+            self.is_running = False
+            self._mask = 0
+            self._state = None
+
+    def handle_event(self, event) -> bool:
+        """Resolve a key event and run its handler; return True on a match
+
+        Handlers are called with the ``time.perf_counter()`` timestamp at
+        which the event reached the dispatcher.
+        """
+        received = time.perf_counter()
+        name = event.name
+        if not name:
+            return False
+        name = normalize_key(name)
+        bit = MODIFIER_BITS.get(name, 0)
+
+        if event.event_type == KEY_UP:
+            self._mask &= ~bit
+            return False
+
+        mask = self._mask & ~bit
+        self._mask |= bit
+        if mask & SHIFT_BIT:
+            # keyboard names a shifted key by its character: shift+1 is '!'
+            name = SHIFTED_KEYS.get(name, name)
+
+        handler = None
+        state = self._state
+        if state is not None:
+            if received > self._deadline:
+                state = self._state = None
+            else:
+                handler = state.lookup(mask, name)
+                if handler is None:
+                    if bit:
+                        return False  # modifier pressed on the way to the next step
+                    state = self._state = None
+        if state is None:
+            handler = self.table.lookup(mask, name)
+        if handler is None:
+            return False
+
+        if type(handler) is SequenceState:
+            self._state = handler
+            self._deadline = received + handler.timeout
+            handler = handler.handler  # a combination that also starts the sequence
+            if handler is None:
+                return True
+        else:
+            self._state = None
+        try:
+            handler(received)
+        except Exception as e:
+            logger.error(f"Error in hotkey handler for {name}: {e}")
+        return True
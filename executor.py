@@ -0,0 +1,163 @@
+"""
+Launch executor - run application launches off the keyboard hook thread
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Policies applied when the launch queue is full
+POLICY_DROP = 'drop'  # drop the new trigger
+POLICY_DROP_OLDEST = 'drop_oldest'  # evict the oldest queued launch to make room
+POLICY_BLOCK = 'block'  # wait up to block_timeout for a free slot, then drop
+
+POLICIES = (POLICY_DROP, POLICY_DROP_OLDEST, POLICY_BLOCK)
+
+
+class LaunchExecutor:
+    """Bounded worker pool with per-key debouncing and coalescing
+
+    Triggers for the same key that arrive within ``debounce`` seconds of the
+    previous one are ignored. Ignored triggers restart the window too, so a
+    key held down on auto-repeat launches once until it is released. A
+    trigger for a key that is still waiting in the queue is coalesced into
+    the queued launch. With ``workers=0`` launches run inline on the
+    submitting thread.
+    """
+
+    def __init__(self, workers: int = 2, queue_size: int = 32,
+                 policy: str = POLICY_DROP, debounce: float = 0.3,
+                 block_timeout: float = 0.05):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown launch policy: {policy}")
+        self.workers = workers
+        self.policy = policy
+        self.debounce = debounce
+        self.block_timeout = block_timeout
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.stats: Dict[str, int] = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'debounced': 0,
+            'coalesced': 0,
+            'dropped': 0,
+        }
+        self._lock = threading.Lock()
+        self._pending: Set[Hashable] = set()
+        self._last_trigger: Dict[Hashable, float] = {}
+        self._threads: List[threading.Thread] = []
+        self._running = False
+
+    def submit(self, key: Hashable, func: Callable, *args) -> bool:
+        """Queue func(*args) for the given key; return False if it was not queued"""
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_trigger.get(key)
+            self._last_trigger[key] = now  # sliding window: every trigger extends it
+            if last is not None and now - last < self.debounce:
+                self.stats['debounced'] += 1
+                return False
+
+            if key in self._pending:
+                self.stats['coalesced'] += 1
+                return False
+            self.stats['submitted'] += 1
+
+            if self.workers <= 0:
+                inline = True
+            else:
+                inline = False
+                self._pending.add(key)
+                self._ensure_started()
+
+        if inline:
+            self._run(func, args)
+            return True
+        return self._enqueue((key, func, args))
+
+    def _enqueue(self, task) -> bool:
+        """Put a task on the queue, applying the saturation policy"""
+        key = task[0]
+        try:
+            if self.policy == POLICY_BLOCK:
+                self.queue.put(task, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(task)
+            return True
+        except queue.Full:
+            pass
+
+        if self.policy == POLICY_DROP_OLDEST:
+            try:
+                oldest = self.queue.get_nowait()
+                self._discard(oldest[0])
+                self.queue.task_done()
+                self.queue.put_nowait(task)
+                logger.warning(f"Launch queue full, dropped oldest launch for {oldest[0]}")
+                return True
+            except (queue.Empty, queue.Full):
+                pass
+
+        self._discard(key)
+        logger.warning(f"Launch queue full, dropped launch for {key}")
+        return False
+
+    def _discard(self, key: Hashable):
+        """Forget a queued key and count it as dropped"""
+        with self._lock:
+            self._pending.discard(key)
+            self.stats['dropped'] += 1
+
+    def _ensure_started(self):
+        """Start the worker threads; the caller must hold the lock"""
+        if self._running:
+            return
+        self._running = True
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"launch-worker-{i}",
+                                      daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _worker(self):
+        """Worker loop; a None task stops the worker"""
+        while True:
+            task = self.queue.get()
+            try:
+                if task is None:
+                    return
+                key, func, args = task
+                with self._lock:
+                    self._pending.discard(key)
+                self._run(func, args)
+            finally:
+                self.queue.task_done()
+
+    def _run(self, func: Callable, args):
+        """Run a launch and record its outcome"""
+        try:
+            func(*args)
+            outcome = 'completed'
+        except Exception as e:
+            logger.error(f"Error in launch task: {e}")
+            outcome = 'failed'
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def shutdown(self, wait: bool = True, timeout: Optional[float] = 5.0):
+        """Stop the workers after the queued launches have run"""
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self.queue.put(None)
+        if wait:
+            for thread in threads:
+                thread.join(timeout)
@@ -2,10 +2,134 @@
 GUI for Key Mapper application
 """
 
+import startup  # first, so the startup clock covers every other import
+import os
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
+from tkinter import ttk, messagebox
 import threading
+from typing import Optional, Set
+from bridge import EngineBridge
+from combos import canonical_combo, describe_conflict
+from instances import INSTANCE_FOCUS, INSTANCE_IGNORE, INSTANCE_MULTI
+from journal import JOURNAL_ENV
 from key_mapper import KeyMapper
+from mapping_list import MappingListModel
+from metrics import METRICS_ENV
+from search import MappingSearchIndex
+
+startup.mark(startup.IMPORTS_DONE)
+
+# Choices for what a mapping does while its application is already running
+INSTANCE_CHOICES = {
+    "Start another instance": INSTANCE_MULTI,
+    "Focus the running instance": INSTANCE_FOCUS,
+    "Do nothing": INSTANCE_IGNORE,
+}
+
+
+class VirtualTreeview:
+    """Treeview that only materializes the rows currently on screen
+
+    The widget holds one item per visible row slot; scrolling and model
+    changes rewrite those slots from a window of the MappingListModel, so
+    the cost of a refresh does not depend on the number of mappings. Rows
+    whose application path is in ``broken`` are marked as missing.
+    """
+    
+    def __init__(self, parent, model: MappingListModel, columns, widths):
+        self.model = model
+        self.offset = 0
+        self.visible = 10
+        self.selected_key: Optional[str] = None
+        self.broken: Set[str] = set()
+        
+        self.tree = ttk.Treeview(parent, columns=columns, show='headings',
+                                 height=self.visible, selectmode='browse')
+        for column, width in zip(columns, widths):
+            self.tree.heading(column, text=column)
+            self.tree.column(column, width=width)
+        self.tree.tag_configure('broken', foreground='red')
+        self.scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.yview)
+        
+        self.row_height = int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+        self.tree.bind('<Configure>', self.on_resize)
+        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+        self.tree.bind('<MouseWheel>', self.on_wheel)
+        self.tree.bind('<Button-4>', lambda event: self.scroll_to(self.offset - 3))
+        self.tree.bind('<Button-5>', lambda event: self.scroll_to(self.offset + 3))
+        
+    def grid(self, row: int, column: int):
+        """Place the tree and its scrollbar side by side"""
+        self.tree.grid(row=row, column=column, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.scrollbar.grid(row=row, column=column + 1, sticky=(tk.N, tk.S))
+        
+    def yview(self, *args):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units'|'pages')"""
+        if args[0] == 'moveto':
+            self.scroll_to(int(float(args[1]) * len(self.model.visible())))
+        elif args[0] == 'scroll':
+            step = int(args[1])
+            if args[2] == 'pages':
+                step *= self.visible
+            self.scroll_to(self.offset + step)
+            
+    def on_wheel(self, event):
+        """Scroll three rows per wheel notch"""
+        self.scroll_to(self.offset - 3 * int(event.delta / 120))
+        
+    def on_resize(self, event):
+        """Show as many rows as fit, minus the heading"""
+        visible = max(1, event.height // self.row_height - 1)
+        if visible != self.visible:
+            self.visible = visible
+            self.render()
+            
+    def on_select(self, event=None):
+        """Remember the selected mapping by key, not by row slot"""
+        selection = self.tree.selection()
+        if selection:
+            index = self.offset + self.tree.index(selection[0])
+            if index < len(self.model.visible()):
+                self.selected_key = self.model.visible()[index]
+                
+    def scroll_to(self, offset: int):
+        """Move the window so that row offset is at the top"""
+        offset = max(0, min(offset, len(self.model.visible()) - self.visible))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+            
+    def render(self):
+        """Rewrite the visible row slots from the model"""
+        self.offset = max(0, min(self.offset, len(self.model.visible()) - self.visible))
+        rows = self.model.window(self.offset, self.visible)
+        items = self.tree.get_children()
+        for slot, (key_combo, app_path) in enumerate(rows):
+            if app_path in self.broken:
+                values, tags = (key_combo, f"{app_path}  (missing)"), ('broken',)
+            else:
+                values, tags = (key_combo, app_path), ()
+            if slot < len(items):
+                self.tree.item(items[slot], values=values, tags=tags)
+            else:
+                self.tree.insert('', tk.END, iid=f"row{slot}", values=values, tags=tags)
+        if len(items) > len(rows):
+            self.tree.delete(*items[len(rows):])
+            
+        # Keep the selection on the same mapping while it is in view
+        if self.selected_key not in self.model:
+            self.selected_key = None
+        keys = [key_combo for key_combo, _ in rows]
+        if self.selected_key in keys:
+            self.tree.selection_set(f"row{keys.index(self.selected_key)}")
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+            
+        total = len(self.model.visible())
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + len(rows)) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
 
 
 class KeyMapperGUI:
@@ -17,15 +141,37 @@ class KeyMapperGUI:
         self.root.geometry("800x600")
         self.root.resizable(True, True)
         
-        # Initialize key mapper
-        self.mapper = KeyMapper()
+        # Initialize key mapper; blocking engine calls go through the bridge.
+        # The journal is opt-in: a daemon may be editing the same config file
+        self.mapper = KeyMapper(use_cache=True, journal=bool(os.environ.get(JOURNAL_ENV)))
+        self.bridge = EngineBridge()
+        if os.environ.get(METRICS_ENV):
+            self.mapper.start_metrics_reporter(path=os.environ[METRICS_ENV])
+        
+        # Latency stats panel, created on demand
+        self.stats_window = None
+        self.stats_tree = None
+        self.stats_job = None
         
         # Set up UI
         self.setup_ui()
         
         # Update UI with current mappings
+        self.refresh_profiles()
         self.refresh_mappings()
         
+        # Pick up edits made to the config file outside the GUI; the watcher
+        # thread only sets a flag, the Tk thread polls it
+        self.config_reloaded = threading.Event()
+        self.mapper.start_watching(callback=self.config_reloaded.set)
+        self.poll_config_reload()
+        
+        # Mark mappings whose application disappeared, e.g. on a removed drive
+        self.paths_changed = threading.Event()
+        self.mapper.start_path_checks(callback=lambda changed: self.paths_changed.set())
+        self.poll_path_status()
+        self.poll_bridge()
+        
         # Handle window close
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         
@@ -63,9 +209,25 @@ class KeyMapperGUI:
                                         command=self.restore_original, width=15)
         self.restore_button.grid(row=0, column=2, padx=5)
         
+        ttk.Button(control_frame, text="Latency Stats", 
+                  command=self.show_stats, width=15).grid(row=0, column=3, padx=5)
+        
         self.status_label = ttk.Label(control_frame, text="Status: Stopped", 
                                      foreground="red")
-        self.status_label.grid(row=0, column=3, padx=20)
+        self.status_label.grid(row=0, column=4, padx=20)
+        
+        # Profile selector; switching swaps in the profile's precompiled bindings
+        profile_frame = ttk.Frame(control_frame)
+        profile_frame.grid(row=1, column=0, columnspan=5, pady=(10, 0), sticky=tk.W)
+        ttk.Label(profile_frame, text="Profile:").grid(row=0, column=0, padx=5)
+        self.profile_var = tk.StringVar(value=self.mapper.active_profile)
+        self.profile_combo = ttk.Combobox(profile_frame, textvariable=self.profile_var,
+                                          state='readonly', width=25)
+        self.profile_combo.grid(row=0, column=1, padx=5)
+        self.profile_combo.bind('<<ComboboxSelected>>', lambda event: self.switch_profile())
+        self.new_profile_button = ttk.Button(profile_frame, text="New Profile...", 
+                                             command=self.create_profile)
+        self.new_profile_button.grid(row=0, column=2, padx=5)
         
         # Add mapping frame
         add_frame = ttk.LabelFrame(main_frame, text="Add New Mapping", padding="10")
@@ -75,7 +237,7 @@ class KeyMapperGUI:
         ttk.Label(add_frame, text="Key Combination:").grid(row=0, column=0, sticky=tk.W, padx=5)
         self.key_entry = ttk.Entry(add_frame, width=30)
         self.key_entry.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=5)
-        ttk.Label(add_frame, text="(e.g., ctrl+shift+a)").grid(row=0, column=2, sticky=tk.W)
+        ttk.Label(add_frame, text="(e.g., ctrl+shift+a or ctrl+k, n)").grid(row=0, column=2, sticky=tk.W)
         
         ttk.Label(add_frame, text="Application Path:").grid(row=1, column=0, sticky=tk.W, padx=5, pady=5)
         self.app_entry = ttk.Entry(add_frame, width=50)
@@ -83,39 +245,58 @@ class KeyMapperGUI:
         
         ttk.Button(add_frame, text="Browse...", command=self.browse_app).grid(row=1, column=2, padx=5)
         
-        ttk.Button(add_frame, text="Add Mapping", command=self.add_mapping).grid(row=2, column=1, pady=10)
+        ttk.Label(add_frame, text="If Already Running:").grid(row=2, column=0, sticky=tk.W, padx=5)
+        self.instance_var = tk.StringVar(value=next(iter(INSTANCE_CHOICES)))
+        ttk.Combobox(add_frame, textvariable=self.instance_var, values=list(INSTANCE_CHOICES),
+                     state='readonly', width=30).grid(row=2, column=1, sticky=tk.W, padx=5)
+        
+        self.add_button = ttk.Button(add_frame, text="Add Mapping", command=self.add_mapping)
+        self.add_button.grid(row=3, column=1, pady=10)
         
         # Mappings list frame
         list_frame = ttk.LabelFrame(main_frame, text="Current Mappings", padding="10")
         list_frame.grid(row=3, column=0, pady=10, sticky=(tk.W, tk.E, tk.N, tk.S))
         list_frame.columnconfigure(0, weight=1)
-        list_frame.rowconfigure(0, weight=1)
-        
-        # Treeview for mappings
-        columns = ('Key Combination', 'Application Path')
-        self.tree = ttk.Treeview(list_frame, columns=columns, show='headings', height=10)
-        
-        self.tree.heading('Key Combination', text='Key Combination')
-        self.tree.heading('Application Path', text='Application Path')
+        list_frame.rowconfigure(1, weight=1)
         
-        self.tree.column('Key Combination', width=200)
-        self.tree.column('Application Path', width=500)
+        # Search box, filtering through an index kept up to date with each edit
+        search_frame = ttk.Frame(list_frame)
+        search_frame.grid(row=0, column=0, pady=(0, 5), sticky=(tk.W, tk.E))
+        search_frame.columnconfigure(1, weight=1)
+        ttk.Label(search_frame, text="Search:").grid(row=0, column=0, padx=5)
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add('write', lambda *args: self.apply_search(scroll_to_top=True))
+        ttk.Entry(search_frame, textvariable=self.search_var).grid(
+            row=0, column=1, sticky=(tk.W, tk.E), padx=5)
+        self.search_index = MappingSearchIndex()
         
-        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        
-        # Scrollbar for treeview
-        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        # Virtualized treeview for mappings, with its own scrollbar
+        self.mapping_model = MappingListModel()
+        self.mapping_view = VirtualTreeview(list_frame, self.mapping_model,
+                                            ('Key Combination', 'Application Path'),
+                                            (200, 500))
+        self.mapping_view.grid(row=1, column=0)
         
         # Delete button
         delete_frame = ttk.Frame(list_frame)
-        delete_frame.grid(row=1, column=0, pady=10)
+        delete_frame.grid(row=2, column=0, pady=10)
         
-        ttk.Button(delete_frame, text="Delete Selected", 
-                  command=self.delete_mapping).grid(row=0, column=0, padx=5)
-        ttk.Button(delete_frame, text="Refresh", 
-                  command=self.refresh_mappings).grid(row=0, column=1, padx=5)
+        self.delete_button = ttk.Button(delete_frame, text="Delete Selected", 
+                                        command=self.delete_mapping)
+        self.delete_button.grid(row=0, column=0, padx=5)
+        self.refresh_button = ttk.Button(delete_frame, text="Refresh", 
+                                         command=self.reload_mappings)
+        self.refresh_button.grid(row=0, column=1, padx=5)
+        self.import_button = ttk.Button(delete_frame, text="Import...", 
+                                        command=self.import_mappings)
+        self.import_button.grid(row=0, column=2, padx=5)
+        ttk.Button(delete_frame, text="Export...", 
+                   command=self.export_mappings).grid(row=0, column=3, padx=5)
+        self.undo_button = ttk.Button(delete_frame, text="Undo", 
+                                      command=self.undo_edit)
+        self.undo_button.grid(row=0, column=4, padx=5)
+        if self.mapper.journal is None:
+            self.undo_button.config(state=tk.DISABLED)
         
         # Instructions
         instructions = ("Instructions:\n"
@@ -130,6 +311,8 @@ class KeyMapperGUI:
         
     def browse_app(self):
         """Browse for an application"""
+        from tkinter import filedialog  # only needed when browsing
+        
         filename = filedialog.askopenfilename(
             title="Select Application",
             filetypes=(("Executable files", "*.exe"), 
@@ -149,96 +332,373 @@ class KeyMapperGUI:
             messagebox.showerror("Error", "Please enter both key combination and application path")
             return
             
-        if self.mapper.add_mapping(key_combo, app_path):
-            self.mapper.save_mappings()
-            self.refresh_mappings()
+        self.add_button.config(state=tk.DISABLED, text="Adding...")
+        instance_mode = INSTANCE_CHOICES[self.instance_var.get()]
+        self.bridge.submit(self.mapper.add_mapping, key_combo, app_path, None, instance_mode,
+                           callback=lambda added, error: self.on_mapping_added(
+                               key_combo, app_path, added, error))
+        
+    def on_mapping_added(self, key_combo, app_path, added, error):
+        """Show the result of an add made in the background"""
+        self.add_button.config(state=tk.NORMAL, text="Add Mapping")
+        if added:
+            self.mapper.schedule_save()
+            key_combo = canonical_combo(key_combo)  # the spelling the mapper stored
+            self.mapping_model.set(key_combo, app_path)
+            self.search_index.set(key_combo, app_path)
+            self.apply_search()
             self.key_entry.delete(0, tk.END)
             self.app_entry.delete(0, tk.END)
-            messagebox.showinfo("Success", f"Mapping added: {key_combo} -> {app_path}")
-            
-            # Restart mapping if it was active
-            if self.mapper.is_mapping_active():
-                self.mapper.stop_mapping()
-                self.mapper.start_mapping()
+            self.bridge.submit(self.mapper.check_conflicts, key_combo,
+                               callback=lambda conflicts, error: self.on_conflicts_checked(
+                                   key_combo, app_path, conflicts or []))
         else:
             messagebox.showerror("Error", "Failed to add mapping. Check that the application path exists.")
             
+    def on_conflicts_checked(self, key_combo, app_path, conflicts):
+        """Confirm a new mapping, warning about any clash it has"""
+        if conflicts:
+            details = "\n".join(describe_conflict(conflict) for conflict in conflicts)
+            messagebox.showwarning("Mapping added with conflicts",
+                                   f"Mapping added: {key_combo} -> {app_path}\n\n{details}")
+        else:
+            messagebox.showinfo("Success", f"Mapping added: {key_combo} -> {app_path}")
+            
     def delete_mapping(self):
         """Delete selected mapping"""
-        selected = self.tree.selection()
-        if not selected:
+        key_combo = self.mapping_view.selected_key
+        if key_combo is None:
             messagebox.showwarning("Warning", "Please select a mapping to delete")
             return
             
-        item = self.tree.item(selected[0])
-        key_combo = item['values'][0]
-        
         if messagebox.askyesno("Confirm", f"Delete mapping for '{key_combo}'?"):
-            if self.mapper.remove_mapping(key_combo):
-                self.mapper.save_mappings()
-                self.refresh_mappings()
-                
-                # Restart mapping if it was active
-                if self.mapper.is_mapping_active():
-                    self.mapper.stop_mapping()
-                    self.mapper.start_mapping()
-                    
-                messagebox.showinfo("Success", "Mapping deleted")
+            self.delete_button.config(state=tk.DISABLED, text="Deleting...")
+            self.bridge.submit(self.mapper.remove_mapping, key_combo,
+                               callback=lambda removed, error: self.on_mapping_deleted(
+                                   key_combo, removed, error))
+            
+    def on_mapping_deleted(self, key_combo, removed, error):
+        """Show the result of a delete made in the background"""
+        self.delete_button.config(state=tk.NORMAL, text="Delete Selected")
+        if removed:
+            self.mapper.schedule_save()
+            # With profiles, a binding the profile inherits may show through
+            app_path = self.mapper.mappings.get(key_combo)
+            if app_path is None:
+                self.mapping_model.remove(key_combo)
+                self.search_index.remove(key_combo)
             else:
-                messagebox.showerror("Error", "Failed to delete mapping")
-                
+                self.mapping_model.set(key_combo, app_path)
+                self.search_index.set(key_combo, app_path)
+            self.apply_search()
+            messagebox.showinfo("Success", "Mapping deleted")
+        else:
+            messagebox.showerror("Error", "Failed to delete mapping")
+            
+    def import_mappings(self):
+        """Import mappings from a file, after showing what would change"""
+        from tkinter import filedialog  # only needed when browsing
+        
+        filename = filedialog.askopenfilename(
+            title="Import Mappings",
+            filetypes=(("JSON Lines", "*.jsonl"), ("CSV", "*.csv"), ("All files", "*.*"))
+        )
+        if filename:
+            self.import_button.config(state=tk.DISABLED, text="Checking...")
+            self.bridge.submit(self.mapper.import_mappings, filename, None, None, True,
+                               callback=lambda report, error: self.on_import_checked(
+                                   filename, report, error))
+            
+    def on_import_checked(self, filename, report, error):
+        """Ask to confirm an import after its dry run"""
+        if error is not None or report.errors or not report.changes():
+            self.import_button.config(state=tk.NORMAL, text="Import...")
+            if error is not None or report.errors:
+                messagebox.showerror("Error", f"Cannot import {filename}: "
+                                     f"{error or '; '.join(report.errors[:5])}")
+            else:
+                messagebox.showinfo("Import", f"Nothing to import.\n\n{report.summary()}")
+            return
+        details = [report.summary()]
+        if report.replaced:
+            details.append("Replaces: " + ", ".join(sorted(report.replaced)[:10]))
+        if report.invalid_paths:
+            details.append("Skips missing: " + ", ".join(sorted(report.invalid_paths)[:10]))
+        if not messagebox.askyesno("Confirm Import", "\n\n".join(details) + "\n\nImport now?"):
+            self.import_button.config(state=tk.NORMAL, text="Import...")
+            return
+        self.import_button.config(text="Importing...")
+        self.bridge.submit(self.mapper.import_mappings, filename,
+                           callback=self.on_imported)
+        
+    def on_imported(self, report, error):
+        """Show the result of an import made in the background"""
+        self.import_button.config(state=tk.NORMAL, text="Import...")
+        if error is None and report.committed:
+            self.refresh_mappings()
+            messagebox.showinfo("Success", report.summary())
+        else:
+            messagebox.showerror("Error", "Failed to import mappings")
+            
+    def export_mappings(self):
+        """Export the active profile's mappings to a file"""
+        from tkinter import filedialog  # only needed when browsing
+        
+        filename = filedialog.asksaveasfilename(
+            title="Export Mappings", defaultextension=".jsonl",
+            filetypes=(("JSON Lines", "*.jsonl"), ("CSV", "*.csv"))
+        )
+        if filename:
+            self.bridge.submit(self.mapper.export_mappings, filename,
+                               callback=lambda count, error: self.on_exported(
+                                   filename, count, error))
+            
+    def on_exported(self, filename, count, error):
+        """Show the result of an export made in the background"""
+        if error is None and count >= 0:
+            messagebox.showinfo("Success", f"Exported {count} mappings to {filename}")
+        else:
+            messagebox.showerror("Error", "Failed to export mappings")
+            
     def start_mapping(self):
         """Start key mapping"""
         if not self.mapper.get_all_mappings():
             messagebox.showwarning("Warning", "No mappings defined. Add some mappings first.")
             return
             
-        if self.mapper.start_mapping():
-            self.start_button.config(state=tk.DISABLED)
-            self.stop_button.config(state=tk.NORMAL)
-            self.status_label.config(text="Status: Active", foreground="green")
+        self.start_button.config(state=tk.DISABLED, text="Starting...")
+        self.status_label.config(text="Status: Starting...", foreground="orange")
+        self.bridge.submit(self.mapper.start_mapping, callback=self.on_mapping_started)
+        
+    def on_mapping_started(self, started, error):
+        """Show the result of starting key mapping"""
+        self.start_button.config(text="Start Mapping")
+        if started:
+            self.set_active(True)
             messagebox.showinfo("Success", "Key mapping started successfully!")
         else:
+            self.set_active(False)
             messagebox.showerror("Error", "Failed to start key mapping")
             
     def stop_mapping(self):
         """Stop key mapping"""
-        if self.mapper.stop_mapping():
-            self.start_button.config(state=tk.NORMAL)
-            self.stop_button.config(state=tk.DISABLED)
-            self.status_label.config(text="Status: Stopped", foreground="red")
+        self.stop_button.config(state=tk.DISABLED, text="Stopping...")
+        self.status_label.config(text="Status: Stopping...", foreground="orange")
+        self.bridge.submit(self.mapper.stop_mapping, callback=self.on_mapping_stopped)
+        
+    def on_mapping_stopped(self, stopped, error):
+        """Show the result of stopping key mapping"""
+        self.stop_button.config(text="Stop Mapping")
+        if stopped:
+            self.set_active(False)
             messagebox.showinfo("Success", "Key mapping stopped")
         else:
+            self.set_active(self.mapper.is_mapping_active())
             messagebox.showerror("Error", "Failed to stop key mapping")
             
     def restore_original(self):
         """Restore original key mappings"""
         if messagebox.askyesno("Confirm", 
                               "This will remove all custom mappings. Are you sure?"):
-            if self.mapper.restore_original():
-                self.refresh_mappings()
-                self.start_button.config(state=tk.NORMAL)
-                self.stop_button.config(state=tk.DISABLED)
-                self.status_label.config(text="Status: Stopped", foreground="red")
-                messagebox.showinfo("Success", "All mappings restored to original")
-            else:
-                messagebox.showerror("Error", "Failed to restore mappings")
-                
+            self.restore_button.config(state=tk.DISABLED, text="Restoring...")
+            self.bridge.submit(self.mapper.restore_original, callback=self.on_restored)
+            
+    def on_restored(self, restored, error):
+        """Show the result of restoring original mappings"""
+        self.restore_button.config(state=tk.NORMAL, text="Restore Original")
+        if restored:
+            self.refresh_profiles()
+            self.refresh_mappings()
+            self.set_active(False)
+            messagebox.showinfo("Success", "All mappings restored to original")
+        else:
+            messagebox.showerror("Error", "Failed to restore mappings")
+            
+    def refresh_profiles(self):
+        """Show the current profile names and the active profile"""
+        self.profile_combo['values'] = list(self.mapper.get_profiles())
+        self.profile_var.set(self.mapper.active_profile)
+        
+    def switch_profile(self):
+        """Switch to the profile picked in the selector"""
+        name = self.profile_var.get()
+        if name != self.mapper.active_profile:
+            self.profile_combo.config(state=tk.DISABLED)
+            self.bridge.submit(self.mapper.switch_profile, name, callback=self.on_profile_switched)
+            
+    def on_profile_switched(self, switched, error):
+        """Show the mappings of the newly active profile"""
+        self.profile_combo.config(state='readonly')
+        if switched:
+            self.mapper.schedule_save()
+        else:
+            messagebox.showerror("Error", "Failed to switch profile")
+        self.refresh_profiles()
+        self.refresh_mappings()
+        
+    def create_profile(self):
+        """Create a profile inheriting the active one's mappings"""
+        from tkinter import simpledialog  # only needed when creating a profile
+        
+        name = simpledialog.askstring("New Profile",
+                                      f"Name of the new profile (inherits "
+                                      f"'{self.mapper.active_profile}'):", parent=self.root)
+        if not name or not name.strip():
+            return
+        name = name.strip()
+        # Precompiling the new profile's dispatch table can take a while
+        self.new_profile_button.config(state=tk.DISABLED, text="Creating...")
+        self.bridge.submit(self.mapper.create_profile, name, self.mapper.active_profile,
+                           callback=lambda created, error: self.on_profile_created(
+                               name, created, error))
+        
+    def on_profile_created(self, name, created, error):
+        """Show the result of a profile created in the background"""
+        self.new_profile_button.config(state=tk.NORMAL, text="New Profile...")
+        if created:
+            self.mapper.schedule_save()
+            self.refresh_profiles()
+        else:
+            messagebox.showerror("Error", f"Could not create profile '{name}'")
+            
+    def set_active(self, active: bool):
+        """Update the start/stop buttons and status for the mapping state"""
+        if active:
+            self.start_button.config(state=tk.DISABLED)
+            self.stop_button.config(state=tk.NORMAL)
+            self.status_label.config(text="Status: Active", foreground="green")
+        else:
+            self.start_button.config(state=tk.NORMAL)
+            self.stop_button.config(state=tk.DISABLED)
+            self.status_label.config(text="Status: Stopped", foreground="red")
+            
+    def show_stats(self):
+        """Open the live latency stats panel"""
+        if self.stats_window is not None:
+            self.stats_window.lift()
+            return
+            
+        self.stats_window = tk.Toplevel(self.root)
+        self.stats_window.title("Latency Stats")
+        self.stats_window.geometry("700x300")
+        self.stats_window.protocol("WM_DELETE_WINDOW", self.close_stats)
+        self.stats_window.columnconfigure(0, weight=1)
+        self.stats_window.rowconfigure(0, weight=1)
+        
+        columns = ('Key Combination', 'Stage', 'Count', 'p50 (ms)', 'p95 (ms)', 'p99 (ms)')
+        self.stats_tree = ttk.Treeview(self.stats_window, columns=columns, show='headings')
+        for column in columns:
+            self.stats_tree.heading(column, text=column)
+            self.stats_tree.column(column, width=90 if column != 'Key Combination' else 180)
+        self.stats_tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=10, pady=10)
+        
+        self.refresh_stats()
+        
+    def refresh_stats(self):
+        """Refresh the latency stats panel once a second while it is open"""
+        if self.stats_window is None:
+            return
+            
+        for item in self.stats_tree.get_children():
+            self.stats_tree.delete(item)
+        for key_combo, stages in sorted(self.mapper.get_latency_stats().items()):
+            for stage, stats in stages.items():
+                self.stats_tree.insert('', tk.END, values=(
+                    key_combo, stage, stats['count'],
+                    f"{stats['p50']:.2f}", f"{stats['p95']:.2f}", f"{stats['p99']:.2f}"))
+                    
+        self.stats_job = self.root.after(1000, self.refresh_stats)
+        
+    def close_stats(self):
+        """Close the latency stats panel"""
+        if self.stats_job is not None:
+            self.root.after_cancel(self.stats_job)
+            self.stats_job = None
+        self.stats_window.destroy()
+        self.stats_window = None
+        
+    def reload_mappings(self):
+        """Reload mappings from the config file and refresh the display"""
+        self.refresh_button.config(state=tk.DISABLED, text="Reloading...")
+        self.bridge.submit(self.mapper.reload_mappings, callback=self.on_reloaded)
+        
+    def on_reloaded(self, reloaded, error):
+        """Show the reloaded mappings"""
+        self.refresh_button.config(state=tk.NORMAL, text="Refresh")
+        self.refresh_profiles()
+        self.refresh_mappings()
+        
+    def undo_edit(self):
+        """Revert the last journaled edit"""
+        self.undo_button.config(state=tk.DISABLED, text="Undoing...")
+        self.bridge.submit(self.mapper.undo, callback=self.on_undone)
+        
+    def on_undone(self, record, error):
+        """Show the mappings after an undo made in the background"""
+        self.undo_button.config(state=tk.NORMAL, text="Undo")
+        if record is None:
+            messagebox.showinfo("Undo", "Nothing to undo")
+            return
+        self.refresh_profiles()
+        self.refresh_mappings()
+        
+    def poll_bridge(self):
+        """Deliver finished background commands on the Tk thread"""
+        self.bridge.poll()
+        self.root.after(50, self.poll_bridge)
+        
+    def poll_config_reload(self):
+        """Refresh the display after the config file was reloaded in the background"""
+        if self.config_reloaded.is_set():
+            self.config_reloaded.clear()
+            self.refresh_profiles()
+            self.refresh_mappings()
+        self.root.after(500, self.poll_config_reload)
+        
+    def poll_path_status(self):
+        """Redraw the list after the background path check found changes"""
+        if self.paths_changed.is_set():
+            self.paths_changed.clear()
+            self.mapping_view.broken = self.mapper.get_broken_paths()
+            self.mapping_view.render()
+        self.root.after(1000, self.poll_path_status)
+        
     def refresh_mappings(self):
         """Refresh the mappings display"""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-            
-        # Add current mappings
+        # Apply only the rows that changed, then redraw the visible window
         mappings = self.mapper.get_all_mappings()
-        for key_combo, app_path in sorted(mappings.items()):
-            self.tree.insert('', tk.END, values=(key_combo, app_path))
+        self.mapping_model.sync(mappings)
+        self.search_index.sync(mappings)
+        self.apply_search()
+        
+    def apply_search(self, scroll_to_top: bool = False):
+        """Filter the mappings list to the current search"""
+        query = self.search_var.get()
+        self.mapping_model.set_filter(self.search_index.search(query) if query.strip() else None)
+        if scroll_to_top:
+            self.mapping_view.offset = 0
+        self.mapping_view.render()
+            
+    def on_first_window(self):
+        """Record time to first window; finish a requested startup report"""
+        startup.mark(startup.FIRST_WINDOW)
+        path = startup.report_path()
+        if path is None:
+            return
+            
+        def finish(result=None, error=None):
+            startup.write_report(path)
+            self.on_closing()
+            
+        if self.mapper.get_all_mappings():
+            self.bridge.submit(self.mapper.start_mapping, callback=finish)
+        else:
+            finish()
             
     def on_closing(self):
         """Handle window close event"""
-        if self.mapper.is_mapping_active():
-            self.mapper.stop_mapping()
+        self.bridge.close(timeout=5)
+        self.mapper.shutdown()
         self.root.destroy()
 
 
@@ -246,6 +706,7 @@ def main():
     """Main entry point"""
     root = tk.Tk()
     app = KeyMapperGUI(root)
+    root.after_idle(app.on_first_window)
     root.mainloop()
 
 
@@ -0,0 +1,152 @@
+"""
+Process reuse - track applications started by Key Mapper so a trigger can
+focus a running instance instead of starting another one
+"""
+
+import os
+import logging
+import threading
+from typing import Dict, List, Optional
+
+from lazy import LazyModule
+
+ctypes = LazyModule('ctypes')  # only needed to focus windows on Windows
+
+logger = logging.getLogger(__name__)
+
+# What a trigger does while the mapped application is still running
+INSTANCE_MULTI = 'multi'  # start another instance (the default)
+INSTANCE_FOCUS = 'focus'  # bring the running instance's window to the front
+INSTANCE_IGNORE = 'ignore'  # do nothing
+
+INSTANCE_MODES = (INSTANCE_MULTI, INSTANCE_FOCUS, INSTANCE_IGNORE)
+
+GW_OWNER = 4
+SW_SHOW = 5
+SW_RESTORE = 9
+
+
+class InstanceTracker:
+    """Processes started by Key Mapper, per application path
+
+    Liveness is checked with ``Popen.poll()``, a non-blocking wait that also
+    reaps the process once it has exited. A background thread polls every
+    tracked process each ``reap_interval`` seconds, so exited processes are
+    dropped (and never linger as zombies) even if their mapping is never
+    triggered again.
+    """
+
+    def __init__(self, reap_interval: float = 5.0):
+        self.reap_interval = reap_interval
+        self._processes: Dict[str, List[object]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def track(self, app_path: str, process):
+        """Remember a process started for app_path; None (no handle) is ignored"""
+        if process is None:
+            return
+        with self._lock:
+            self._processes.setdefault(app_path, []).append(process)
+            if self._thread is None and self.reap_interval > 0:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="instance-reaper",
+                                                daemon=True)
+                self._thread.start()
+
+    def running(self, app_path: str):
+        """Return the oldest live process started for app_path, or None"""
+        with self._lock:
+            processes = self._processes.get(app_path)
+            if not processes:
+                return None
+            alive = [process for process in processes if process.poll() is None]
+            if alive:
+                self._processes[app_path] = alive
+                return alive[0]
+            del self._processes[app_path]
+            return None
+
+    def reap(self) -> int:
+        """Drop every tracked process that has exited; return how many were dropped"""
+        reaped = 0
+        with self._lock:
+            for app_path in list(self._processes):
+                processes = self._processes[app_path]
+                alive = [process for process in processes if process.poll() is None]
+                reaped += len(processes) - len(alive)
+                if alive:
+                    self._processes[app_path] = alive
+                else:
+                    del self._processes[app_path]
+        return reaped
+
+    def _run(self):
+        """Reaper loop"""
+        while not self._stop.wait(self.reap_interval):
+            try:
+                self.reap()
+            except Exception as e:
+                logger.error(f"Error reaping processes: {e}")
+
+    def stop(self):
+        """Stop the reaper thread; tracked processes keep running"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+
+    def __len__(self) -> int:
+        return sum(len(processes) for processes in self._processes.values())
+
+
+def _find_window(pid: int, visible_only: bool = True):
+    """Return an unowned top-level window of process pid, or None (Windows only)"""
+    user32 = ctypes.windll.user32
+    found = []
+
+    @ctypes.WINFUNCTYPE(ctypes.c_bool, ctypes.c_void_p, ctypes.c_void_p)
+    def visit(hwnd, lparam):
+        owner = ctypes.c_ulong()
+        user32.GetWindowThreadProcessId(hwnd, ctypes.byref(owner))
+        if (owner.value == pid and not user32.GetWindow(hwnd, GW_OWNER) and
+                (not visible_only or user32.IsWindowVisible(hwnd))):
+            found.append(hwnd)
+            return False  # stop enumerating
+        return True
+
+    user32.EnumWindows(visit, 0)
+    return found[0] if found else None
+
+
+def focus_process(pid: int) -> bool:
+    """Bring a visible top-level window of process pid to the front
+
+    Only supported on Windows; returns False when no window was focused.
+    """
+    if os.name != 'nt':
+        return False
+    hwnd = _find_window(pid)
+    if hwnd is None:
+        return False
+    user32 = ctypes.windll.user32
+    if user32.IsIconic(hwnd):
+        user32.ShowWindow(hwnd, SW_RESTORE)
+    return bool(user32.SetForegroundWindow(hwnd))
+
+
+def show_process(pid: int) -> bool:
+    """Show and focus the window of a process that was started hidden
+
+    Only supported on Windows; returns False when no window was shown.
+    """
+    if os.name != 'nt':
+        return False
+    hwnd = _find_window(pid, visible_only=False)
+    if hwnd is None:
+        return False
+    user32 = ctypes.windll.user32
+    user32.ShowWindow(hwnd, SW_SHOW)
+    return bool(user32.SetForegroundWindow(hwnd))
@@ -0,0 +1,264 @@
+"""
+Change journal - append-only log of mapping edits, folded into the config
+file by compaction and replayed on top of it when loading
+"""
+
+import os
+import copy
+import time
+import secrets
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from lazy import LazyModule
+from persistence import atomic_write_bytes
+from profiles import DEFAULT_PROFILE
+
+json = LazyModule('json')  # not needed while the journal is empty
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_SUFFIX = '.journal'
+JOURNAL_ENV = 'KEYMAPPER_JOURNAL'  # set to turn the GUI's journal on
+DEFAULT_COMPACT_THRESHOLD = 200  # journaled edits that trigger a compaction
+DEFAULT_HISTORY = 100  # compacted records kept for auditing and undo
+
+# Journal sections besides 'profile:<name>', which holds one profile's own mappings
+SECTIONS = ('mappings', 'original_mappings', 'instance_modes', 'prewarm', 'profiles',
+            'active_profile')
+PROFILE_SECTION = 'profile:'
+
+Location = Tuple[str, Optional[str]]  # (section, key), key None for scalar sections
+
+_MISSING = object()  # an entry that does not exist
+
+
+def diff_state(before: Dict[Location, object], after: Dict[Location, object]) -> List[dict]:
+    """Return the changes turning before into after
+
+    Each change is ``{"s": section, "k": key, "o": old, "n": new}``; "o" or
+    "n" is left out when the entry did not exist before or after.
+    """
+    changes = []
+    for location in dict.fromkeys([*before, *after]):
+        old, new = before.get(location, _MISSING), after.get(location, _MISSING)
+        if old == new:
+            continue
+        section, key = location
+        change = {'s': section, 'k': key}
+        if old is not _MISSING:
+            change['o'] = old
+        if new is not _MISSING:
+            change['n'] = new
+        changes.append(change)
+    return changes
+
+
+def invert(changes: Iterable[dict]) -> List[dict]:
+    """Return the changes that revert changes"""
+    inverted = []
+    for change in changes:
+        inverse = {'s': change['s'], 'k': change['k']}
+        if 'n' in change:
+            inverse['o'] = change['n']
+        if 'o' in change:
+            inverse['n'] = change['o']
+        inverted.append(inverse)
+    return inverted
+
+
+def apply_changes(config: dict, changes: Iterable[dict], field: str = 'n'):
+    """Apply the new ('n') or, for undo, the old ('o') side of changes to a
+    config in the form returned by KeyMapper's config reader"""
+    for change in changes:
+        section, key = change['s'], change['k']
+        if section == 'active_profile':
+            config['active_profile'] = change.get(field, DEFAULT_PROFILE)
+            continue
+        if section.startswith(PROFILE_SECTION):
+            profile = config['profiles'].get(section[len(PROFILE_SECTION):])
+            if profile is None:
+                logger.warning(f"Skipping journaled change to unknown {section}")
+                continue
+            entries = profile['mappings']
+        elif section in SECTIONS:
+            entries = config[section]
+        else:
+            logger.warning(f"Skipping journaled change to unknown section {section}")
+            continue
+        if field in change:
+            entries[key] = copy.deepcopy(change[field])  # records stay unchanged
+        else:
+            entries.pop(key, None)
+
+
+class Journal:
+    """Append-only JSON Lines log of edits next to the config file
+
+    Each record is ``{"seq": n, "ts": time, "op": name, "changes": [...]}``,
+    with ``"undoes": seq`` on undo records. A record with ``"barrier": true``
+    and no changes stands for a change the journal does not hold, such as an
+    import; undo stops there. Appending writes and fsyncs one
+    line, so an edit costs the same whatever the size of the config. The
+    config file stores the ``journal_seq`` it already contains; records after
+    it are replayed on load, and compaction drops all but the last
+    ``history`` records it covers, which stay for auditing and undo.
+
+    The first line, ``{"epoch": id, "saved": seq}``, names the journal and
+    the newest record compaction has written to a config file. The config
+    file stores the ``journal_epoch`` it continues, so records are never
+    replayed onto a file that was written without this journal; rotate()
+    starts a new journal for such a file, and unsaved() returns the records
+    that would be lost with the old one.
+
+    Only one process may use a journal: appends are not locked against other
+    processes, and another process's records would be invisible until it
+    compacts.
+    """
+
+    def __init__(self, config_file: Union[str, Path], history: int = DEFAULT_HISTORY):
+        config_file = Path(config_file)
+        self.path = config_file.with_name(config_file.name + JOURNAL_SUFFIX)
+        self.history = history
+        self.records: List[dict] = []
+        self.last_seq = 0
+        self.epoch: Optional[str] = None
+        self.saved = 0  # the newest record a config file holds
+        self._lock = threading.Lock()
+        self._file = None
+        self._load()
+        if self.epoch is None:
+            self.epoch = secrets.token_hex(8)
+
+    def _load(self):
+        """Read the records already on disk; a torn last line is dropped"""
+        try:
+            with open(self.path, 'rb') as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if number == 1 and isinstance(record, dict) and 'seq' not in record:
+                    self.epoch = str(record['epoch'])
+                    self.saved = int(record.get('saved', 0))
+                    continue
+                seq = int(record['seq'])
+                if not isinstance(record['changes'], list):
+                    raise ValueError("changes must be a list")
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Skipping unreadable journal line {number} in {self.path}: {e}")
+                continue
+            self.records.append(record)
+            self.last_seq = max(self.last_seq, seq)
+
+    def append(self, op: str, changes: List[dict], undoes: Optional[int] = None,
+               barrier: bool = False) -> dict:
+        """Durably log one edit and return its record"""
+        with self._lock:
+            record = {'seq': self.last_seq + 1, 'ts': time.time(), 'op': op, 'changes': changes}
+            if undoes is not None:
+                record['undoes'] = undoes
+            if barrier:
+                record['barrier'] = True
+            line = json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n'
+            if self._file is None:
+                self._file = open(self.path, 'ab')
+                if self._file.tell() == 0:
+                    self._file.write(self._header())
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.last_seq = record['seq']
+            self.records.append(record)
+        return record
+
+    def _header(self) -> bytes:
+        return json.dumps({'epoch': self.epoch, 'saved': self.saved}).encode('utf-8') + b'\n'
+
+    def matches(self, config: dict) -> bool:
+        """Whether the records continue config: it names this journal and no
+        record after its journal_seq is missing"""
+        if config.get('journal_epoch') != self.epoch:
+            return False
+        snapshot = config.get('journal_seq', 0)
+        if snapshot > self.last_seq:
+            return False
+        newer = [record['seq'] for record in self.records if record['seq'] > snapshot]
+        return not newer or newer[0] == snapshot + 1
+
+    def replay(self, config: dict) -> int:
+        """Apply the records newer than the config's journal_seq; return how many"""
+        snapshot = config.get('journal_seq', 0)
+        records = [record for record in self.records if record['seq'] > snapshot]
+        for record in records:
+            apply_changes(config, record['changes'])
+        return len(records)
+
+    def unsaved(self) -> List[dict]:
+        """Return the records no config file holds yet"""
+        return [record for record in self.records if record['seq'] > self.saved]
+
+    def pending(self, snapshot: int) -> int:
+        """Return how many records are newer than snapshot"""
+        return sum(1 for record in self.records if record['seq'] > snapshot)
+
+    def compact(self, snapshot: int):
+        """Drop the records the config file now contains, except the recent history"""
+        with self._lock:
+            covered = [record for record in self.records if record['seq'] <= snapshot]
+            newer = [record for record in self.records if record['seq'] > snapshot]
+            kept = covered[-self.history:] if self.history > 0 else []
+            records = kept + newer
+            self.saved = max(self.saved, snapshot)
+            payload = self._header() + b''.join(
+                json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n'
+                for record in records)
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            atomic_write_bytes(self.path, payload)
+            self.records = records
+        logger.info(f"Compacted journal: {len(covered) - len(kept)} records folded, "
+                    f"{len(records)} kept")
+
+    def rotate(self):
+        """Start a new, empty journal under a new epoch, dropping every record;
+        the caller must first fold unsaved() records into the config"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self.epoch = secrets.token_hex(8)
+            self.saved = 0
+            atomic_write_bytes(self.path, self._header())
+            self.records = []
+            self.last_seq = 0
+        logger.info(f"Started journal {self.epoch} in {self.path}")
+
+    def recent(self, limit: int = 20) -> List[dict]:
+        """Return up to limit records, newest first"""
+        return list(reversed(self.records[-limit:])) if limit > 0 else []
+
+    def last_undoable(self) -> Optional[dict]:
+        """Return the newest edit that is not an undo and has not been undone,
+        or None if a barrier comes first"""
+        undone = {record['undoes'] for record in self.records if 'undoes' in record}
+        for record in reversed(self.records):
+            if record.get('barrier'):
+                return None
+            if 'undoes' not in record and record['seq'] not in undone:
+                return record
+        return None
+
+    def close(self):
+        """Close the journal file"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
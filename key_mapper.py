@@ -2,100 +2,858 @@
 Key Mapper - Map keyboard keys to launch Windows applications
 """
 
-import os
-import json
-import subprocess
 import threading
-from pathlib import Path
-from typing import Dict, Optional
-import keyboard
+import time
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 import logging
 
+import startup
+from lazy import LazyModule
+from bulk import (ImportReport, Source, check_paths, detect_format, open_text, read_records,
+                  write_records)
+from combos import Conflict, ConflictIndex, canonical_combo, describe_conflict
+from dispatcher import (DEFAULT_SEQUENCE_TIMEOUT, DispatchTable, EventSource, HotkeyDispatcher,
+                        parse_sequence)
+from executor import LaunchExecutor
+from journal import (DEFAULT_COMPACT_THRESHOLD, PROFILE_SECTION, Journal, Location,
+                     apply_changes, diff_state, invert)
+from instances import (INSTANCE_FOCUS, INSTANCE_MODES, INSTANCE_MULTI, InstanceTracker,
+                       focus_process, show_process)
+from launcher import LaunchPlanCache, execute_plan
+from mapping_table import Mapping, MappingTable
+from metrics import LatencyMetrics, MetricsReporter
+from pathcheck import DEFAULT_INTERVAL, PathValidator
+from persistence import DebouncedWriter
+from prewarm import DEFAULT_IDLE_TIMEOUT, PrewarmPool, PrewarmSettings
+from profiles import (DEFAULT_PROFILE, Profile, ProfileError, build_profiles, effective_value,
+                      profile_chain, resolve_mappings)
+from storage import MappingStore, open_store
+from watcher import ConfigWatcher
+
+# Loaded on first use: hotkey mode only needs keyboard once mapping starts
+keyboard = LazyModule('keyboard')
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Dispatch modes
+DISPATCH_HOTKEY = 'hotkey'  # one keyboard.add_hotkey registration per mapping
+DISPATCH_HOOK = 'hook'  # one low-level hook resolved through a DispatchTable
+
 
 class KeyMapper:
-    """Manages keyboard key mappings to applications"""
+    """Manages keyboard key mappings to applications
+
+    Concurrency model: every state change runs under ``lock``, a re-entrant
+    lock, so there is one writer at a time and a public method may call
+    another without deadlocking. Writers never modify what they publish:
+    ``mappings`` (a MappingTable) and the dispatcher's DispatchTable are
+    immutable snapshots, replaced by a single reference assignment. The hook
+    thread, hotkey handlers, the GUI and the daemon read the current
+    snapshot without taking the lock. ``save_lock`` is always taken before
+    ``lock``, never while holding it. Journal records are appended under
+    ``lock``, so the journal lists edits in the order they were applied.
+    """
     
-    def __init__(self, config_file: str = "key_mappings.json"):
-        self.config_file = Path(config_file)
-        self.mappings: Dict[str, str] = {}
+    def __init__(self, config_file: str = "key_mappings.json",
+                 dispatch_mode: str = DISPATCH_HOTKEY,
+                 event_source: Optional[EventSource] = None,
+                 executor: Optional[LaunchExecutor] = None,
+                 save_delay: float = 0.5,
+                 use_cache: bool = False,
+                 sequence_timeout: float = DEFAULT_SEQUENCE_TIMEOUT,
+                 journal: bool = False,
+                 compact_threshold: int = DEFAULT_COMPACT_THRESHOLD,
+                 store: Optional[MappingStore] = None):
+        if dispatch_mode not in (DISPATCH_HOTKEY, DISPATCH_HOOK):
+            raise ValueError(f"Unknown dispatch mode: {dispatch_mode}")
+        # JSON by default, SQLite for .db/.sqlite config files
+        self.store = store or open_store(config_file, use_cache)
+        self.config_file = self.store.path
+        self.mappings = MappingTable()  # effective mappings of the active profile
         self.original_mappings: Dict[str, str] = {}
-        self.active_hooks = []
+        self.base_mappings: Dict[str, str] = {}  # the default profile's own mappings
+        self.profiles: Dict[str, Profile] = {}
+        self.active_profile = DEFAULT_PROFILE
+        # Resolved mappings and, in hook mode, compiled tables of inactive profiles
+        self.profile_mappings: Dict[str, MappingTable] = {}
+        self.profile_tables: Dict[str, DispatchTable] = {}
+        # What a trigger does while its application is running, for non-default modes
+        self.instance_modes: Dict[str, str] = {}
+        # Idle instances to keep ready, for mappings that opted in
+        self.prewarm_settings: Dict[str, PrewarmSettings] = {}
+        # Conflict index of the active mappings, built on first use
+        self._conflicts: Optional[ConflictIndex] = None
+        self.active_hooks: Dict[str, object] = {}
         self.is_active = False
-        self.lock = threading.Lock()
+        self.lock = threading.RLock()
+        self.dispatch_mode = dispatch_mode
+        self.sequence_timeout = sequence_timeout
+        self.dispatcher: Optional[HotkeyDispatcher] = None
+        if dispatch_mode == DISPATCH_HOOK:
+            self.dispatcher = HotkeyDispatcher(event_source)
+            self.dispatcher.set_table(DispatchTable(sequence_timeout=sequence_timeout))
+        self.executor = executor or LaunchExecutor()
+        self.launch_plans = LaunchPlanCache()
+        self.path_validator = PathValidator()
+        self.instances = InstanceTracker()
+        self.prewarm = PrewarmPool(self.launch_plans.get)
+        self.metrics = LatencyMetrics()
+        self.metrics_reporter: Optional[MetricsReporter] = None
+        self.save_lock = threading.Lock()
+        self.writer = DebouncedWriter(self.save_mappings, save_delay)
+        # With a journal, edits are appended to it and the config file is only
+        # rewritten by compaction or by changes the journal does not cover.
+        # Incremental stores only write changed rows and need none.
+        self.journal = (Journal(self.config_file)
+                        if journal and not self.store.incremental else None)
+        self.compact_threshold = compact_threshold
+        self.journal_seq = 0  # the journal record the config file is current with
+        self._unjournaled = False
+        # Edits made under the lock, and how many of them the config file holds
+        self._edits = 0
+        self._saved_edits = 0
+        self.watcher: Optional[ConfigWatcher] = None
+        self.reload_callback: Optional[Callable[[], None]] = None
         
         # Load mappings if config file exists
         self.load_mappings()
         
+    def _read_config(self) -> dict:
+        """Read the validated config from the store
+
+        Returns a dict with mappings, original_mappings, profiles (in their
+        config form, mappings None until read), active_profile,
+        instance_modes, prewarm and journal_seq, with newer journal records
+        already applied. A config written without this mapper's journal (by
+        hand, another process or a restored backup) is taken as it is and
+        the journal is rotated, so its records are not replayed onto it.
+        The caller must hold save_lock and the lock.
+        """
+        exists = self.store.exists()
+        config = self.store.read()
+        if self.journal is not None:
+            if not exists:
+                # Nothing is stored yet, so the journal holds every edit
+                config['journal_epoch'] = self.journal.epoch
+            if self.journal.matches(config):
+                replayed = self.journal.replay(config)
+                if replayed:
+                    logger.info(f"Replayed {replayed} journaled edits")
+            else:
+                self._rotate_journal(config)
+        return config
+        
+    def _rotate_journal(self, config: dict):
+        """Start a new journal for a config it does not continue, and store
+        the config under the new journal's epoch
+
+        Records that never reached a config file are merged into config
+        first rather than dropped. The caller must hold save_lock.
+        """
+        unsaved = self.journal.unsaved()
+        if unsaved:
+            logger.error(f"{self.config_file} was not written with {self.journal.path}; "
+                         f"merging {len(unsaved)} journaled edits that were never saved "
+                         f"into it and starting a new journal")
+            for record in unsaved:
+                apply_changes(config, record['changes'])
+        else:
+            logger.warning(f"{self.config_file} was not written with "
+                           f"{self.journal.path}; starting a new journal")
+        self.journal.rotate()
+        config['journal_epoch'] = self.journal.epoch
+        config['journal_seq'] = 0
+        self.store.write(config)
+        if self.watcher is not None:
+            self.watcher.sync()
+        
+    def _has_config(self) -> bool:
+        """Whether there is a stored config or journaled edits to load"""
+        return self.store.exists() or bool(self.journal is not None and
+                                           self.journal.records)
+        
     def load_mappings(self) -> bool:
         """Load key mappings from config file"""
         try:
-            if self.config_file.exists():
-                with open(self.config_file, 'r') as f:
-                    data = json.load(f)
-                    self.mappings = data.get('mappings', {})
-                    self.original_mappings = data.get('original_mappings', {})
-                logger.info(f"Loaded {len(self.mappings)} key mappings")
-                return True
+            with self.save_lock, self.lock:
+                if not self._has_config():
+                    return False
+                config = self._read_config()
+                self.journal_seq = config.get('journal_seq', 0)
+                self.original_mappings = config['original_mappings']
+                self.base_mappings = config['mappings']
+                self.instance_modes = config['instance_modes']
+                self.prewarm_settings = self._prewarm_from_config(config['prewarm'])
+                self.profiles = build_profiles(config['profiles'], self.store.read_profile)
+                self.active_profile = self._known_profile(config['active_profile'])
+                self.mappings = MappingTable(resolve_mappings(self.base_mappings, self.profiles,
+                                                              self.active_profile))
+                self._prepare_profile_plans()
+            logger.info(f"Loaded {len(self.mappings)} key mappings "
+                        f"(profile {self.active_profile})")
+            return True
         except Exception as e:
             logger.error(f"Error loading mappings: {e}")
         return False
         
+    def reload_mappings(self) -> bool:
+        """Reload the config file, re-binding only the mappings that changed"""
+        return self._reload(keep_edits=False)
+        
+    def _reload(self, keep_edits: bool) -> bool:
+        """Read and apply the config file in one step under save_lock and the
+        lock, so no edit or save can come between; with keep_edits, do
+        nothing while there are edits the file or journal does not hold"""
+        try:
+            with self.save_lock, self.lock:
+                if keep_edits and self._has_unsaved_edits():
+                    # Our next save is newer than what is on disk and will replace it
+                    logger.warning("Config file changed while local edits are unsaved; "
+                                   "keeping local edits")
+                    return False
+                if self._has_config():
+                    config = self._read_config()
+                    self.journal_seq = config.get('journal_seq', 0)
+                    return self._apply_config(config)
+        except Exception as e:
+            logger.error(f"Error reloading mappings: {e}")
+        return False
+        
+    def _has_unsaved_edits(self) -> bool:
+        """Whether edits were made that neither the config file nor the
+        journal holds; the caller must hold the lock"""
+        if self.journal is not None:
+            return self._unjournaled
+        return self._edits != self._saved_edits
+        
+    def start_watching(self, callback: Optional[Callable[[], None]] = None,
+                       interval: float = 0.5, max_interval: float = 5.0):
+        """Reload the config file whenever it is changed outside this mapper
+
+        callback runs on the watcher thread after each successful reload.
+        """
+        if self.watcher is None:
+            self.reload_callback = callback
+            self.watcher = ConfigWatcher(self.store.watch_path, self._on_config_changed,
+                                         interval, max_interval,
+                                         signature=self.store.signature)
+            self.watcher.start()
+            logger.info(f"Watching {self.config_file} for changes")
+            
+    def stop_watching(self):
+        """Stop watching the config file"""
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+            
+    def _on_config_changed(self):
+        """Apply an external change to the config file"""
+        logger.info(f"Config file changed, reloading {self.config_file}")
+        if self._reload(keep_edits=True) and self.reload_callback is not None:
+            self.reload_callback()
+            
+    def _apply_config(self, config: dict) -> bool:
+        """Make a whole config (in _read_config form) current; the caller must hold the lock
+
+        The config is already on disk or journaled, so it is not marked unjournaled.
+        """
+        self.instance_modes = config['instance_modes']
+        self.prewarm_settings = self._prewarm_from_config(config['prewarm'])
+        return self._apply_mappings(config['mappings'], config['original_mappings'],
+                                    build_profiles(config['profiles'], self.store.read_profile),
+                                    config['active_profile'])
+        
+    def apply_mappings(self, mappings: Dict[str, str],
+                       original_mappings: Optional[Dict[str, str]] = None,
+                       profiles: Optional[Dict[str, Profile]] = None,
+                       active_profile: Optional[str] = None) -> bool:
+        """Replace the default profile's mappings (and optionally the profiles),
+        re-binding only the delta while active
+
+        The change is saved by the next save rather than journaled, and
+        undo does not reach past it.
+        """
+        with self.lock:
+            applied = self._apply_mappings(mappings, original_mappings, profiles,
+                                           active_profile)
+            if applied:
+                self._mark_unjournaled('apply')
+        return applied
+        
+    def _apply_mappings(self, mappings: Dict[str, str],
+                        original_mappings: Optional[Dict[str, str]] = None,
+                        profiles: Optional[Dict[str, Profile]] = None,
+                        active_profile: Optional[str] = None) -> bool:
+        """Replace the mapper's state as apply_mappings() does, without
+        marking it unjournaled"""
+        try:
+            with self.lock:
+                self.base_mappings = {canonical_combo(key_combo): app_path
+                                      for key_combo, app_path in mappings.items()}
+                if original_mappings is not None:
+                    self.original_mappings = {canonical_combo(key_combo): original
+                                              for key_combo, original
+                                              in original_mappings.items()}
+                if profiles is not None:
+                    self.profiles = dict(profiles)
+                if active_profile is not None:
+                    self.active_profile = self._known_profile(active_profile)
+                else:
+                    self.active_profile = self._known_profile(self.active_profile)
+                changed, removed = self._activate(resolve_mappings(
+                    self.base_mappings, self.profiles, self.active_profile))
+                self.profile_mappings.clear()
+                self.profile_tables.clear()
+                self._prepare_profile_plans()
+                if self.is_active:
+                    self._precompile_profiles()
+                self._sync_prewarm()
+            logger.info(f"Applied mappings: {len(changed)} added or changed, "
+                        f"{len(removed)} removed")
+            return True
+        except Exception as e:
+            logger.error(f"Error applying mappings: {e}")
+            return False
+            
+    def _activate(self, mappings: Dict[str, str]) -> Tuple[Dict[str, Mapping], list]:
+        """Make mappings the live set, re-binding the delta; the caller must hold the lock
+
+        Records of unchanged mappings carry over with their statistics.
+        """
+        previous = self.mappings
+        removed = [key_combo for key_combo in previous if key_combo not in mappings]
+        table = MappingTable()
+        changed = {}
+        for key_combo, app_path in mappings.items():
+            record = previous.record(key_combo)
+            if record is None or record.app_path != app_path:
+                record = changed[key_combo] = Mapping(key_combo, app_path)
+            table.records[key_combo] = record
+        self.mappings = table
+        if self._conflicts is not None:
+            for key_combo in removed:
+                self._conflicts.remove(key_combo)
+            for key_combo in changed:
+                self._conflicts.add(key_combo)
+        self.launch_plans.prepare(record.app_path for record in changed.values())
+        if self.is_active:
+            self._apply_bindings(changed, removed)
+        return changed, removed
+        
+    def _known_profile(self, name: str) -> str:
+        """Return name if it is a loaded profile, else the default profile"""
+        if name == DEFAULT_PROFILE or name in self.profiles:
+            return name
+        logger.warning(f"Unknown active profile {name}; using {DEFAULT_PROFILE}")
+        return DEFAULT_PROFILE
+        
+    def _layer(self, name: str) -> Dict[str, Optional[str]]:
+        """Return the mappings a profile stores itself"""
+        if name == DEFAULT_PROFILE:
+            return self.base_mappings
+        if name not in self.profiles:
+            raise ProfileError(f"Unknown profile: {name}")
+        return self.profiles[name].mappings
+        
+    def _prepare_profile_plans(self):
+        """Resolve launch plans for every application any profile can launch"""
+        self.launch_plans.prepare(self.base_mappings.values())
+        for profile in self.profiles.values():
+            if not profile.loaded:
+                continue
+            self.launch_plans.prepare(app_path for app_path in profile.mappings.values()
+                                      if app_path is not None)
+            
+    def _refresh_key(self, key_combo: str, edited: str):
+        """Re-resolve one key in every loaded profile that inherits from edited;
+        the caller must hold the lock"""
+        for name in [self.active_profile, *self.profile_mappings]:
+            if edited != DEFAULT_PROFILE and edited not in profile_chain(self.profiles, name):
+                continue
+            app_path = effective_value(self.base_mappings, self.profiles, name, key_combo)
+            mappings = self.mappings if name == self.active_profile else self.profile_mappings[name]
+            if mappings.get(key_combo) == app_path:
+                continue
+            if app_path is None:
+                mappings = mappings.updated(unbind=(key_combo,))
+                bind, unbind = {}, (key_combo,)
+            else:
+                mappings = mappings.updated({key_combo: app_path})
+                bind, unbind = {key_combo: mappings.record(key_combo)}, ()
+                
+            if name == self.active_profile:
+                self.mappings = mappings
+                if self._conflicts is not None:
+                    if app_path is None:
+                        self._conflicts.remove(key_combo)
+                    else:
+                        self._conflicts.add(key_combo)
+                if self.is_active:
+                    self._apply_bindings(bind, unbind)
+            else:
+                self.profile_mappings[name] = mappings
+                if name in self.profile_tables:
+                    self.profile_tables[name] = self.profile_tables[name].updated(
+                        self._create_handlers(bind), unbind)
+                    
+    def _create_handlers(self, records: Dict[str, Mapping]) -> Dict[str, Callable]:
+        return {key_combo: self._create_hotkey_handler(record)
+                for key_combo, record in records.items()}
+        
+    def _precompile_profiles(self):
+        """Resolve every inactive profile and, in hook mode, compile its dispatch
+        table, so that switching to it is a single table swap; the caller must
+        hold the lock"""
+        for name in [DEFAULT_PROFILE, *self.profiles]:
+            if name == self.active_profile:
+                continue
+            if name != DEFAULT_PROFILE and not self.profiles[name].loaded:
+                continue  # resolved and compiled when first switched to
+            if name not in self.profile_mappings:
+                self.profile_mappings[name] = MappingTable(
+                    resolve_mappings(self.base_mappings, self.profiles, name))
+            if self.dispatcher is not None and name not in self.profile_tables:
+                self.profile_tables[name] = DispatchTable.compile(
+                    self._create_handlers(self.profile_mappings[name].records),
+                    self.sequence_timeout)
+                    
+    def switch_profile(self, name: str) -> bool:
+        """Make another profile the active one
+        
+        In hook mode this swaps in the profile's precompiled dispatch table;
+        no hotkey is registered or removed. In hotkey mode only the
+        bindings that differ between the two profiles are re-registered.
+        """
+        try:
+            with self.lock:
+                if name != DEFAULT_PROFILE and name not in self.profiles:
+                    raise ProfileError(f"Unknown profile: {name}")
+                if name == self.active_profile:
+                    return True
+                    
+                previous, previous_mappings = self.active_profile, self.mappings
+                mappings = self.profile_mappings.pop(name, None)
+                if mappings is None:
+                    mappings = MappingTable(resolve_mappings(self.base_mappings,
+                                                             self.profiles, name))
+                table = self.profile_tables.pop(name, None)
+                
+                if self.is_active and self.dispatcher is not None:
+                    if table is None:
+                        table = DispatchTable.compile(self._create_handlers(mappings.records),
+                                                      self.sequence_timeout)
+                    self.profile_tables[previous] = self.dispatcher.table
+                    self.dispatcher.set_table(table)
+                    self.active_hooks = table.handlers
+                    self.mappings = mappings
+                    self._conflicts = None
+                else:
+                    self._activate(mappings)
+                self.profile_mappings[previous] = previous_mappings
+                self.active_profile = name
+                self._sync_prewarm()
+                self._record('switch_profile', diff_state(
+                    {('active_profile', None): previous}, {('active_profile', None): name}))
+            logger.info(f"Switched to profile {name}")
+            return True
+        except Exception as e:
+            logger.error(f"Error switching to profile {name}: {e}")
+            return False
+            
+    def create_profile(self, name: str, inherits: str = DEFAULT_PROFILE,
+                       mappings: Optional[Dict[str, Optional[str]]] = None) -> bool:
+        """Add an empty (or pre-filled) profile layered on top of inherits"""
+        try:
+            with self.lock:
+                if name == DEFAULT_PROFILE or name in self.profiles:
+                    raise ProfileError(f"Profile already exists: {name}")
+                if inherits != DEFAULT_PROFILE and inherits not in self.profiles:
+                    raise ProfileError(f"Unknown profile: {inherits}")
+                if mappings is not None:
+                    mappings = {canonical_combo(key_combo): app_path
+                                for key_combo, app_path in mappings.items()}
+                self.profiles[name] = Profile(name, inherits, mappings)
+                self.launch_plans.prepare(app_path for app_path in (mappings or {}).values()
+                                          if app_path is not None)
+                if self.is_active:
+                    self._precompile_profiles()
+                self._record('create_profile', diff_state(
+                    {}, {('profiles', name): self.profiles[name].to_config()}))
+            logger.info(f"Created profile {name} (inherits {inherits})")
+            return True
+        except Exception as e:
+            logger.error(f"Error creating profile {name}: {e}")
+            return False
+            
+    def delete_profile(self, name: str) -> bool:
+        """Delete a profile that is neither active nor inherited from"""
+        try:
+            with self.lock:
+                if name == DEFAULT_PROFILE or name == self.active_profile:
+                    raise ProfileError(f"Cannot delete the {name} profile while it is in use")
+                if name not in self.profiles:
+                    raise ProfileError(f"Unknown profile: {name}")
+                children = [other for other, profile in self.profiles.items()
+                            if profile.parent == name]
+                if children:
+                    raise ProfileError(f"Profile {name} is inherited by {', '.join(children)}")
+                deleted = self.profiles.pop(name)
+                self.profile_mappings.pop(name, None)
+                self.profile_tables.pop(name, None)
+                self._record('delete_profile', diff_state(
+                    {('profiles', name): deleted.to_config()}, {}))
+            logger.info(f"Deleted profile {name}")
+            return True
+        except Exception as e:
+            logger.error(f"Error deleting profile {name}: {e}")
+            return False
+            
+    def get_profiles(self) -> Dict[str, Optional[str]]:
+        """Get every profile name with the profile it inherits from"""
+        profiles: Dict[str, Optional[str]] = {DEFAULT_PROFILE: None}
+        profiles.update((name, profile.parent) for name, profile in self.profiles.items())
+        return profiles
+        
     def save_mappings(self) -> bool:
         """Save key mappings to config file"""
         try:
-            data = {
-                'mappings': self.mappings,
-                'original_mappings': self.original_mappings
-            }
-            with open(self.config_file, 'w') as f:
-                json.dump(data, f, indent=2)
-            logger.info(f"Saved {len(self.mappings)} key mappings")
+            with self.save_lock:
+                # Anything scheduled so far is covered by this write
+                self.writer.mark_clean()
+                with self.lock:
+                    config = self._config_form()
+                    edits = self._edits
+                    self._unjournaled = False
+                self.store.write(config)
+                self._saved_edits = edits
+                if self.watcher is not None:
+                    self.watcher.sync()
+                if self.journal is not None:
+                    # The records the file now contains only stay as history
+                    self.journal.compact(config['journal_seq'])
+                    self.journal_seq = config['journal_seq']
+            logger.info(f"Saved {len(config['mappings'])} key mappings")
             return True
         except Exception as e:
             logger.error(f"Error saving mappings: {e}")
             return False
             
-    def add_mapping(self, key_combo: str, app_path: str) -> bool:
-        """Add a new key to application mapping"""
+    def _config_form(self) -> dict:
+        """Return the current state in the form _read_config returns; the
+        caller must hold the lock"""
+        return {
+            'mappings': dict(self.base_mappings),
+            'original_mappings': dict(self.original_mappings),
+            # Profiles the store has not read yet are left as they are stored
+            'profiles': {name: profile.to_config() if profile.loaded
+                         else {'inherits': profile.parent, 'mappings': None}
+                         for name, profile in self.profiles.items()},
+            'active_profile': self.active_profile,
+            'instance_modes': dict(self.instance_modes),
+            'prewarm': {key_combo: settings._asdict()
+                        for key_combo, settings in self.prewarm_settings.items()},
+            'journal_seq': self.journal.last_seq if self.journal is not None else 0,
+            'journal_epoch': self.journal.epoch if self.journal is not None else None,
+        }
+        
+    def schedule_save(self):
+        """Save key mappings on a background thread once edits settle
+
+        With a journal, edits are already durable once made, so this only
+        saves changes the journal does not cover (see apply_mappings).
+        """
+        if self.journal is None or self._unjournaled:
+            self.writer.schedule()
+            
+    def _key_state(self, key_combo: str) -> Dict[Location, object]:
+        """Return everything stored for key_combo, by journal location; the
+        caller must hold the lock"""
+        state: Dict[Location, object] = {}
+        for section, entries in (('mappings', self.base_mappings),
+                                 ('original_mappings', self.original_mappings),
+                                 ('instance_modes', self.instance_modes)):
+            if key_combo in entries:
+                state[(section, key_combo)] = entries[key_combo]
+        settings = self.prewarm_settings.get(key_combo)
+        if settings is not None:
+            state[('prewarm', key_combo)] = settings._asdict()
+        for name, profile in self.profiles.items():
+            if profile.loaded and key_combo in profile.mappings:
+                state[(PROFILE_SECTION + name, key_combo)] = profile.mappings[key_combo]
+        return state
+        
+    def _record(self, op: str, changes: List[dict]):
+        """Append an edit to the journal and compact it once enough edits
+        pile up; the caller must hold the lock"""
+        if not changes:
+            return
+        self._edits += 1
+        if self.journal is None:
+            return
+        try:
+            self.journal.append(op, changes)
+        except Exception as e:
+            # Fall back to rewriting the whole config file
+            logger.error(f"Error journaling {op}: {e}")
+            self._unjournaled = True
+            self.writer.schedule()
+            return
+        if self.journal.last_seq - self.journal_seq >= self.compact_threshold:
+            self.writer.schedule()
+            
+    def _mark_unjournaled(self, op: str):
+        """Note a change the journal does not hold, so the next save writes
+        it and undo stops before it; the caller must hold the lock"""
+        self._edits += 1
+        self._unjournaled = True
+        if self.journal is None:
+            return
         try:
-            if not os.path.exists(app_path):
+            self.journal.append(op, [], barrier=True)
+        except Exception as e:
+            logger.error(f"Error journaling {op}: {e}")
+            
+    def undo(self) -> Optional[dict]:
+        """Revert the newest journaled edit that was not undone yet
+
+        The undo is journaled as well; returns the reverted record, or None
+        when there is nothing to undo, no journal, or an import, apply or
+        restore came after the edit.
+        """
+        if self.journal is None:
+            return None
+        try:
+            with self.lock:
+                record = self.journal.last_undoable()
+                if record is None:
+                    return None
+                config = self._config_form()
+                apply_changes(config, record['changes'], field='o')
+                if not self._apply_config(config):
+                    return None
+                self._edits += 1
+                self.journal.append('undo', invert(record['changes']), undoes=record['seq'])
+            logger.info(f"Undid {record['op']} (journal record {record['seq']})")
+            return record
+        except Exception as e:
+            logger.error(f"Error undoing last edit: {e}")
+            return None
+            
+    def get_history(self, limit: int = 20) -> List[dict]:
+        """Get up to limit journaled edits, newest first"""
+        return self.journal.recent(limit) if self.journal is not None else []
+        
+    def flush_mappings(self) -> bool:
+        """Write any scheduled save now"""
+        return self.writer.flush()
+            
+    def add_mapping(self, key_combo: str, app_path: str, profile: Optional[str] = None,
+                    instance_mode: Optional[str] = None) -> bool:
+        """Add a new key to application mapping, to the active profile by default
+
+        instance_mode, when given, also sets what the mapping does while its
+        application is already running (see set_instance_mode).
+        """
+        try:
+            key_combo = canonical_combo(key_combo)
+            if not self.path_validator.check(app_path):
                 logger.error(f"Application path does not exist: {app_path}")
                 return False
+            if instance_mode is not None and instance_mode not in INSTANCE_MODES:
+                logger.error(f"Unknown instance mode: {instance_mode}")
+                return False
                 
-            # Store original mapping if this is the first time
-            if key_combo not in self.original_mappings:
-                self.original_mappings[key_combo] = None  # No original mapping
+            with self.lock:
+                target = self.active_profile if profile is None else profile
+                layer = self._layer(target)
+                before = self._key_state(key_combo)
                 
-            self.mappings[key_combo] = app_path
+                # Store original mapping if this is the first time
+                if key_combo not in self.original_mappings:
+                    self.original_mappings[key_combo] = None  # No original mapping
+                    
+                layer[key_combo] = app_path
+                self.launch_plans.prepare((app_path,))
+                if instance_mode is not None:
+                    self._store_instance_mode(key_combo, instance_mode)
+                self._sync_prewarm()
+                
+                # Bind (or rebind) just this hotkey, in every profile that
+                # sees it, while the others stay live
+                self._refresh_key(key_combo, target)
+                self._record('add', diff_state(before, self._key_state(key_combo)))
+                conflicts = self._conflict_index().check(key_combo)
             logger.info(f"Added mapping: {key_combo} -> {app_path}")
+            for conflict in conflicts:
+                logger.warning(describe_conflict(conflict))
             return True
         except Exception as e:
             logger.error(f"Error adding mapping: {e}")
             return False
             
-    def remove_mapping(self, key_combo: str) -> bool:
-        """Remove a key mapping"""
+    def remove_mapping(self, key_combo: str, profile: Optional[str] = None) -> bool:
+        """Remove a key mapping, from the active profile by default
+        
+        A binding the profile inherits is hidden in that profile rather than
+        removed from the profile that defines it.
+        """
         try:
-            if key_combo in self.mappings:
-                del self.mappings[key_combo]
+            key_combo = canonical_combo(key_combo)
+            with self.lock:
+                target = self.active_profile if profile is None else profile
+                layer = self._layer(target)
+                if effective_value(self.base_mappings, self.profiles, target, key_combo) is None:
+                    return False
+                before = self._key_state(key_combo)
+                if target != DEFAULT_PROFILE and effective_value(
+                        self.base_mappings, self.profiles,
+                        self.profiles[target].parent, key_combo) is not None:
+                    layer[key_combo] = None
+                else:
+                    layer.pop(key_combo, None)
                 if key_combo in self.original_mappings:
                     del self.original_mappings[key_combo]
-                logger.info(f"Removed mapping: {key_combo}")
-                return True
+                self._refresh_key(key_combo, target)
+                forget = key_combo not in self.mappings
+                if not self._is_bound_anywhere(key_combo):
+                    self.instance_modes.pop(key_combo, None)
+                    self.prewarm_settings.pop(key_combo, None)
+                self._sync_prewarm()
+                self._record('remove', diff_state(before, self._key_state(key_combo)))
+            if forget:
+                self.metrics.forget(key_combo)
+            logger.info(f"Removed mapping: {key_combo}")
+            return True
         except Exception as e:
             logger.error(f"Error removing mapping: {e}")
         return False
         
+    def import_mappings(self, source: Source, fmt: Optional[str] = None,
+                        profile: Optional[str] = None, dry_run: bool = False,
+                        workers: int = 8) -> ImportReport:
+        """Import mappings from a JSON Lines or CSV file (path or open file)
+        
+        Records are streamed and validated first, with application paths
+        checked in parallel batches. Invalid records are reported and
+        skipped; the valid ones are applied to the profile (the active one by
+        default) in one step, only changed hotkeys are re-bound and the
+        config is saved once. A dry run only returns the report.
+        """
+        report = ImportReport(dry_run)
+        try:
+            fmt = detect_format(source, fmt)
+            records: Dict[str, str] = {}
+            with open_text(source, 'r') as f:
+                for line, key_combo, app_path in read_records(f, fmt, report.errors):
+                    reason = self._combo_error(key_combo)
+                    if reason is not None:
+                        report.invalid_combos[key_combo] = reason
+                        continue
+                    key_combo = canonical_combo(key_combo)
+                    if key_combo in records:
+                        report.duplicates.append(key_combo)
+                    records[key_combo] = app_path
+                    
+            exists = check_paths(records.values(), workers, probe=self._probe_path)
+            with self.lock:
+                target = self.active_profile if profile is None else profile
+                self._layer(target)  # unknown profiles fail before anything changes
+                for key_combo, app_path in records.items():
+                    if not exists[app_path]:
+                        report.invalid_paths[key_combo] = app_path
+                        continue
+                    current = effective_value(self.base_mappings, self.profiles,
+                                              target, key_combo)
+                    if current is None:
+                        report.added[key_combo] = app_path
+                    elif current != app_path:
+                        report.replaced[key_combo] = (current, app_path)
+                    else:
+                        report.unchanged.append(key_combo)
+                        
+                changes = report.changes()
+                if dry_run or not changes:
+                    return report
+                layer = self._layer(target)
+                for key_combo, app_path in changes.items():
+                    if key_combo not in self.original_mappings:
+                        self.original_mappings[key_combo] = None
+                    layer[key_combo] = app_path
+                self._activate(resolve_mappings(self.base_mappings, self.profiles,
+                                                self.active_profile))
+                self.profile_mappings.clear()
+                self.profile_tables.clear()
+                if self.is_active:
+                    self._precompile_profiles()
+                self._sync_prewarm()
+                self._mark_unjournaled('import')
+            report.committed = self.save_mappings()
+            logger.info(report.summary())
+        except Exception as e:
+            logger.error(f"Error importing mappings: {e}")
+            report.errors.append(str(e))
+        return report
+        
+    def export_mappings(self, dest: Source, fmt: Optional[str] = None,
+                        profile: Optional[str] = None) -> int:
+        """Write a profile's effective mappings (the active one by default) as
+        JSON Lines or CSV, sorted by key; return how many were written, or -1"""
+        try:
+            fmt = detect_format(dest, fmt)
+            with self.lock:
+                name = self.active_profile if profile is None else profile
+                if name == self.active_profile:
+                    mappings = self.mappings.copy()
+                else:
+                    mappings = resolve_mappings(self.base_mappings, self.profiles, name)
+            with open_text(dest, 'w') as f:
+                count = write_records(f, sorted(mappings.items()), fmt)
+            logger.info(f"Exported {count} key mappings (profile {name})")
+            return count
+        except Exception as e:
+            logger.error(f"Error exporting mappings: {e}")
+            return -1
+            
+    def _combo_error(self, key_combo: str) -> Optional[str]:
+        """Return why key_combo cannot be mapped, or None"""
+        if not key_combo:
+            return "empty key combination"
+        if self.dispatcher is not None:
+            try:
+                parse_sequence(key_combo)
+            except ValueError as e:
+                return str(e)
+        return None
+        
+    def _probe_path(self, app_path: str) -> bool:
+        """Check that an application exists, resolving its launch plan on the way"""
+        try:
+            self.launch_plans.get(app_path)
+            exists = True
+        except OSError:
+            exists = False
+        self.path_validator.mark(app_path, exists)
+        return exists
+            
     def restore_original(self) -> bool:
         """Restore all keys to their original mappings"""
         try:
             self.stop_mapping()
-            self.mappings.clear()
-            self.original_mappings.clear()
+            with self.lock:
+                self.mappings = MappingTable()
+                self._conflicts = None
+                self.base_mappings = {}
+                self.original_mappings.clear()
+                self.instance_modes.clear()
+                self.prewarm_settings.clear()
+                self.profiles.clear()
+                self.profile_mappings.clear()
+                self.profile_tables.clear()
+                self.active_profile = DEFAULT_PROFILE
+                self._mark_unjournaled('restore')
             self.save_mappings()
             logger.info("Restored all keys to original mappings")
             return True
@@ -103,27 +861,166 @@ class KeyMapper:
             logger.error(f"Error restoring mappings: {e}")
             return False
             
+    def set_instance_mode(self, key_combo: str, mode: str) -> bool:
+        """Set what a mapping does while the application it started is still running
+
+        'multi' starts another instance, 'focus' brings the running one to the
+        front and 'ignore' does nothing. Only processes started by this mapper
+        are known, and shell-launched files (shortcuts, documents) always
+        start a new instance.
+        """
+        if mode not in INSTANCE_MODES:
+            logger.error(f"Unknown instance mode: {mode}")
+            return False
+        key_combo = canonical_combo(key_combo)
+        with self.lock:
+            if not self._is_bound_anywhere(key_combo):
+                return False
+            before = self._key_state(key_combo)
+            self._store_instance_mode(key_combo, mode)
+            self._record('set_instance_mode', diff_state(before, self._key_state(key_combo)))
+        logger.info(f"Instance mode for {key_combo}: {mode}")
+        return True
+        
+    def set_prewarm(self, key_combo: str, size: int,
+                    idle_timeout: float = DEFAULT_IDLE_TIMEOUT) -> bool:
+        """Keep size idle instances of a mapping's application ready while mapping is active
+
+        A trigger hands out a ready instance and the pool is replenished in
+        the background; the pool is emptied after idle_timeout seconds
+        without a trigger and warmed again by the next one. A size of 0
+        turns prewarming off.
+        """
+        if size < 0 or idle_timeout <= 0:
+            logger.error(f"Invalid prewarm settings for {key_combo}: {size}, {idle_timeout}")
+            return False
+        key_combo = canonical_combo(key_combo)
+        with self.lock:
+            if not self._is_bound_anywhere(key_combo):
+                return False
+            before = self._key_state(key_combo)
+            if size == 0:
+                self.prewarm_settings.pop(key_combo, None)
+            else:
+                self.prewarm_settings[key_combo] = PrewarmSettings(size, float(idle_timeout))
+            self._sync_prewarm()
+            self._record('set_prewarm', diff_state(before, self._key_state(key_combo)))
+        logger.info(f"Prewarm for {key_combo}: {size} instance(s)")
+        return True
+        
+    @staticmethod
+    def _prewarm_from_config(entries: Dict[str, dict]) -> Dict[str, PrewarmSettings]:
+        return {key_combo: PrewarmSettings(entry['size'], entry['idle_timeout'])
+                for key_combo, entry in entries.items()}
+        
+    def _sync_prewarm(self):
+        """Point the prewarm pool at the active mappings' applications; the
+        caller must hold the lock"""
+        pools: Dict[str, PrewarmSettings] = {}
+        if self.is_active:
+            for key_combo, settings in self.prewarm_settings.items():
+                app_path = self.mappings.get(key_combo)
+                if app_path is None:
+                    continue
+                shared = pools.get(app_path)
+                if shared is not None:
+                    # Mappings launching the same application share one pool
+                    settings = PrewarmSettings(max(shared.size, settings.size),
+                                               max(shared.idle_timeout, settings.idle_timeout))
+                pools[app_path] = settings
+        self.prewarm.sync(pools)
+        
+    def get_instance_mode(self, key_combo: str) -> str:
+        """Get a mapping's single-instance mode"""
+        return self.instance_modes.get(canonical_combo(key_combo), INSTANCE_MULTI)
+        
+    def _store_instance_mode(self, key_combo: str, mode: str):
+        """Record a mode, keeping only non-default ones; the caller must hold the lock"""
+        if mode == INSTANCE_MULTI:
+            self.instance_modes.pop(key_combo, None)
+        else:
+            self.instance_modes[key_combo] = mode
+            
+    def _is_bound_anywhere(self, key_combo: str) -> bool:
+        """Check whether any profile maps key_combo; the caller must hold the lock
+
+        Profiles that have not been read yet are asked of the store instead
+        of being loaded.
+        """
+        if key_combo in self.base_mappings:
+            return True
+        unloaded = set()
+        for name, profile in self.profiles.items():
+            if not profile.loaded:
+                unloaded.add(name)
+            elif profile.mappings.get(key_combo) is not None:
+                return True
+        return bool(unloaded) and any(
+            name in unloaded and app_path is not None
+            for name, _, app_path in self.store.find(key_combo=key_combo))
+        
     def launch_application(self, app_path: str):
         """Launch an application"""
         try:
             logger.info(f"Launching application: {app_path}")
-            
-            # Handle different types of applications
-            if app_path.endswith('.exe'):
-                subprocess.Popen([app_path], shell=True)
-            elif app_path.endswith('.lnk'):
-                os.startfile(app_path)
-            else:
-                os.startfile(app_path)
-                
+            self.instances.track(app_path, execute_plan(self.launch_plans.get(app_path)))
+        except FileNotFoundError as e:
+            self.path_validator.mark(app_path, False)
+            logger.error(f"Error launching application {app_path}: {e}")
         except Exception as e:
             logger.error(f"Error launching application {app_path}: {e}")
             
-    def _create_hotkey_handler(self, app_path: str):
-        """Create a hotkey handler function"""
-        def handler():
-            self.launch_application(app_path)
-        return handler
+    def _launch_prewarmed(self, app_path: str) -> bool:
+        """Hand out a prewarmed instance of app_path; return False if none was ready"""
+        process = self.prewarm.acquire(app_path)
+        if process is None:
+            return False
+        logger.info(f"Launching prewarmed application: {app_path} (pid {process.pid})")
+        try:
+            show_process(process.pid)
+        except Exception as e:
+            logger.warning(f"Error showing prewarmed {app_path}: {e}")
+        self.instances.track(app_path, process)
+        return True
+        
+    def _reuse_instance(self, app_path: str, mode: str) -> bool:
+        """Focus or keep a running instance of app_path; return False if one must be started"""
+        process = self.instances.running(app_path)
+        if process is None:
+            return False
+        if mode == INSTANCE_FOCUS:
+            try:
+                if not focus_process(process.pid):
+                    logger.info(f"No window to focus for {app_path} (pid {process.pid})")
+            except Exception as e:
+                logger.warning(f"Error focusing {app_path}: {e}")
+        logger.info(f"Reusing running instance of {app_path} (pid {process.pid})")
+        return True
+            
+    def _create_hotkey_handler(self, record: Mapping) -> Callable:
+        """Create a hotkey handler that hands the launch to the executor"""
+        return partial(self._on_trigger, record)
+        
+    def _on_trigger(self, record: Mapping, received: Optional[float] = None):
+        """Hotkey handler body; keep it short, it runs on the hook thread"""
+        matched = time.perf_counter()
+        if received is None:
+            # keyboard.add_hotkey does not pass the event time
+            received = matched
+        self.executor.submit(record.key_combo, self._launch_triggered, record, received, matched)
+        
+    def _launch_triggered(self, record: Mapping, received: float, matched: float):
+        """Launch an application for a hotkey and record its latency"""
+        started = time.perf_counter()
+        key_combo, app_path = record.key_combo, record.app_path
+        record.triggers += 1
+        record.last_triggered = time.time()
+        mode = self.instance_modes.get(key_combo, INSTANCE_MULTI)
+        if mode == INSTANCE_MULTI or not self._reuse_instance(app_path, mode):
+            if not self._launch_prewarmed(app_path):
+                self.launch_application(app_path)
+        self.metrics.record_trigger(key_combo, received, matched, started,
+                                    time.perf_counter())
         
     def start_mapping(self) -> bool:
         """Start listening for key mappings"""
@@ -134,19 +1031,17 @@ class KeyMapper:
                     return False
                     
                 # Clear existing hooks
-                self.stop_mapping()
+                self._unregister_all()
                 
                 # Register all hotkeys
-                for key_combo, app_path in self.mappings.items():
-                    try:
-                        handler = self._create_hotkey_handler(app_path)
-                        keyboard.add_hotkey(key_combo, handler)
-                        self.active_hooks.append(key_combo)
-                        logger.info(f"Registered hotkey: {key_combo}")
-                    except Exception as e:
-                        logger.error(f"Error registering hotkey {key_combo}: {e}")
-                        
+                self._apply_bindings(self.mappings.records, ())
+                if self.dispatcher is not None:
+                    self.dispatcher.start()
+                self._precompile_profiles()
+                    
                 self.is_active = True
+                self._sync_prewarm()
+                startup.mark(startup.HOOKS_ACTIVE)
                 logger.info("Key mapping started")
                 return True
                 
@@ -158,15 +1053,9 @@ class KeyMapper:
         """Stop listening for key mappings"""
         try:
             with self.lock:
-                # Unregister all hotkeys
-                for key_combo in self.active_hooks:
-                    try:
-                        keyboard.remove_hotkey(key_combo)
-                    except Exception as e:
-                        logger.warning(f"Error removing hotkey {key_combo}: {e}")
-                        
-                self.active_hooks.clear()
+                self._unregister_all()
                 self.is_active = False
+                self._sync_prewarm()
                 logger.info("Key mapping stopped")
                 return True
                 
@@ -174,10 +1063,137 @@ class KeyMapper:
             logger.error(f"Error stopping key mapping: {e}")
             return False
             
-    def get_all_mappings(self) -> Dict[str, str]:
-        """Get all current key mappings"""
-        return self.mappings.copy()
+    def _apply_bindings(self, bind: Dict[str, Mapping], unbind: Iterable[str]):
+        """Register and unregister individual hotkeys; the caller must hold the lock"""
+        if self.dispatcher is not None:
+            # Swap in an updated table in one step so no hotkey is ever dead
+            handlers = self._create_handlers(bind)
+            table = self.dispatcher.table.updated(handlers, unbind)
+            self.dispatcher.set_table(table)
+            # The table's handler dict is never modified once built
+            self.active_hooks = table.handlers
+            if bind:
+                logger.info(f"Registered {len(handlers)} hotkeys on the dispatcher hook")
+            return
+            
+        for key_combo in unbind:
+            self._remove_hotkey(key_combo)
+        for key_combo, record in bind.items():
+            try:
+                handler = self._create_hotkey_handler(record)
+                # keyboard keeps one remove handle per hotkey string, and an old
+                # handle deletes whatever is stored under it, so drop the old
+                # registration before adding the new one
+                self._remove_hotkey(key_combo)
+                hook = keyboard.add_hotkey(key_combo, handler, timeout=self.sequence_timeout)
+                self.active_hooks[key_combo] = hook
+                logger.info(f"Registered hotkey: {key_combo}")
+            except Exception as e:
+                logger.error(f"Error registering hotkey {key_combo}: {e}")
+                
+    def _remove_hotkey(self, key_combo: str):
+        """Unregister a single hotkey; the caller must hold the lock"""
+        hook = self.active_hooks.pop(key_combo, None)
+        if hook is None or self.dispatcher is not None:
+            return
+        try:
+            keyboard.remove_hotkey(hook)
+        except Exception as e:
+            logger.warning(f"Error removing hotkey {key_combo}: {e}")
+            
+    def _unregister_all(self):
+        """Unregister every active hotkey; the caller must hold the lock"""
+        if self.dispatcher is not None:
+            self.dispatcher.stop()
+            self.dispatcher.set_table(DispatchTable(sequence_timeout=self.sequence_timeout))
+            self.active_hooks = {}
+        else:
+            for key_combo in list(self.active_hooks):
+                self._remove_hotkey(key_combo)
+                
+    def get_all_mappings(self) -> MappingTable:
+        """Get all current key mappings, as an immutable snapshot rather than a copy"""
+        return self.mappings
+        
+    def check_conflicts(self, key_combo: str) -> List[Conflict]:
+        """Return the conflicts key_combo has, or would have once mapped, in the active profile"""
+        with self.lock:
+            return self._conflict_index().check(key_combo)
+            
+    def get_conflicts(self) -> List[Conflict]:
+        """Return every prefix clash and shadowed system shortcut in the active profile"""
+        with self.lock:
+            return self._conflict_index().conflicts()
+            
+    def _conflict_index(self) -> ConflictIndex:
+        """Return the conflict index of the active mappings, building it if a
+        profile switch dropped it; the caller must hold the lock"""
+        if self._conflicts is None:
+            self._conflicts = ConflictIndex(self.mappings)
+        return self._conflicts
         
     def is_mapping_active(self) -> bool:
         """Check if key mapping is currently active"""
         return self.is_active
+        
+    def get_latency_stats(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Get p50/p95/p99 latency in milliseconds per mapping and stage"""
+        return self.metrics.summary()
+        
+    def start_metrics_reporter(self, interval: float = 60.0,
+                               path: Optional[str] = None):
+        """Periodically log latency stats and dump them as JSON to path"""
+        if self.metrics_reporter is None:
+            self.metrics_reporter = MetricsReporter(self.metrics, interval, path)
+            self.metrics_reporter.start()
+            
+    def stop_metrics_reporter(self):
+        """Stop the periodic latency report"""
+        if self.metrics_reporter is not None:
+            self.metrics_reporter.stop()
+            self.metrics_reporter = None
+            
+    def start_path_checks(self, callback: Optional[Callable[[Dict[str, bool]], None]] = None,
+                          interval: float = DEFAULT_INTERVAL):
+        """Revalidate every mapped application path in the background
+
+        callback runs on the checker thread with {path: exists} for each
+        status change; get_broken_paths() returns the current result.
+        """
+        self.path_validator.start(self._all_app_paths, callback, interval)
+        
+    def stop_path_checks(self):
+        """Stop revalidating application paths"""
+        self.path_validator.stop()
+        
+    def get_broken_paths(self) -> Set[str]:
+        """Get the mapped application paths that were missing when last checked"""
+        return self.path_validator.broken()
+        
+    def _all_app_paths(self) -> List[str]:
+        """Return every application path any profile maps"""
+        with self.lock:
+            paths = list(self.base_mappings.values())
+            for profile in self.profiles.values():
+                if not profile.loaded:
+                    continue
+                paths.extend(app_path for app_path in profile.mappings.values()
+                             if app_path is not None)
+        return paths
+        
+    def shutdown(self):
+        """Stop key mapping, drain queued launches and flush pending saves"""
+        self.stop_watching()
+        self.stop_path_checks()
+        self.stop_mapping()
+        self.executor.shutdown()
+        self.instances.stop()
+        self.prewarm.close()
+        self.stop_metrics_reporter()
+        self.writer.close()
+        if self.journal is not None:
+            # Leave a config file that mappers without the journal can read
+            if self.journal.last_seq > self.journal_seq:
+                self.save_mappings()
+            self.journal.close()
+        self.store.close()
@@ -0,0 +1,102 @@
+"""
+Launch plans - resolve how an application is started once, then reuse it
+"""
+
+import os
+import logging
+import threading
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from lazy import LazyModule
+
+subprocess = LazyModule('subprocess')  # imported on the first launch
+
+logger = logging.getLogger(__name__)
+
+# Launcher types
+LAUNCHER_EXEC = 'exec'  # start the executable directly, without a shell
+LAUNCHER_STARTFILE = 'startfile'  # hand the file to the shell association (.lnk, documents)
+
+EXEC_EXTENSIONS = ('.exe', '.com')
+
+
+class LaunchPlan(NamedTuple):
+    """Everything needed to start one application"""
+    path: str
+    argv: Tuple[str, ...]
+    cwd: str
+    env: Optional[Dict[str, str]]
+    launcher: str
+    mtime_ns: int
+
+
+def build_plan(app_path: str) -> LaunchPlan:
+    """Resolve an application path into a launch plan"""
+    path = os.path.abspath(app_path)
+    stat = os.stat(path)
+    if path.lower().endswith(EXEC_EXTENSIONS):
+        launcher = LAUNCHER_EXEC
+    elif os.name != 'nt' and os.access(path, os.X_OK):
+        launcher = LAUNCHER_EXEC
+    else:
+        launcher = LAUNCHER_STARTFILE
+    return LaunchPlan(
+        path=path,
+        argv=(path,),
+        cwd=os.path.dirname(path),
+        env=None,  # inherit the mapper's environment
+        launcher=launcher,
+        mtime_ns=stat.st_mtime_ns,
+    )
+
+
+def execute_plan(plan: LaunchPlan) -> Optional['subprocess.Popen']:
+    """Start an application from its plan"""
+    if plan.launcher == LAUNCHER_EXEC:
+        return subprocess.Popen(list(plan.argv), cwd=plan.cwd, env=plan.env)
+    os.startfile(plan.path)
+    return None
+
+
+class LaunchPlanCache:
+    """Launch plans keyed by application path, invalidated by file mtime"""
+
+    def __init__(self):
+        self._plans: Dict[str, LaunchPlan] = {}
+        self._lock = threading.Lock()
+
+    def get(self, app_path: str) -> LaunchPlan:
+        """Return the plan for an application, rebuilding it if the file changed"""
+        plan = self._plans.get(app_path)
+        if plan is not None:
+            try:
+                if os.stat(plan.path).st_mtime_ns == plan.mtime_ns:
+                    return plan
+            except OSError:
+                pass
+        plan = build_plan(app_path)
+        with self._lock:
+            self._plans[app_path] = plan
+        return plan
+
+    def prepare(self, app_paths: Iterable[str]):
+        """Build plans ahead of time so the first launch does no resolving"""
+        for app_path in dict.fromkeys(app_paths):
+            try:
+                self.get(app_path)
+            except OSError as e:
+                logger.warning(f"Cannot prepare launch plan for {app_path}: {e}")
+
+    def invalidate(self, app_path: Optional[str] = None):
+        """Drop the plan for one application, or all plans"""
+        with self._lock:
+            if app_path is None:
+                self._plans.clear()
+            else:
+                self._plans.pop(app_path, None)
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+    def __contains__(self, app_path: str) -> bool:
+        return app_path in self._plans
@@ -0,0 +1,47 @@
+"""
+Lazy imports - load heavy modules on first use instead of at startup
+"""
+
+import importlib
+from types import ModuleType
+
+
+class LazyModule:
+    """Stand-in for a module that imports it on first attribute access
+
+    Attribute reads, writes and deletes are forwarded to the real module,
+    so ``mock.patch('launcher.subprocess.Popen')`` and similar keep working.
+    Modules loaded this way are invisible to PyInstaller's import scan and
+    must be listed as hidden imports in ``build.py``.
+    """
+
+    __slots__ = ('_name', '_module')
+
+    def __init__(self, name: str):
+        object.__setattr__(self, '_name', name)
+        object.__setattr__(self, '_module', None)
+
+    def _load(self) -> ModuleType:
+        module = self._module
+        if module is None:
+            module = importlib.import_module(self._name)
+            object.__setattr__(self, '_module', module)
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr: str, value):
+        setattr(self._load(), attr, value)
+
+    def __delattr__(self, attr: str):
+        delattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def is_loaded(module) -> bool:
+    """True if module is a real module or a LazyModule that has been imported"""
+    return not isinstance(module, LazyModule) or module._module is not None
@@ -0,0 +1,103 @@
+"""
+Mapping list model - sorted rows behind the virtualized mappings view
+"""
+
+from bisect import bisect_left, insort
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from mapping_table import MappingTable
+
+
+class MappingListModel:
+    """Mappings kept in key-combination order with incremental updates
+
+    Inserts and deletes cost a binary search plus a list shift instead of a
+    full re-sort, and views read only the window of rows they display. A
+    filter (e.g. search results) replaces the rows shown, in its own order.
+    An immutable MappingTable passed to sync() is kept by reference instead
+    of copied; the first single-row edit after that copies it.
+    """
+
+    def __init__(self):
+        self.keys: List[str] = []
+        self.rows: Mapping[str, str] = {}
+        self.filtered: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key_combo: str) -> bool:
+        return key_combo in self.rows
+
+    def set(self, key_combo: str, app_path: str) -> int:
+        """Insert or update a row; return its index"""
+        if key_combo not in self.rows:
+            insort(self.keys, key_combo)
+        self._own_rows()[key_combo] = app_path
+        return self.index(key_combo)
+
+    def remove(self, key_combo: str) -> int:
+        """Delete a row; return the index it had, or -1 if it did not exist"""
+        if key_combo not in self.rows:
+            return -1
+        index = self.index(key_combo)
+        del self.keys[index]
+        del self._own_rows()[key_combo]
+        if self.filtered is not None and key_combo in self.filtered:
+            self.filtered.remove(key_combo)
+        return index
+
+    def _own_rows(self) -> Dict[str, str]:
+        """Return the rows as a dict this model may change, copying a shared table"""
+        if not isinstance(self.rows, dict):
+            self.rows = dict(self.rows.items())
+        return self.rows
+
+    def index(self, key_combo: str) -> int:
+        """Return the position of a row in sort order"""
+        return bisect_left(self.keys, key_combo)
+
+    def sync(self, mappings: Mapping[str, str]) -> Tuple[int, int, int]:
+        """Apply the difference to a full mapping dict; return (inserted, updated, deleted)"""
+        rows = self.rows
+        if mappings is rows:
+            return 0, 0, 0
+        # Compare the record dicts of tables directly; records of unchanged
+        # mappings are shared between tables, so identity settles most rows
+        old = rows.records if isinstance(rows, MappingTable) else rows
+        new = mappings.records if isinstance(mappings, MappingTable) else mappings
+        deleted = [key_combo for key_combo in old if key_combo not in new]
+        inserted = [key_combo for key_combo in new if key_combo not in old]
+        if old is not rows and new is not mappings:
+            updated = sum(1 for key_combo, record in new.items()
+                          if old.get(key_combo, record) is not record and
+                          old[key_combo].app_path != record.app_path)
+        else:
+            updated = sum(1 for key_combo, app_path in mappings.items()
+                          if key_combo in old and rows[key_combo] != app_path)
+
+        if len(deleted) + len(inserted) > max(64, len(self.keys) // 8):
+            # Large change: one sort is cheaper than many list shifts
+            self.keys = sorted(mappings)
+        else:
+            for key_combo in deleted:
+                del self.keys[self.index(key_combo)]
+            for key_combo in inserted:
+                insort(self.keys, key_combo)
+        # Tables never change, so they are shared; a plain dict may be, so it is copied
+        self.rows = mappings if isinstance(mappings, MappingTable) else dict(mappings)
+        if self.filtered is not None:
+            self.filtered = [key_combo for key_combo in self.filtered if key_combo in self.rows]
+        return len(inserted), updated, len(deleted)
+
+    def set_filter(self, keys: Optional[List[str]]):
+        """Show only keys, in the given order; None shows every row"""
+        self.filtered = keys
+
+    def visible(self) -> List[str]:
+        """Return the keys shown, in display order"""
+        return self.keys if self.filtered is None else self.filtered
+
+    def window(self, start: int, count: int) -> List[Tuple[str, str]]:
+        """Return up to count visible rows starting at index start"""
+        return [(key_combo, self.rows[key_combo]) for key_combo in self.visible()[start:start + count]]
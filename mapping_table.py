@@ -0,0 +1,109 @@
+"""
+Mapping records - one slotted record per key mapping, held in an immutable
+table that reads like a dict of key combination to application path
+"""
+
+from collections.abc import ItemsView, Mapping as MappingABC, ValuesView
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+
+class Mapping:
+    """One key mapping of a profile and its trigger statistics
+
+    Hotkey handlers hold the record itself rather than a copy of its path.
+    The key and path never change; a new path gets a new record. The
+    statistics are updated by launch workers without a lock, so concurrent
+    triggers of one mapping may undercount.
+    """
+
+    __slots__ = ('key_combo', 'app_path', 'triggers', 'last_triggered')
+
+    def __init__(self, key_combo: str, app_path: str):
+        self.key_combo = key_combo
+        self.app_path = app_path
+        self.triggers = 0
+        self.last_triggered: Optional[float] = None  # time.time() of the last trigger
+
+    def __repr__(self) -> str:
+        return f"Mapping({self.key_combo!r}, {self.app_path!r})"
+
+
+class _TableItems(ItemsView):
+    """Live view of a table's (key combination, path) pairs, read from its records"""
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        for record in self._mapping.records.values():
+            yield record.key_combo, record.app_path
+
+
+class _TableValues(ValuesView):
+    """Live view of a table's paths, read from its records"""
+
+    def __iter__(self) -> Iterator[str]:
+        for record in self._mapping.records.values():
+            yield record.app_path
+
+
+class MappingTable(MappingABC):
+    """A profile's effective mappings as records, keyed by key combination
+
+    The table is a read-only mapping of key combination to application path
+    and is never modified once built: updated() returns a new table that
+    shares the unchanged records. Any thread can keep reading a table it
+    got hold of, without a lock or a copy, while the mapper publishes newer
+    ones.
+    """
+
+    __slots__ = ('records',)
+
+    def __init__(self, mappings: Optional[Dict[str, str]] = None):
+        self.records: Dict[str, Mapping] = {
+            key_combo: Mapping(key_combo, app_path)
+            for key_combo, app_path in (mappings or {}).items()}
+
+    def __getitem__(self, key_combo: str) -> str:
+        return self.records[key_combo].app_path
+
+    def get(self, key_combo: str, default: Optional[str] = None) -> Optional[str]:
+        record = self.records.get(key_combo)
+        return default if record is None else record.app_path
+
+    def __contains__(self, key_combo: object) -> bool:
+        return key_combo in self.records
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.records)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def items(self) -> ItemsView:
+        return _TableItems(self)
+
+    def values(self) -> ValuesView:
+        return _TableValues(self)
+
+    def __repr__(self) -> str:
+        return f"MappingTable({dict(self.items())!r})"
+
+    def record(self, key_combo: str) -> Optional[Mapping]:
+        """Return the record of a key combination, or None"""
+        return self.records.get(key_combo)
+
+    def updated(self, bind: Optional[Dict[str, str]] = None,
+                unbind: Iterable[str] = ()) -> 'MappingTable':
+        """Return a new table with mappings set and removed; this one is left untouched
+
+        Bound keys get fresh records; every other record is shared.
+        """
+        table = MappingTable()
+        records = table.records = dict(self.records)
+        for key_combo in unbind:
+            records.pop(key_combo, None)
+        for key_combo, app_path in (bind or {}).items():
+            records[key_combo] = Mapping(key_combo, app_path)
+        return table
+
+    def copy(self) -> Dict[str, str]:
+        """Return the mappings as a plain dict, e.g. for JSON output"""
+        return dict(self.items())
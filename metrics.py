@@ -0,0 +1,158 @@
+"""
+Latency metrics - per-mapping hotkey-to-launch timings
+"""
+
+import os
+import math
+import itertools
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from lazy import LazyModule
+
+json = LazyModule('json')  # only needed when dumping reports
+
+logger = logging.getLogger(__name__)
+
+# Stages of a trigger, each measured in seconds
+STAGE_MATCH = 'match'  # key event received -> hotkey handler running
+STAGE_DISPATCH = 'dispatch'  # handler -> launch worker picking the launch up
+STAGE_SPAWN = 'spawn'  # launch started -> Popen/startfile returned
+STAGE_TOTAL = 'total'  # key event received -> Popen/startfile returned
+
+STAGES = (STAGE_MATCH, STAGE_DISPATCH, STAGE_SPAWN, STAGE_TOTAL)
+PERCENTILES = (50, 95, 99)
+
+# Set to a JSON file path to have the GUI report latency stats there every minute
+METRICS_ENV = 'KEYMAPPER_METRICS'
+
+
+class LatencyRing:
+    """Fixed-size ring buffer of samples that is written without locks
+
+    Slots are claimed with ``next()`` on an ``itertools.count``, which is
+    atomic in CPython, so concurrent writers never share a slot. Readers take
+    a copy of the buffer and may see a sample that is still being replaced.
+    """
+
+    def __init__(self, size: int = 1024):
+        self.size = size
+        self._samples = [0.0] * size
+        self._counter = itertools.count()
+        self._written = 0
+
+    def record(self, value: float):
+        """Store a sample, overwriting the oldest once the ring is full"""
+        index = next(self._counter)
+        self._samples[index % self.size] = value
+        self._written = max(self._written, index + 1)
+
+    def __len__(self) -> int:
+        return min(self._written, self.size)
+
+    def snapshot(self) -> List[float]:
+        """Return a copy of the samples currently held"""
+        return self._samples[:len(self)]
+
+
+def percentiles(samples: Iterable[float],
+                points: Iterable[int] = PERCENTILES) -> Dict[str, float]:
+    """Return nearest-rank percentiles of samples, keyed 'p50', 'p95', ..."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {f"p{p}": 0.0 for p in points}
+    count = len(ordered)
+    return {f"p{p}": ordered[max(0, math.ceil(p / 100 * count) - 1)] for p in points}
+
+
+class LatencyMetrics:
+    """Per-mapping, per-stage latency rings"""
+
+    def __init__(self, ring_size: int = 1024):
+        self.ring_size = ring_size
+        self._rings: Dict[str, Dict[str, LatencyRing]] = {}
+
+    def _stage_rings(self, key_combo: str) -> Dict[str, LatencyRing]:
+        rings = self._rings.get(key_combo)
+        if rings is None:
+            rings = {stage: LatencyRing(self.ring_size) for stage in STAGES}
+            # setdefault keeps the first set of rings if two threads race here
+            rings = self._rings.setdefault(key_combo, rings)
+        return rings
+
+    def record_trigger(self, key_combo: str, received: float, matched: float,
+                       started: float, spawned: float):
+        """Record the timestamps (time.perf_counter) of one trigger"""
+        rings = self._stage_rings(key_combo)
+        rings[STAGE_MATCH].record(matched - received)
+        rings[STAGE_DISPATCH].record(started - matched)
+        rings[STAGE_SPAWN].record(spawned - started)
+        rings[STAGE_TOTAL].record(spawned - received)
+
+    def forget(self, key_combo: str):
+        """Drop the samples for a mapping"""
+        self._rings.pop(key_combo, None)
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Return count and p50/p95/p99 in milliseconds per mapping and stage"""
+        result = {}
+        for key_combo, rings in list(self._rings.items()):
+            stages = {}
+            for stage, ring in rings.items():
+                samples = ring.snapshot()
+                stats = {name: value * 1000.0
+                         for name, value in percentiles(samples).items()}
+                stats['count'] = len(samples)
+                stages[stage] = stats
+            result[key_combo] = stages
+        return result
+
+
+class MetricsReporter:
+    """Background thread that periodically logs and dumps metrics as JSON"""
+
+    def __init__(self, metrics: LatencyMetrics, interval: float = 60.0,
+                 path: Optional[str] = None):
+        self.metrics = metrics
+        self.interval = interval
+        self.path = path
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start reporting"""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="metrics-reporter",
+                                            daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop reporting after writing a final report"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.report()
+        self.report()
+
+    def report(self):
+        """Log a one-line summary per mapping and write the JSON dump"""
+        summary = self.metrics.summary()
+        for key_combo, stages in summary.items():
+            total = stages[STAGE_TOTAL]
+            logger.info(f"Latency {key_combo}: n={total['count']} "
+                        f"p50={total['p50']:.1f}ms p95={total['p95']:.1f}ms "
+                        f"p99={total['p99']:.1f}ms")
+        if self.path:
+            try:
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, 'w') as f:
+                    json.dump(summary, f, indent=2)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                logger.error(f"Error writing metrics to {self.path}: {e}")
@@ -0,0 +1,188 @@
+"""
+Path validation - cached checks that mapped applications still exist,
+revalidated in batches on a background thread
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 30.0  # seconds a cached status is trusted by check()
+DEFAULT_INTERVAL = 10.0  # seconds between background passes
+
+_UNKNOWN = object()  # a directory that has not been stat'ed yet
+
+
+class PathStatus(NamedTuple):
+    """Whether a path existed when it was last validated"""
+    exists: bool
+    checked: float  # time.monotonic() of the validation
+
+
+class PathValidator:
+    """Cache of application path existence with background revalidation
+
+    ``check`` answers from the cache while a positive entry is younger than
+    ``ttl`` and stats the file otherwise. A background pass revalidates
+    every path returned by its provider, ``batch_size`` directories at a
+    time: each directory is stat'ed once, and files in a directory whose
+    mtime has not changed since the previous pass keep their status without
+    a stat of their own (creating, deleting or renaming a file changes its
+    directory's mtime). A directory that cannot be stat'ed, e.g. on a
+    disconnected share, marks all its files missing. Status changes are
+    passed to the callback as ``{path: exists}``.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL, batch_size: int = 64):
+        self.ttl = ttl
+        self.batch_size = batch_size
+        self.stats: Dict[str, int] = {'file_stats': 0, 'dir_stats': 0, 'passes': 0}
+        self.callback: Optional[Callable[[Dict[str, bool]], None]] = None
+        self._status: Dict[str, PathStatus] = {}
+        self._dirs: Dict[str, object] = {}  # directory -> st_mtime_ns, or None if missing
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def check(self, path: str) -> bool:
+        """Return whether path exists, from the cache when fresh
+
+        Only positive results are served from the cache, so a file created
+        right after a failed check is found immediately.
+        """
+        status = self._status.get(path)
+        if (status is not None and status.exists and
+                time.monotonic() - status.checked < self.ttl):
+            return True
+        exists = os.path.exists(path)
+        self.stats['file_stats'] += 1
+        self.mark(path, exists)
+        return exists
+
+    def status(self, path: str) -> Optional[bool]:
+        """Return the cached status of path, or None if it was never checked"""
+        status = self._status.get(path)
+        return None if status is None else status.exists
+
+    def mark(self, path: str, exists: bool) -> bool:
+        """Record a status learned elsewhere (e.g. a failed launch); return True if it changed"""
+        with self._lock:
+            previous = self._status.get(path)
+            self._status[path] = PathStatus(exists, time.monotonic())
+        changed = previous is not None and previous.exists != exists
+        if changed:
+            self._notify({path: exists})
+        return changed
+
+    def broken(self) -> Set[str]:
+        """Return every cached path that was missing when last checked"""
+        return {path for path, status in list(self._status.items()) if not status.exists}
+
+    def revalidate(self, paths: Iterable[str]) -> Dict[str, bool]:
+        """Validate paths in directory batches; return and report the statuses that changed"""
+        by_dir: Dict[str, List[str]] = {}
+        for path in dict.fromkeys(paths):
+            by_dir.setdefault(os.path.dirname(os.path.abspath(path)), []).append(path)
+
+        changed: Dict[str, bool] = {}
+        directories = list(by_dir)
+        for start in range(0, len(directories), self.batch_size):
+            if self._stop.is_set():
+                break
+            for directory in directories[start:start + self.batch_size]:
+                changed.update(self._validate_dir(directory, by_dir[directory]))
+
+        with self._lock:
+            # Forget paths and directories that are no longer mapped
+            keep = {path for files in by_dir.values() for path in files}
+            self._status = {path: status for path, status in self._status.items()
+                            if path in keep}
+            self._dirs = {directory: mtime for directory, mtime in self._dirs.items()
+                          if directory in by_dir}
+            self.stats['passes'] += 1
+        if changed:
+            self._notify(changed)
+        return changed
+
+    def _validate_dir(self, directory: str, files: List[str]) -> Dict[str, bool]:
+        """Validate the files of one directory, skipping their stats if it is unchanged"""
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            mtime = None
+        self.stats['dir_stats'] += 1
+        now = time.monotonic()
+        changed = {}
+        with self._lock:
+            unchanged = (mtime is not None and self._dirs.get(directory, _UNKNOWN) == mtime and
+                         all(path in self._status for path in files))
+            self._dirs[directory] = mtime
+        for path in files:
+            previous = self._status.get(path)
+            if unchanged:
+                exists = previous.exists
+            elif mtime is None:
+                exists = False
+            else:
+                exists = os.path.exists(path)
+                self.stats['file_stats'] += 1
+            with self._lock:
+                self._status[path] = PathStatus(exists, now)
+            if previous is None:
+                if not exists:
+                    changed[path] = False  # found missing on its first check
+            elif previous.exists != exists:
+                changed[path] = exists
+        return changed
+
+    def _notify(self, changed: Dict[str, bool]):
+        """Pass status changes to the callback"""
+        for path, exists in changed.items():
+            if exists:
+                logger.info(f"Application path is available again: {path}")
+            else:
+                logger.warning(f"Application path is missing: {path}")
+        if self.callback is not None:
+            try:
+                self.callback(changed)
+            except Exception as e:
+                logger.error(f"Error in path status callback: {e}")
+
+    def start(self, paths: Callable[[], Iterable[str]],
+              callback: Optional[Callable[[Dict[str, bool]], None]] = None,
+              interval: float = DEFAULT_INTERVAL):
+        """Revalidate paths() every interval seconds on a background thread"""
+        if self._thread is not None:
+            return
+        self.callback = callback
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(paths, interval),
+                                        name="path-validator", daemon=True)
+        self._thread.start()
+
+    def wake(self):
+        """Run the next background pass now"""
+        self._wake.set()
+
+    def _run(self, paths: Callable[[], Iterable[str]], interval: float):
+        """Background loop"""
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                self.revalidate(paths())
+            except Exception as e:
+                logger.error(f"Error validating application paths: {e}")
+            self._wake.wait(interval)
+
+    def stop(self):
+        """Stop the background thread"""
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            self._wake.set()
+            thread.join()
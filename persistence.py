@@ -0,0 +1,337 @@
+"""
+Config persistence - atomic writes, debounced background saving and a
+sidecar cache of the parsed config
+"""
+
+import os
+import time
+import marshal
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple, Union
+
+from lazy import LazyModule
+from combos import canonical_combo
+from instances import INSTANCE_MODES, INSTANCE_MULTI
+from prewarm import DEFAULT_IDLE_TIMEOUT, DEFAULT_POOL_SIZE
+from profiles import DEFAULT_PROFILE
+
+json = LazyModule('json')  # only needed when saving
+hashlib = LazyModule('hashlib')  # only needed when the cache's mtime check misses
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 7
+CACHE_SUFFIX = '.cache'
+
+
+def atomic_write_bytes(path: Union[str, Path], payload: bytes):
+    """Write bytes to a temp file, fsync it and rename it over path
+
+    Readers see either the old or the new contents, never a truncated file.
+    """
+    path = Path(path)
+    directory = path.parent if str(path.parent) else Path('.')
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    # Persist the rename itself; directories cannot be opened on Windows
+    if os.name != 'nt':
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def atomic_write_json(path: Union[str, Path], data, indent: Optional[int] = 2) -> bytes:
+    """Write JSON atomically and return the bytes that were written"""
+    payload = json.dumps(data, indent=indent).encode('utf-8')
+    atomic_write_bytes(path, payload)
+    return payload
+
+
+def _store(entries: dict, key_combo: str, value, section: str):
+    """Store value under the canonical spelling of key_combo; a later spelling wins"""
+    canonical = canonical_combo(key_combo)
+    if canonical in entries:
+        logger.warning(f"Merging duplicate {section} entry {key_combo!r} into {canonical!r}")
+    entries[canonical] = value
+
+
+def validate_config(data) -> Tuple[Dict[str, str], Dict[str, Optional[str]]]:
+    """Return the mappings and original mappings of a config document
+
+    Entries that are not string-to-string mappings are dropped with a warning
+    instead of failing the whole load. Key combinations are canonicalized, so
+    spellings of the same combination merge into one entry.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Config must be a JSON object")
+
+    mappings = {}
+    for key_combo, app_path in (data.get('mappings') or {}).items():
+        if isinstance(app_path, str):
+            _store(mappings, key_combo, app_path, 'mappings')
+        else:
+            logger.warning(f"Skipping invalid mapping for {key_combo}: {app_path!r}")
+
+    original_mappings = {}
+    for key_combo, original in (data.get('original_mappings') or {}).items():
+        if original is None or isinstance(original, str):
+            _store(original_mappings, key_combo, original, 'original_mappings')
+        else:
+            logger.warning(f"Skipping invalid original mapping for {key_combo}")
+    return mappings, original_mappings
+
+
+def validate_profiles(data) -> Tuple[Dict[str, dict], str]:
+    """Return the profiles and the active profile name of a config document
+
+    Profiles come back in their config form, ``{'inherits': parent,
+    'mappings': {...}}``; a mapping to None hides an inherited binding.
+    """
+    profiles = {}
+    entries = data.get('profiles') or {}
+    if not isinstance(entries, dict):
+        logger.warning("Ignoring invalid profiles section")
+        entries = {}
+    for name, entry in entries.items():
+        if name == DEFAULT_PROFILE or not isinstance(entry, dict):
+            logger.warning(f"Skipping invalid profile {name!r}")
+            continue
+        parent = entry.get('inherits') or DEFAULT_PROFILE
+        if not isinstance(parent, str):
+            logger.warning(f"Skipping profile {name!r} with invalid parent {parent!r}")
+            continue
+        mappings = {}
+        for key_combo, app_path in (entry.get('mappings') or {}).items():
+            if app_path is None or isinstance(app_path, str):
+                _store(mappings, key_combo, app_path, f"profile {name!r}")
+            else:
+                logger.warning(f"Skipping invalid mapping for {key_combo} in profile {name!r}")
+        profiles[name] = {'inherits': parent, 'mappings': mappings}
+
+    active = data.get('active_profile') or DEFAULT_PROFILE
+    if not isinstance(active, str):
+        active = DEFAULT_PROFILE
+    return profiles, active
+
+
+def validate_instance_modes(data) -> Dict[str, str]:
+    """Return the per-mapping single-instance modes of a config document
+
+    Unknown modes are dropped with a warning; the default mode is not stored.
+    """
+    modes = {}
+    entries = data.get('instance_modes') or {}
+    if not isinstance(entries, dict):
+        logger.warning("Ignoring invalid instance_modes section")
+        entries = {}
+    for key_combo, mode in entries.items():
+        if mode not in INSTANCE_MODES:
+            logger.warning(f"Skipping invalid instance mode for {key_combo}: {mode!r}")
+        elif mode != INSTANCE_MULTI:
+            _store(modes, key_combo, mode, 'instance_modes')
+    return modes
+
+
+def validate_prewarm(data) -> Dict[str, dict]:
+    """Return the per-mapping prewarm settings of a config document
+
+    Each entry is ``{'size': idle instances, 'idle_timeout': seconds}``;
+    missing fields get their defaults and invalid entries are dropped with
+    a warning.
+    """
+    prewarm = {}
+    entries = data.get('prewarm') or {}
+    if not isinstance(entries, dict):
+        logger.warning("Ignoring invalid prewarm section")
+        entries = {}
+    for key_combo, entry in entries.items():
+        if not isinstance(entry, dict):
+            logger.warning(f"Skipping invalid prewarm settings for {key_combo}")
+            continue
+        size = entry.get('size', DEFAULT_POOL_SIZE)
+        idle_timeout = entry.get('idle_timeout', DEFAULT_IDLE_TIMEOUT)
+        if (isinstance(size, bool) or not isinstance(size, int) or size < 1 or
+                isinstance(idle_timeout, bool) or not isinstance(idle_timeout, (int, float)) or
+                idle_timeout <= 0):
+            logger.warning(f"Skipping invalid prewarm settings for {key_combo}: {entry!r}")
+            continue
+        _store(prewarm, key_combo, {'size': size, 'idle_timeout': float(idle_timeout)},
+               'prewarm')
+    return prewarm
+
+
+class ConfigCache:
+    """Sidecar cache of the validated mapping table and parsed combinations
+
+    The cache is keyed by the config file's size and mtime, falling back to a
+    SHA-256 of its contents when those change, so a hit skips JSON parsing,
+    validation and combo parsing. The JSON file stays the source of truth.
+    """
+
+    def __init__(self, config_file: Union[str, Path]):
+        self.config_file = Path(config_file)
+        self.path = self.config_file.with_name(self.config_file.name + CACHE_SUFFIX)
+
+    def load(self) -> Optional[dict]:
+        """Return the cached table, or None if the cache is missing or stale"""
+        try:
+            with open(self.path, 'rb') as f:
+                entry = marshal.loads(f.read())
+            if entry.get('version') != CACHE_VERSION:
+                return None
+
+            stat = self.config_file.stat()
+            if (entry['size'], entry['mtime_ns']) == (stat.st_size, stat.st_mtime_ns):
+                return entry['table']
+
+            # Touched but possibly unchanged: compare contents
+            with open(self.config_file, 'rb') as f:
+                raw = f.read()
+            if hashlib.sha256(raw).hexdigest() != entry['sha256']:
+                return None
+            self._write(raw, entry['table'], stat)
+            return entry['table']
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable config cache {self.path}: {e}")
+            return None
+
+    def store(self, raw: bytes, table: dict):
+        """Cache the table built from the config file contents raw"""
+        try:
+            self._write(raw, table, self.config_file.stat())
+        except Exception as e:
+            logger.warning(f"Error writing config cache {self.path}: {e}")
+
+    def _write(self, raw: bytes, table: dict, stat: os.stat_result):
+        entry = {
+            'version': CACHE_VERSION,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': hashlib.sha256(raw).hexdigest(),
+            'table': table,
+        }
+        atomic_write_bytes(self.path, marshal.dumps(entry))
+
+    def clear(self):
+        """Delete the cache file"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class DebouncedWriter:
+    """Coalesces bursts of save requests into one write on a background thread
+
+    ``schedule()`` marks the state dirty; the write callable runs once no new
+    request has arrived for ``delay`` seconds. ``flush()`` waits for a write
+    already in progress and writes pending state on the calling thread, so
+    everything scheduled before it is on disk when it returns; ``close()``
+    flushes and stops the thread. Writes never overlap.
+    """
+
+    def __init__(self, write: Callable[[], bool], delay: float = 0.5):
+        self.write = write
+        self.delay = delay
+        self._dirty = False
+        self._last_request = 0.0
+        self._closed = False
+        self._writing = False  # a write is in progress on some thread
+        self._last_result = True
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def pending(self) -> bool:
+        """Whether a save has been requested but not yet written"""
+        return self._dirty
+
+    def schedule(self):
+        """Request a save"""
+        with self._condition:
+            self._dirty = True
+            self._last_request = time.monotonic()
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, name="config-writer",
+                                                daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def mark_clean(self):
+        """Drop any pending request because the state was just written"""
+        with self._condition:
+            self._dirty = False
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._dirty and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                # Wait until requests have been quiet for the whole delay
+                remaining = self._last_request + self.delay - time.monotonic()
+                while remaining > 0 and not self._closed:
+                    self._condition.wait(remaining)
+                    remaining = self._last_request + self.delay - time.monotonic()
+                while self._writing and not self._closed:
+                    self._condition.wait()  # a flush is writing on another thread
+                if self._closed or not self._dirty:
+                    continue
+                self._dirty = False
+                self._writing = True
+            self._write()
+
+    def _write(self) -> bool:
+        """Run the write callable; the caller must have set _writing"""
+        try:
+            result = self.write()
+        except Exception as e:
+            logger.error(f"Error in background save: {e}")
+            result = False
+        with self._condition:
+            self._writing = False
+            self._last_result = result
+            self._condition.notify_all()
+        return result
+
+    def flush(self) -> bool:
+        """Write pending state now, on the calling thread, once any write in
+        progress has finished"""
+        with self._condition:
+            while self._writing:
+                self._condition.wait()
+            if not self._dirty:
+                return self._last_result
+            self._dirty = False
+            self._writing = True
+        return self._write()
+
+    def close(self) -> bool:
+        """Flush pending state and stop the background thread"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+        return self.flush()
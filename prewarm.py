@@ -0,0 +1,201 @@
+"""
+Prewarmed launches - keep idle instances of heavy applications started
+ahead of time and hand one out when their hotkey fires
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, NamedTuple, Optional, Tuple
+
+from launcher import LAUNCHER_EXEC, LaunchPlan
+from lazy import LazyModule
+
+subprocess = LazyModule('subprocess')  # imported when the first instance is warmed
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 1
+DEFAULT_IDLE_TIMEOUT = 600.0  # seconds without a hand-out before the pool is emptied
+
+SW_HIDE = 0
+
+
+class PrewarmSettings(NamedTuple):
+    """How many idle instances to keep, and for how long without use"""
+    size: int = DEFAULT_POOL_SIZE
+    idle_timeout: float = DEFAULT_IDLE_TIMEOUT
+
+
+def spawn_hidden(plan: LaunchPlan):
+    """Start an application from its plan with its window hidden
+
+    Windows honours the hidden start for applications that use the default
+    show command; elsewhere the instance is started as is.
+    """
+    kwargs = {}
+    if os.name == 'nt':
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        startupinfo.wShowWindow = SW_HIDE
+        kwargs['startupinfo'] = startupinfo
+    return subprocess.Popen(list(plan.argv), cwd=plan.cwd, env=plan.env, **kwargs)
+
+
+class PrewarmPool:
+    """Idle instances per application path, replenished in the background
+
+    ``acquire`` is a deque pop: it never spawns on the caller's thread. A
+    single maintenance thread tops every pool up to its size after a
+    hand-out, drops instances that exited on their own or were started from
+    a plan that has since changed, and empties a pool once nothing was
+    acquired from it for its ``idle_timeout``. An emptied pool is warmed
+    again by the next acquire. With ``interval=0`` no thread is started and
+    ``maintain`` must be called by the owner.
+    """
+
+    def __init__(self, plan_for: Callable[[str], LaunchPlan],
+                 spawn: Callable[[LaunchPlan], object] = spawn_hidden,
+                 interval: float = 5.0):
+        self.plan_for = plan_for
+        self.spawn = spawn
+        self.interval = interval
+        self.stats: Dict[str, int] = {'spawned': 0, 'handed_out': 0, 'misses': 0, 'evicted': 0}
+        self._settings: Dict[str, PrewarmSettings] = {}
+        self._idle: Dict[str, Deque[Tuple[object, LaunchPlan]]] = {}
+        self._last_used: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sync(self, settings: Dict[str, PrewarmSettings]):
+        """Set the pools to keep, per application path
+
+        Never blocks: other pools are emptied by the maintenance thread.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._last_used = {app_path: self._last_used.get(app_path, now)
+                               for app_path in settings}
+            self._settings = dict(settings)
+            if settings and self._thread is None and self.interval > 0:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="prewarm-pool",
+                                                daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def acquire(self, app_path: str):
+        """Hand out a live idle instance of app_path, or None to start one cold"""
+        with self._lock:
+            if app_path not in self._settings:
+                return None
+            self._last_used[app_path] = time.monotonic()
+            idle = self._idle.get(app_path)
+            while idle:
+                process, _ = idle.popleft()
+                if process.poll() is None:
+                    self.stats['handed_out'] += 1
+                    break
+                process = None
+            else:
+                process = None
+                self.stats['misses'] += 1
+        self._wake.set()  # replenish
+        return process
+
+    def idle_count(self, app_path: str) -> int:
+        """Return the number of idle instances kept for app_path"""
+        return len(self._idle.get(app_path, ()))
+
+    def maintain(self):
+        """Evict unused or stale pools and top the others up; one pass"""
+        now = time.monotonic()
+        with self._lock:
+            settings = dict(self._settings)
+            last_used = dict(self._last_used)
+            dropped = [app_path for app_path in self._idle if app_path not in settings]
+        for app_path in dropped:
+            self._evict(app_path)
+        for app_path, pool in settings.items():
+            if now - last_used.get(app_path, now) > pool.idle_timeout:
+                self._evict(app_path)
+                continue
+            try:
+                plan = self.plan_for(app_path)
+            except OSError as e:
+                logger.warning(f"Cannot prewarm {app_path}: {e}")
+                self._evict(app_path)
+                continue
+            if plan.launcher != LAUNCHER_EXEC:
+                continue  # shell-opened files give no process to hand out
+            self._drop_stale(app_path, plan)
+            while self.idle_count(app_path) < pool.size and not self._stop.is_set():
+                process = self.spawn(plan)
+                with self._lock:
+                    keep = app_path in self._settings  # not dropped while spawning
+                    if keep:
+                        self._idle.setdefault(app_path, deque()).append((process, plan))
+                        self.stats['spawned'] += 1
+                if not keep:
+                    _terminate(process)
+                    break
+                logger.info(f"Prewarmed {app_path} (pid {process.pid})")
+
+    def _drop_stale(self, app_path: str, plan: LaunchPlan):
+        """Terminate idle instances that exited or were started from an older plan"""
+        with self._lock:
+            idle = self._idle.get(app_path)
+            if not idle:
+                return
+            stale = [entry for entry in idle if entry[1] != plan or entry[0].poll() is not None]
+            for entry in stale:
+                idle.remove(entry)
+        for process, _ in stale:
+            _terminate(process)
+
+    def _evict(self, app_path: str):
+        """Terminate every idle instance of app_path"""
+        with self._lock:
+            idle = self._idle.pop(app_path, None)
+            if not idle:
+                return
+            self.stats['evicted'] += len(idle)
+        logger.info(f"Evicting {len(idle)} prewarmed instance(s) of {app_path}")
+        for process, _ in idle:
+            _terminate(process)
+
+    def _run(self):
+        """Maintenance loop, woken early by sync and acquire"""
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                self.maintain()
+            except Exception as e:
+                logger.error(f"Error maintaining prewarm pool: {e}")
+            self._wake.wait(self.interval)
+
+    def close(self):
+        """Stop the maintenance thread and terminate every idle instance"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            self._settings = {}
+        self._stop.set()
+        self._wake.set()
+        if thread is not None:
+            thread.join()
+        for app_path in list(self._idle):
+            self._evict(app_path)
+
+
+def _terminate(process):
+    """Stop an idle instance that was never handed out"""
+    try:
+        if process.poll() is None:
+            process.terminate()
+            process.wait(timeout=5)
+    except Exception as e:
+        logger.warning(f"Error stopping prewarmed process: {e}")
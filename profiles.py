@@ -0,0 +1,106 @@
+"""
+Mapping profiles - named layers of mappings with inheritance
+"""
+
+import logging
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# The profile made of the config's top-level "mappings"; every chain ends here
+DEFAULT_PROFILE = 'default'
+
+
+class ProfileError(ValueError):
+    """Raised for unknown profiles and inheritance cycles"""
+
+
+class Profile:
+    """One named layer of mappings on top of its parent profile
+
+    A mapping to None hides the binding the parent would provide, so a
+    profile only stores what differs from the profile it inherits. A profile
+    created with a loader reads its mappings on first use.
+    """
+
+    __slots__ = ('name', 'parent', '_mappings', '_loader')
+
+    def __init__(self, name: str, parent: str = DEFAULT_PROFILE,
+                 mappings: Optional[Dict[str, Optional[str]]] = None,
+                 loader: Optional[Callable[[str], Dict[str, Optional[str]]]] = None):
+        self.name = name
+        self.parent = parent
+        self._loader = loader
+        self._mappings: Optional[Dict[str, Optional[str]]] = (
+            None if loader is not None and mappings is None else dict(mappings or {}))
+
+    @property
+    def mappings(self) -> Dict[str, Optional[str]]:
+        if self._mappings is None:
+            self._mappings = dict(self._loader(self.name))
+        return self._mappings
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the mappings have been read"""
+        return self._mappings is not None
+
+    def to_config(self) -> dict:
+        """Return the profile as stored in the config file"""
+        return {'inherits': self.parent, 'mappings': dict(self.mappings)}
+
+
+def profile_chain(profiles: Dict[str, Profile], name: str) -> List[str]:
+    """Return name and its ancestors, nearest first, excluding the default profile"""
+    chain = []
+    while name != DEFAULT_PROFILE:
+        profile = profiles.get(name)
+        if profile is None:
+            raise ProfileError(f"Unknown profile: {name}")
+        if name in chain:
+            raise ProfileError(f"Profile inheritance cycle: {' -> '.join(chain + [name])}")
+        chain.append(name)
+        name = profile.parent
+    return chain
+
+
+def build_profiles(config: Dict[str, dict],
+                   loader: Optional[Callable[[str], Dict[str, Optional[str]]]] = None
+                   ) -> Dict[str, Profile]:
+    """Create profiles from their config form, dropping broken inheritance with a warning
+
+    Profiles whose mappings are None in the config have not been read yet
+    and get them from loader on first use.
+    """
+    profiles = {name: Profile(name, entry['inherits'], entry['mappings'], loader)
+                for name, entry in config.items()}
+    for name in list(profiles):
+        try:
+            profile_chain(profiles, name)
+        except ProfileError as e:
+            logger.warning(f"Skipping profile {name}: {e}")
+            del profiles[name]
+    return profiles
+
+
+def resolve_mappings(base: Dict[str, str], profiles: Dict[str, Profile],
+                     name: str) -> Dict[str, str]:
+    """Return the effective mappings of a profile, with its ancestors applied"""
+    mappings = dict(base)
+    for profile_name in reversed(profile_chain(profiles, name)):
+        for key_combo, app_path in profiles[profile_name].mappings.items():
+            if app_path is None:
+                mappings.pop(key_combo, None)
+            else:
+                mappings[key_combo] = app_path
+    return mappings
+
+
+def effective_value(base: Dict[str, str], profiles: Dict[str, Profile],
+                    name: str, key_combo: str) -> Optional[str]:
+    """Return what one key combination maps to in a profile, or None"""
+    for profile_name in profile_chain(profiles, name):
+        layer = profiles[profile_name].mappings
+        if key_combo in layer:
+            return layer[key_combo]
+    return base.get(key_combo)
@@ -0,0 +1,125 @@
+"""
+Mapping search - prefix, substring and fuzzy matching over mappings
+"""
+
+import os
+from typing import Dict, List, Mapping, Optional, Set, Tuple
+
+from mapping_table import MappingTable
+
+
+def trigrams(text: str) -> Set[str]:
+    """Return the set of three-character substrings of text"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class MappingSearchIndex:
+    """Search index over key combinations and application paths
+
+    Each mapping is indexed by a lowercased document and its trigrams, and
+    the index is updated one mapping at a time, so a query never scans the
+    full mapping dict. Results are ranked: key prefix, application name
+    prefix, substring anywhere, then fuzzy matches that share at least
+    ``min_similarity`` of the query's trigrams.
+    """
+
+    def __init__(self, min_similarity: float = 0.5):
+        self.min_similarity = min_similarity
+        # key_combo -> (key, app name, text, app path as indexed)
+        self.documents: Dict[str, Tuple[str, str, str, str]] = {}
+        self.postings: Dict[str, Set[str]] = {}  # trigram -> key_combos
+        self._last_query = ''
+        self._last_matches: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def set(self, key_combo: str, app_path: str):
+        """Index or re-index one mapping"""
+        if key_combo in self.documents:
+            self.remove(key_combo)
+        key = key_combo.lower()
+        name = os.path.basename(app_path).lower()
+        document = f"{key}\n{app_path.lower()}"
+        self.documents[key_combo] = (key, name, document, app_path)
+        for gram in trigrams(document):
+            self.postings.setdefault(gram, set()).add(key_combo)
+        self._last_matches = None
+
+    def remove(self, key_combo: str):
+        """Drop one mapping from the index"""
+        entry = self.documents.pop(key_combo, None)
+        if entry is None:
+            return
+        for gram in trigrams(entry[2]):
+            keys = self.postings.get(gram)
+            if keys is not None:
+                keys.discard(key_combo)
+                if not keys:
+                    del self.postings[gram]
+        self._last_matches = None
+
+    def sync(self, mappings: Mapping[str, str]):
+        """Re-index only the mappings that differ from mappings"""
+        documents = self.documents
+        keys = mappings.records if isinstance(mappings, MappingTable) else mappings
+        for key_combo in [key_combo for key_combo in documents if key_combo not in keys]:
+            self.remove(key_combo)
+        for key_combo, app_path in mappings.items():
+            entry = documents.get(key_combo)
+            if entry is None or entry[3] != app_path:
+                self.set(key_combo, app_path)
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """Return matching key combinations, best first"""
+        query = query.strip().lower()
+        if not query:
+            return sorted(self.documents)
+
+        # Typing one more character can only narrow the substring matches
+        if (self._last_matches is not None and self._last_query
+                and query.startswith(self._last_query)):
+            candidates = self._last_matches
+        elif len(query) >= 3:
+            candidates = self._trigram_candidates(query)
+        else:
+            candidates = self.documents
+        matches = [key_combo for key_combo in candidates
+                   if query in self.documents[key_combo][2]]
+        self._last_query, self._last_matches = query, matches
+
+        ranked = sorted(matches, key=lambda key_combo: (self._rank(query, key_combo), key_combo))
+        if len(query) >= 3 and (limit is None or len(ranked) < limit):
+            ranked += self._fuzzy(query, set(matches))
+        return ranked if limit is None else ranked[:limit]
+
+    def _rank(self, query: str, key_combo: str) -> int:
+        key, name, _, _ = self.documents[key_combo]
+        if key.startswith(query):
+            return 0
+        if name.startswith(query):
+            return 1
+        return 2
+
+    def _trigram_candidates(self, query: str) -> Set[str]:
+        """Mappings containing every trigram of query"""
+        postings = sorted((self.postings.get(gram, set()) for gram in trigrams(query)), key=len)
+        candidates = set(postings[0])
+        for keys in postings[1:]:
+            candidates &= keys
+            if not candidates:
+                break
+        return candidates
+
+    def _fuzzy(self, query: str, exclude: Set[str]) -> List[str]:
+        """Mappings sharing enough trigrams with query, most similar first"""
+        grams = trigrams(query)
+        counts: Dict[str, int] = {}
+        for gram in grams:
+            for key_combo in self.postings.get(gram, ()):
+                counts[key_combo] = counts.get(key_combo, 0) + 1
+        needed = self.min_similarity * len(grams)
+        scored = [(-count, key_combo) for key_combo, count in counts.items()
+                  if count >= needed and key_combo not in exclude]
+        scored.sort()
+        return [key_combo for _, key_combo in scored]
@@ -0,0 +1,52 @@
+"""
+Startup timing - milestones from process start to a usable application
+
+Import this module first so that its clock starts as early as possible.
+When the KEYMAPPER_STARTUP_REPORT environment variable names a file, the
+GUI and daemon write their milestones there once startup is complete;
+``python build.py --report`` uses this to time the packaged executable.
+"""
+
+import os
+import sys
+import time
+import logging
+from typing import Dict, Optional
+
+from lazy import LazyModule
+
+json = LazyModule('json')
+
+logger = logging.getLogger(__name__)
+
+REPORT_ENV = 'KEYMAPPER_STARTUP_REPORT'
+
+# Milestones
+IMPORTS_DONE = 'imports_done'  # application modules imported
+FIRST_WINDOW = 'first_window'  # main window drawn
+HOOKS_ACTIVE = 'hooks_active'  # key mapping started for the first time
+
+_started = time.perf_counter()
+milestones: Dict[str, float] = {}
+
+
+def mark(name: str):
+    """Record the first time milestone name is reached, in ms since startup"""
+    if name not in milestones:
+        milestones[name] = (time.perf_counter() - _started) * 1000
+
+
+def report_path() -> Optional[str]:
+    """Return the file a startup report was requested for, if any"""
+    return os.environ.get(REPORT_ENV) or None
+
+
+def write_report(path: str) -> bool:
+    """Write the milestones and the number of loaded modules as JSON"""
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'milestones': milestones, 'modules_loaded': len(sys.modules)}, f, indent=2)
+        return True
+    except OSError as e:
+        logger.error(f"Error writing startup report {path}: {e}")
+        return False
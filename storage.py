@@ -0,0 +1,430 @@
+"""
+Mapping storage - where KeyMapper keeps its config: a JSON document (the
+default) or an SQLite database for very large catalogs
+"""
+
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from lazy import LazyModule
+from combos import seed_canonical_cache
+from dispatcher import compile_combos, seed_combo_cache
+from persistence import (ConfigCache, atomic_write_json, validate_config,
+                         validate_instance_modes, validate_prewarm, validate_profiles)
+from profiles import DEFAULT_PROFILE
+from watcher import Signature, file_signature
+
+json = LazyModule('json')  # not needed on a warm start from the sidecar cache
+sqlite3 = LazyModule('sqlite3')  # only needed for SQLite stores
+
+logger = logging.getLogger(__name__)
+
+SQLITE_SUFFIXES = ('.db', '.sqlite', '.sqlite3')
+SQLITE_SCHEMA_VERSION = 1
+
+_MISSING = object()
+
+
+def empty_config() -> dict:
+    """Return the config of a store that holds nothing yet"""
+    return {'mappings': {}, 'original_mappings': {}, 'profiles': {},
+            'active_profile': DEFAULT_PROFILE, 'instance_modes': {}, 'prewarm': {},
+            'journal_seq': 0, 'journal_epoch': None}
+
+
+class MappingStore:
+    """Storage behind KeyMapper's load and save
+
+    A store reads and writes whole configs in the form of KeyMapper's config
+    reader: mappings, original_mappings, profiles (``{'inherits': parent,
+    'mappings': {...}}`` each), active_profile, instance_modes, prewarm and
+    journal_seq and journal_epoch. A profile whose mappings are None has not been read yet;
+    read_profile() reads it when first needed.
+    """
+
+    # Whether write() only touches the entries that changed, so KeyMapper
+    # does not need its own journal
+    incremental = False
+
+    path: Path
+
+    def exists(self) -> bool:
+        """Whether there is anything stored yet"""
+        raise NotImplementedError
+
+    def read(self) -> dict:
+        """Read the validated config"""
+        raise NotImplementedError
+
+    def read_profile(self, name: str) -> Dict[str, Optional[str]]:
+        """Read the mappings one profile stores itself"""
+        raise NotImplementedError
+
+    def write(self, config: dict):
+        """Store a config"""
+        raise NotImplementedError
+
+    def find(self, key_combo: Optional[str] = None,
+             app_path: Optional[str] = None) -> List[Tuple[str, str, Optional[str]]]:
+        """Return (profile, key combination, path) rows of every stored profile
+        that binds key_combo and/or launches app_path
+
+        Only stores that leave profiles unread need it.
+        """
+        raise NotImplementedError
+
+    @property
+    def watch_path(self) -> Path:
+        """File whose changes mean another process wrote the store"""
+        return self.path
+
+    def signature(self) -> Signature:
+        """Return a value that changes whenever another process writes the store"""
+        return file_signature(self.path)
+
+    def close(self):
+        """Release the store's resources"""
+
+
+class JsonStore(MappingStore):
+    """Config kept as one JSON document, with an optional sidecar cache"""
+
+    def __init__(self, path: Union[str, Path], use_cache: bool = False):
+        self.path = Path(path)
+        self.cache = ConfigCache(self.path) if use_cache else None
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def read(self) -> dict:
+        """Read the config, from the sidecar cache when fresh"""
+        if self.cache is not None:
+            table = self.cache.load()
+            if table is not None:
+                seed_combo_cache(table['combos'])
+                seed_canonical_cache(table['combos'])
+                return table
+        if not self.path.exists():
+            return empty_config()
+
+        with open(self.path, 'rb') as f:
+            raw = f.read()
+        data = json.loads(raw)
+        mappings, original_mappings = validate_config(data)
+        profiles, active_profile = validate_profiles(data)
+        journal_seq = data.get('journal_seq', 0)
+        journal_epoch = data.get('journal_epoch')
+        config = {
+            'mappings': mappings,
+            'original_mappings': original_mappings,
+            'profiles': profiles,
+            'active_profile': active_profile,
+            'instance_modes': validate_instance_modes(data),
+            'prewarm': validate_prewarm(data),
+            'journal_seq': journal_seq if isinstance(journal_seq, int) else 0,
+            'journal_epoch': journal_epoch if isinstance(journal_epoch, str) else None,
+        }
+        self._store_cache(raw, config)
+        return config
+
+    def read_profile(self, name: str) -> Dict[str, Optional[str]]:
+        return self.read()['profiles'].get(name, {}).get('mappings', {})
+
+    def write(self, config: dict):
+        data = {
+            'mappings': config['mappings'],
+            'original_mappings': config['original_mappings']
+        }
+        if config['profiles']:
+            data['profiles'] = config['profiles']
+            data['active_profile'] = config['active_profile']
+        if config['instance_modes']:
+            data['instance_modes'] = config['instance_modes']
+        if config['prewarm']:
+            data['prewarm'] = config['prewarm']
+        if config.get('journal_seq'):
+            data['journal_seq'] = config['journal_seq']
+        if config.get('journal_epoch'):
+            data['journal_epoch'] = config['journal_epoch']
+        raw = atomic_write_json(self.path, data, indent=2)
+        self._store_cache(raw, config)
+
+    def _store_cache(self, raw: bytes, config: dict):
+        """Refresh the sidecar cache for the config contents raw"""
+        if self.cache is not None:
+            key_combos = list(config['mappings'])
+            for profile in config['profiles'].values():
+                key_combos.extend(profile['mappings'])
+            self.cache.store(raw, dict(config, combos=compile_combos(key_combos)))
+
+
+# Table name -> (key columns, value columns)
+_TABLES = {
+    'meta': (('key',), ('value',)),
+    'profiles': (('name',), ('inherits',)),
+    'mappings': (('profile', 'combo'), ('path',)),
+    'original_mappings': (('combo',), ('original',)),
+    'instance_modes': (('combo',), ('mode',)),
+    'prewarm': (('combo',), ('size', 'idle_timeout')),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS profiles (name TEXT PRIMARY KEY, inherits TEXT NOT NULL);
+-- The default profile's mappings have profile 'default'; a NULL path hides
+-- the binding a profile inherits
+CREATE TABLE IF NOT EXISTS mappings (
+    profile TEXT NOT NULL,
+    combo TEXT NOT NULL,
+    path TEXT,
+    PRIMARY KEY (profile, combo)
+);
+CREATE INDEX IF NOT EXISTS mappings_combo ON mappings (combo);
+CREATE INDEX IF NOT EXISTS mappings_path ON mappings (path);
+CREATE TABLE IF NOT EXISTS original_mappings (combo TEXT PRIMARY KEY, original TEXT);
+CREATE TABLE IF NOT EXISTS instance_modes (combo TEXT PRIMARY KEY, mode TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS prewarm (
+    combo TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    idle_timeout REAL NOT NULL
+);
+"""
+
+Rows = Dict[str, Dict[tuple, tuple]]  # table -> key columns -> value columns
+
+
+class SqliteStore(MappingStore):
+    """Config kept in an SQLite database, for catalogs too large for one JSON document
+
+    Reading loads the default profile and the active profile's chain; other
+    profiles are read on first use. Writing compares the config with what
+    this store last read or wrote and only touches the rows that differ, in
+    one transaction, so editors in other processes (the GUI and a daemon)
+    keep their own changes. The database runs in WAL mode: readers never
+    block the writer, and a busy writer is waited for.
+    """
+
+    incremental = True
+
+    def __init__(self, path: Union[str, Path], timeout: float = 10.0):
+        self.path = Path(path)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._conn = None
+        self._known: Rows = {table: {} for table in _TABLES}
+
+    def _connect(self):
+        """Open the database on first use; the caller must hold _lock"""
+        if self._conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=self.timeout,
+                                   isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            if conn.execute('PRAGMA user_version').fetchone()[0] == 0:
+                conn.executescript(_SCHEMA)
+                conn.execute(f'PRAGMA user_version={SQLITE_SCHEMA_VERSION}')
+            self._conn = conn
+        return self._conn
+
+    @property
+    def watch_path(self) -> Path:
+        # Commits land in the write-ahead log until it is checkpointed
+        return self.path.with_name(self.path.name + '-wal')
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def signature(self) -> Signature:
+        """Return the database's data_version, which only other connections' commits change"""
+        if not self.path.exists():
+            return None
+        with self._lock:
+            return self._connect().execute('PRAGMA data_version').fetchone()
+
+    def _select(self, table: str, where: str = '', params: tuple = ()) -> Dict[tuple, tuple]:
+        """Read rows as key columns -> value columns; the caller must hold _lock"""
+        keys, values = _TABLES[table]
+        cursor = self._conn.execute(f"SELECT {', '.join(keys + values)} FROM {table} {where}",
+                                    params)
+        return {row[:len(keys)]: row[len(keys):] for row in cursor}
+
+    def read(self) -> dict:
+        """Read the config with the default profile and the active profile's chain"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute('BEGIN')
+            try:
+                meta = self._select('meta')
+                profiles = self._select('profiles')
+                active = meta.get(('active_profile',), (DEFAULT_PROFILE,))[0]
+                chain = [DEFAULT_PROFILE]
+                name = active
+                while (name,) in profiles and name not in chain:
+                    chain.append(name)
+                    name = profiles[(name,)][0]
+                mappings = {}
+                for name in chain:
+                    mappings.update(self._select('mappings', 'WHERE profile = ?', (name,)))
+                known = {
+                    'meta': meta,
+                    'profiles': profiles,
+                    'mappings': mappings,
+                    'original_mappings': self._select('original_mappings'),
+                    'instance_modes': self._select('instance_modes'),
+                    'prewarm': self._select('prewarm'),
+                }
+            finally:
+                conn.execute('COMMIT')
+            self._known = known
+
+        layers: Dict[str, dict] = {name: {} for name in chain}
+        for (profile, combo), (path,) in known['mappings'].items():
+            layers[profile][combo] = path
+        data = {
+            'mappings': layers[DEFAULT_PROFILE],
+            'original_mappings': {combo: original for (combo,), (original,)
+                                  in known['original_mappings'].items()},
+            'profiles': {name: {'inherits': inherits, 'mappings': layers.get(name, {})}
+                         for (name,), (inherits,) in profiles.items()},
+            'active_profile': active,
+            'instance_modes': {combo: mode for (combo,), (mode,)
+                               in known['instance_modes'].items()},
+            'prewarm': {combo: {'size': size, 'idle_timeout': idle_timeout}
+                        for (combo,), (size, idle_timeout) in known['prewarm'].items()},
+        }
+        mappings, original_mappings = validate_config(data)
+        profile_configs, active_profile = validate_profiles(data)
+        for name, profile in profile_configs.items():
+            if name not in layers:
+                profile['mappings'] = None  # read on first use
+        return {
+            'mappings': mappings,
+            'original_mappings': original_mappings,
+            'profiles': profile_configs,
+            'active_profile': active_profile,
+            'instance_modes': validate_instance_modes(data),
+            'prewarm': validate_prewarm(data),
+            'journal_seq': 0,
+            'journal_epoch': None,
+        }
+
+    def read_profile(self, name: str) -> Dict[str, Optional[str]]:
+        with self._lock:
+            self._connect()
+            rows = self._select('mappings', 'WHERE profile = ?', (name,))
+            self._known['mappings'].update(rows)
+        data = {'profiles': {name: {'inherits': DEFAULT_PROFILE,
+                                    'mappings': {combo: path
+                                                 for (_, combo), (path,) in rows.items()}}}}
+        profiles, _ = validate_profiles(data)
+        logger.info(f"Read {len(rows)} mappings of profile {name}")
+        return profiles.get(name, {}).get('mappings', {})
+
+    def write(self, config: dict):
+        """Write the rows that differ from what this store last read or wrote"""
+        rows, loaded = self._rows(config)
+        with self._lock:
+            conn = self._connect()
+            known = self._known
+            # Rows of profiles that were never read are neither compared nor touched
+            known_mappings = {key: value for key, value in known['mappings'].items()
+                              if key[0] in loaded}
+            dropped = [name for (name,) in known['profiles'] if name not in config['profiles']]
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                for name in dropped:
+                    conn.execute('DELETE FROM mappings WHERE profile = ?', (name,))
+                changed = 0
+                for table, (keys, values) in _TABLES.items():
+                    before = known_mappings if table == 'mappings' else known[table]
+                    after = rows[table]
+                    deletes = [key for key in before if key not in after]
+                    upserts = [key + value for key, value in after.items()
+                               if before.get(key, _MISSING) != value]
+                    if deletes:
+                        conn.executemany(
+                            f"DELETE FROM {table} WHERE "
+                            + ' AND '.join(f'{column} = ?' for column in keys), deletes)
+                    if upserts:
+                        conn.executemany(
+                            f"INSERT OR REPLACE INTO {table} ({', '.join(keys + values)}) "
+                            f"VALUES ({', '.join('?' * len(keys + values))})", upserts)
+                    changed += len(deletes) + len(upserts)
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            for table in _TABLES:
+                if table != 'mappings':
+                    known[table] = rows[table]
+            mappings = {key: value for key, value in known['mappings'].items()
+                        if key[0] not in loaded and (key[0],) in rows['profiles']}
+            mappings.update(rows['mappings'])
+            known['mappings'] = mappings
+        logger.info(f"Wrote {changed} changed rows to {self.path}")
+
+    @staticmethod
+    def _rows(config: dict) -> Tuple[Rows, Set[str]]:
+        """Return a config as table rows and the profiles whose mappings it holds"""
+        mappings = {(DEFAULT_PROFILE, combo): (path,)
+                    for combo, path in config['mappings'].items()}
+        loaded = {DEFAULT_PROFILE}
+        for name, profile in config['profiles'].items():
+            if profile['mappings'] is not None:
+                loaded.add(name)
+                mappings.update(((name, combo), (path,))
+                                for combo, path in profile['mappings'].items())
+        rows = {
+            'meta': {('active_profile',): (config['active_profile'],)},
+            'profiles': {(name,): (profile['inherits'],)
+                         for name, profile in config['profiles'].items()},
+            'mappings': mappings,
+            'original_mappings': {(combo,): (original,)
+                                  for combo, original in config['original_mappings'].items()},
+            'instance_modes': {(combo,): (mode,)
+                               for combo, mode in config['instance_modes'].items()},
+            'prewarm': {(combo,): (entry['size'], float(entry['idle_timeout']))
+                        for combo, entry in config['prewarm'].items()},
+        }
+        return rows, loaded
+
+    def find(self, key_combo: Optional[str] = None,
+             app_path: Optional[str] = None) -> List[Tuple[str, str, Optional[str]]]:
+        """Return (profile, key combination, path) rows of every profile that
+        binds key_combo and/or launches app_path, through the indexes"""
+        clauses, params = [], []
+        if key_combo is not None:
+            clauses.append('combo = ?')
+            params.append(key_combo)
+        if app_path is not None:
+            clauses.append('path = ?')
+            params.append(app_path)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        with self._lock:
+            return self._connect().execute(
+                f"SELECT profile, combo, path FROM mappings {where} ORDER BY profile, combo",
+                params).fetchall()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def open_store(path: Union[str, Path], use_cache: bool = False) -> MappingStore:
+    """Return the store for a config path: SQLite for .db/.sqlite files, JSON otherwise"""
+    if Path(path).suffix.lower() in SQLITE_SUFFIXES:
+        return SqliteStore(path)
+    return JsonStore(path, use_cache)
+
+
+def copy_store(source: MappingStore, target: MappingStore):
+    """Copy every profile from one store to another, e.g. from JSON to SQLite"""
+    config = source.read()
+    for name, profile in config['profiles'].items():
+        if profile['mappings'] is None:
+            profile['mappings'] = source.read_profile(name)
+    target.write(config)
@@ -0,0 +1,69 @@
+"""
+Smoke tests for the benchmark suite
+"""
+
+import unittest
+import os
+import json
+import tempfile
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks import fake_keyboard
+
+
+class TestBenchmarks(unittest.TestCase):
+    """Run the benchmark suite at a tiny scale"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        fake_keyboard.install()
+        self.addCleanup(fake_keyboard.uninstall)
+        from benchmarks import bench_mapper
+        self.bench = bench_mapper
+
+    def test_generate_combos_are_unique(self):
+        """Test that generated combinations never collide"""
+        combos = self.bench.generate_combos(2000)
+        self.assertEqual(len(set(combos)), 2000)
+
+    def test_modes_match_the_same_stream(self):
+        """Test that both dispatch modes resolve the same events"""
+        document = self.bench.run_benchmarks([10, 200], ['hotkey', 'hook'],
+                                             event_count=500, miss_ratio=0.2)
+        self.assertEqual(document['version'], self.bench.RESULTS_VERSION)
+        matched = {(r['mode'], r['mappings']): r['matched'] for r in document['results']}
+        self.assertEqual(matched[('hotkey', 10)], matched[('hook', 10)])
+        self.assertEqual(matched[('hotkey', 200)], matched[('hook', 200)])
+        self.assertGreater(matched[('hook', 200)], 0)
+        for result in document['results']:
+            self.assertEqual(result['events'], 500)
+            self.assertIn('p99', result['latency_us'])
+
+    def test_replay_and_output(self):
+        """Test replaying a recorded stream and writing results"""
+        temp_dir = tempfile.mkdtemp()
+        replay_path = os.path.join(temp_dir, 'events.jsonl')
+        output_path = os.path.join(temp_dir, 'results.json')
+        combo = self.bench.generate_combos(1)[0]
+        with open(replay_path, 'w') as f:
+            for event_type in ('down', 'up'):
+                for key in combo.split('+'):
+                    f.write(json.dumps({'event_type': event_type, 'name': key}) + '\n')
+        try:
+            self.bench.main(['--sizes', '5', '--replay', replay_path,
+                             '--output', output_path])
+            with open(output_path, 'r') as f:
+                document = json.load(f)
+            self.assertEqual([r['matched'] for r in document['results']], [1, 1])
+        finally:
+            for path in (replay_path, output_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            os.rmdir(temp_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
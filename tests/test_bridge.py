@@ -0,0 +1,82 @@
+"""
+Unit tests for the GUI-to-engine bridge
+"""
+
+import unittest
+import os
+import threading
+import time
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bridge import EngineBridge
+
+
+class TestEngineBridge(unittest.TestCase):
+    """Test cases for EngineBridge"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.bridge = EngineBridge()
+
+    def tearDown(self):
+        """Stop the worker thread"""
+        self.bridge.close(timeout=5)
+
+    def wait_for_results(self, count):
+        """Poll until count callbacks have run"""
+        handled = 0
+        deadline = time.monotonic() + 5
+        while handled < count and time.monotonic() < deadline:
+            handled += self.bridge.poll()
+            time.sleep(0.001)
+        return handled
+
+    def test_callbacks_run_on_polling_thread(self):
+        """Test that work runs on the worker and callbacks on the poller"""
+        results = []
+        self.bridge.submit(threading.get_ident,
+                           callback=lambda result, error: results.append(
+                               (result, threading.get_ident())))
+        self.assertTrue(self.bridge.busy)
+        self.assertEqual(self.wait_for_results(1), 1)
+        worker, poller = results[0]
+        self.assertNotEqual(worker, poller)
+        self.assertEqual(poller, threading.get_ident())
+        self.assertFalse(self.bridge.busy)
+
+    def test_commands_run_in_order(self):
+        """Test that commands run in submission order"""
+        results = []
+        for i in range(20):
+            self.bridge.submit(lambda i=i: i,
+                               callback=lambda result, error: results.append(result))
+        self.assertEqual(self.wait_for_results(20), 20)
+        self.assertEqual(results, list(range(20)))
+
+    def test_errors_are_passed_to_callback(self):
+        """Test that an exception is delivered instead of a result"""
+        errors = []
+
+        def fail():
+            raise RuntimeError("boom")
+
+        self.bridge.submit(fail, callback=lambda result, error: errors.append(error))
+        self.wait_for_results(1)
+        self.assertIsInstance(errors[0], RuntimeError)
+
+    def test_poll_does_not_block(self):
+        """Test that polling returns immediately while a command is running"""
+        release = threading.Event()
+        self.bridge.submit(release.wait, 5)
+        started = time.monotonic()
+        self.assertEqual(self.bridge.poll(), 0)
+        self.assertLess(time.monotonic() - started, 0.5)
+        release.set()
+        self.assertEqual(self.wait_for_results(1), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+"""
+Unit tests for bulk import/export
+"""
+
+import unittest
+import os
+import io
+import json
+import tempfile
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bulk import FORMAT_CSV, FORMAT_JSONL, check_paths, detect_format, read_records
+from dispatcher import SyntheticEventSource
+from executor import LaunchExecutor
+from key_mapper import KeyMapper, DISPATCH_HOOK
+
+
+class TestBulkFormats(unittest.TestCase):
+    """Test cases for record parsing"""
+
+    def test_detect_format(self):
+        """Test that the format follows the file extension"""
+        self.assertEqual(detect_format('maps.CSV'), FORMAT_CSV)
+        self.assertEqual(detect_format('maps.jsonl'), FORMAT_JSONL)
+        self.assertEqual(detect_format(io.StringIO()), FORMAT_JSONL)
+        with self.assertRaises(ValueError):
+            detect_format('maps.csv', 'xml')
+
+    def test_malformed_lines_are_reported(self):
+        """Test that bad lines are skipped with their line numbers"""
+        errors = []
+        f = io.StringIO('{"key": "alt+a", "path": "a.exe"}\nnot json\n\n{"key": 1}\n')
+        self.assertEqual(list(read_records(f, FORMAT_JSONL, errors)), [(1, 'alt+a', 'a.exe')])
+        self.assertEqual([error.split(':')[0] for error in errors], ['line 2', 'line 4'])
+
+        errors = []
+        f = io.StringIO('key,path\nalt+a,a.exe\nalt+b\n')
+        self.assertEqual(list(read_records(f, FORMAT_CSV, errors)), [(2, 'alt+a', 'a.exe')])
+        self.assertEqual(len(errors), 1)
+
+    def test_check_paths_in_batches(self):
+        """Test that parallel batches check every distinct path"""
+        paths = [f'p{i}' for i in range(10)] * 2
+        exists = check_paths(paths, workers=4, batch_size=3,
+                             probe=lambda path: path.endswith(('0', '5')))
+        self.assertEqual(len(exists), 10)
+        self.assertEqual(sorted(path for path, ok in exists.items() if ok), ['p0', 'p5'])
+
+
+class TestKeyMapperBulk(unittest.TestCase):
+    """Test import and export through KeyMapper"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_file = os.path.join(self.temp_dir, 'test_mappings.json')
+        self.apps = []
+        for i in range(3):
+            app = os.path.join(self.temp_dir, f'app{i}.exe')
+            with open(app, 'w') as f:
+                f.write('test')
+            self.apps.append(app)
+        self.source = SyntheticEventSource()
+        self.mapper = KeyMapper(config_file=self.config_file, dispatch_mode=DISPATCH_HOOK,
+                                event_source=self.source,
+                                executor=LaunchExecutor(workers=0, debounce=0))
+        self.launched = []
+        self.mapper.launch_application = self.launched.append
+        self.mapper.add_mapping('alt+a', self.apps[0])
+        self.mapper.add_mapping('alt+b', self.apps[1])
+        self.saves = []
+        save = self.mapper.save_mappings
+        self.mapper.save_mappings = lambda: self.saves.append(1) or save()
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.mapper.shutdown()
+        for name in os.listdir(self.temp_dir):
+            os.remove(os.path.join(self.temp_dir, name))
+        os.rmdir(self.temp_dir)
+
+    def catalog(self):
+        """Return a JSON Lines catalog with conflicts and problems"""
+        lines = [
+            {'key': 'alt+a', 'path': self.apps[0]},  # unchanged
+            {'key': 'alt+b', 'path': self.apps[2]},  # conflicts with the current mapping
+            {'key': 'alt+c', 'path': self.apps[2]},
+            {'key': 'alt+d', 'path': os.path.join(self.temp_dir, 'missing.exe')},
+            {'key': 'a+b', 'path': self.apps[2]},
+        ]
+        return io.StringIO(''.join(json.dumps(line) + '\n' for line in lines) + 'oops\n')
+
+    def test_dry_run_reports_without_changing(self):
+        """Test that a dry run lists conflicts and invalid entries only"""
+        report = self.mapper.import_mappings(self.catalog(), dry_run=True)
+        self.assertEqual(report.added, {'alt+c': self.apps[2]})
+        self.assertEqual(report.replaced, {'alt+b': (self.apps[1], self.apps[2])})
+        self.assertEqual(report.unchanged, ['alt+a'])
+        self.assertEqual(list(report.invalid_paths), ['alt+d'])
+        self.assertEqual(list(report.invalid_combos), ['a+b'])
+        self.assertEqual(len(report.errors), 1)
+        self.assertFalse(report.committed)
+        self.assertNotIn('alt+c', self.mapper.mappings)
+        self.assertEqual(self.saves, [])
+
+    def test_import_commits_once(self):
+        """Test that valid records are bound live and saved in a single write"""
+        self.mapper.start_mapping()
+        report = self.mapper.import_mappings(self.catalog())
+        self.assertTrue(report.committed)
+        self.assertEqual(self.saves, [1])
+        self.assertEqual(self.mapper.mappings['alt+b'], self.apps[2])
+
+        self.source.tap('alt+c')
+        self.assertEqual(self.launched, [self.apps[2]])
+        with open(self.config_file) as f:
+            self.assertEqual(json.load(f)['mappings']['alt+c'], self.apps[2])
+
+    def test_export_round_trip(self):
+        """Test that an export imports back as unchanged, in both formats"""
+        for name in ('export.jsonl', 'export.csv'):
+            path = os.path.join(self.temp_dir, name)
+            self.assertEqual(self.mapper.export_mappings(path), 2)
+            report = self.mapper.import_mappings(path, dry_run=True)
+            self.assertEqual(sorted(report.unchanged), ['alt+a', 'alt+b'])
+            self.assertTrue(report.ok)
+
+    def test_unknown_profile(self):
+        """Test that importing into an unknown profile changes nothing"""
+        report = self.mapper.import_mappings(self.catalog(), profile='missing')
+        self.assertFalse(report.committed)
+        self.assertNotIn('alt+c', self.mapper.mappings)
+
+
+if __name__ == '__main__':
+    unittest.main()
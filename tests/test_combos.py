@@ -0,0 +1,137 @@
+"""
+Unit tests for key combination canonicalization and conflict detection
+"""
+
+import unittest
+import os
+import json
+import tempfile
+import time
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from combos import (CONFLICT_DUPLICATE, CONFLICT_PREFIX, CONFLICT_SYSTEM, ConflictIndex,
+                    canonical_combo, parse_chords)
+from dispatcher import SyntheticEventSource
+from executor import LaunchExecutor
+from key_mapper import KeyMapper, DISPATCH_HOOK
+
+
+class TestCanonicalCombo(unittest.TestCase):
+    """Test cases for canonical_combo and parse_chords"""
+
+    def test_spellings_share_one_form(self):
+        """Test that order, case, spacing and aliases do not matter"""
+        for spelling in ('Ctrl+Shift+A', 'shift+ctrl+a', ' ctrl + SHIFT + a', 'control+shift+a'):
+            self.assertEqual(canonical_combo(spelling), 'ctrl+shift+a')
+        self.assertEqual(canonical_combo('Ctrl+K,Ctrl+C'), 'ctrl+k, ctrl+c')
+        self.assertEqual(canonical_combo('alt+ctrl'), 'alt+ctrl')  # ctrl is the trigger
+        self.assertEqual(canonical_combo(''), '')
+
+    def test_chords_are_interned(self):
+        """Test that equal chords are the same frozenset object"""
+        first, = parse_chords('Ctrl+Shift+A')
+        second, = parse_chords('shift+ctrl+a')
+        self.assertIs(first, second)
+        self.assertEqual(first, frozenset({'ctrl', 'shift', 'a'}))
+
+
+class TestConflictIndex(unittest.TestCase):
+    """Test cases for ConflictIndex"""
+
+    def test_check(self):
+        """Test duplicate, prefix and system shortcut conflicts of one combination"""
+        index = ConflictIndex(['ctrl+k, ctrl+c', 'alt+f1'])
+        self.assertEqual([c.kind for c in index.check('Alt+F1')], [CONFLICT_DUPLICATE])
+        self.assertEqual(index.check('alt+f1'), [])
+        self.assertEqual([(c.kind, c.other) for c in index.check('ctrl+k')],
+                         [(CONFLICT_PREFIX, 'ctrl+k, ctrl+c')])
+        self.assertEqual([(c.kind, c.other) for c in index.check('Tab+Alt')],
+                         [(CONFLICT_SYSTEM, 'alt+tab')])
+
+    def test_bulk_conflicts_follow_removals(self):
+        """Test that conflicts() reflects adds and removes"""
+        index = ConflictIndex(['ctrl+k', 'ctrl+k, ctrl+c', 'win+l'])
+        self.assertEqual({c.kind for c in index.conflicts()}, {CONFLICT_PREFIX, CONFLICT_SYSTEM})
+        index.remove('ctrl+k')
+        index.remove('Win+L')
+        self.assertEqual(index.conflicts(), [])
+        index.remove('ctrl+k, ctrl+c')
+        self.assertEqual(index.extensions, {})
+
+    def test_add_and_check_scale(self):
+        """Test that adding and checking stay cheap at 10k mappings"""
+        index = ConflictIndex(f'ctrl+alt+f{i % 24 + 1}, {i}' for i in range(10000))
+        self.assertEqual(len(index), 10000)
+        start = time.perf_counter()
+        for i in range(100):
+            index.add(f'shift+f{i}')
+            index.check(f'alt+shift+f{i}')
+        self.assertLess((time.perf_counter() - start) / 100, 0.001)
+
+
+class TestKeyMapperCanonicalKeys(unittest.TestCase):
+    """Test that KeyMapper stores and dispatches canonical combinations"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_file = os.path.join(self.temp_dir, 'test_mappings.json')
+        self.temp_app = os.path.join(self.temp_dir, 'test_app.exe')
+        with open(self.temp_app, 'w') as f:
+            f.write('test')
+        self.source = SyntheticEventSource()
+        self.launched = []
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        for name in os.listdir(self.temp_dir):
+            os.remove(os.path.join(self.temp_dir, name))
+        os.rmdir(self.temp_dir)
+
+    def create_mapper(self):
+        """Create a hook-mode mapper that records launches"""
+        mapper = KeyMapper(config_file=self.config_file, dispatch_mode=DISPATCH_HOOK,
+                           event_source=self.source,
+                           executor=LaunchExecutor(workers=0, debounce=0))
+        mapper.launch_application = self.launched.append
+        self.addCleanup(mapper.shutdown)
+        return mapper
+
+    def test_spellings_merge_into_one_mapping(self):
+        """Test that adding another spelling replaces the mapping and fires once"""
+        mapper = self.create_mapper()
+        mapper.add_mapping('Ctrl+Shift+A', self.temp_app)
+        mapper.add_mapping('shift+ctrl+a', self.temp_app)
+        self.assertEqual(mapper.get_all_mappings(), {'ctrl+shift+a': self.temp_app})
+        mapper.start_mapping()
+        self.source.tap('ctrl+shift+a')
+        self.assertEqual(self.launched, [self.temp_app])
+        self.assertTrue(mapper.remove_mapping('SHIFT+CTRL+A'))
+        self.assertEqual(mapper.get_all_mappings(), {})
+
+    def test_load_merges_duplicates(self):
+        """Test that a config with several spellings loads as one mapping"""
+        with open(self.config_file, 'w') as f:
+            json.dump({'mappings': {'Ctrl+Shift+A': 'first.exe', 'shift+ctrl+a': self.temp_app},
+                       'original_mappings': {}}, f)
+        mapper = self.create_mapper()
+        self.assertEqual(mapper.get_all_mappings(), {'ctrl+shift+a': self.temp_app})
+
+    def test_conflicts_track_the_active_profile(self):
+        """Test that the conflict index follows adds, removes and profile switches"""
+        mapper = self.create_mapper()
+        mapper.add_mapping('ctrl+k, ctrl+c', self.temp_app)
+        mapper.add_mapping('Ctrl+K', self.temp_app)
+        self.assertEqual([c.kind for c in mapper.get_conflicts()], [CONFLICT_PREFIX])
+        mapper.create_profile('work')
+        mapper.remove_mapping('ctrl+k', profile='work')
+        mapper.switch_profile('work')
+        self.assertEqual(mapper.get_conflicts(), [])
+        self.assertEqual([c.kind for c in mapper.check_conflicts('win+l')], [CONFLICT_SYSTEM])
+
+
+if __name__ == '__main__':
+    unittest.main()
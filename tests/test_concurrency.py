@@ -0,0 +1,186 @@
+"""
+Stress tests for concurrent edits and key events
+"""
+
+import unittest
+import os
+import json
+import time
+import random
+import logging
+import tempfile
+import threading
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dispatcher import SyntheticEventSource
+from executor import LaunchExecutor
+from key_mapper import KeyMapper, DISPATCH_HOOK
+
+KEYS = [f'alt+f{n}' for n in range(1, 13)] + ['ctrl+k, n', 'ctrl+k, m']
+
+
+class ErrorCollector(logging.Handler):
+    """Logging handler that keeps every error record"""
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class TestConcurrentEdits(unittest.TestCase):
+    """Hammer a hook-mode KeyMapper with edits and key events at once"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_file = os.path.join(self.temp_dir, 'test_mappings.json')
+        self.apps = []
+        for i in range(3):
+            app = os.path.join(self.temp_dir, f'app{i}.exe')
+            with open(app, 'w') as f:
+                f.write('test')
+            self.apps.append(app)
+        self.source = SyntheticEventSource()
+        self.mapper = KeyMapper(config_file=self.config_file, dispatch_mode=DISPATCH_HOOK,
+                                event_source=self.source,
+                                executor=LaunchExecutor(workers=0, debounce=0))
+        self.launched = []
+        self.mapper.launch_application = self.launched.append
+        self.mapper.save_mappings = lambda: True
+        self.errors = ErrorCollector()
+        logging.getLogger('key_mapper').addHandler(self.errors)
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        logging.getLogger('key_mapper').removeHandler(self.errors)
+        self.mapper.shutdown()
+        for name in os.listdir(self.temp_dir):
+            os.remove(os.path.join(self.temp_dir, name))
+        os.rmdir(self.temp_dir)
+
+    def run_threads(self, targets):
+        """Run every target on its own thread and re-raise the first failure"""
+        failures = []
+
+        def guard(target):
+            try:
+                target()
+            except BaseException as e:
+                failures.append(e)
+
+        threads = [threading.Thread(target=guard, args=(target,)) for target in targets]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(60)
+            self.assertFalse(thread.is_alive(), "thread did not finish (deadlock?)")
+        if failures:
+            raise failures[0]
+
+    def test_edits_and_events_together(self):
+        """Test that edits, profile switches, reads and key events never interfere"""
+        self.mapper.create_profile('work')
+        self.mapper.start_mapping()
+        done = threading.Event()
+
+        def editor(seed):
+            rng = random.Random(seed)
+            for _ in range(500):
+                key_combo = rng.choice(KEYS)
+                action = rng.random()
+                if action < 0.5:
+                    self.mapper.add_mapping(key_combo, rng.choice(self.apps))
+                elif action < 0.8:
+                    self.mapper.remove_mapping(key_combo)
+                elif action < 0.9:
+                    self.mapper.switch_profile(rng.choice(['default', 'work']))
+                else:
+                    self.mapper.apply_mappings({key: rng.choice(self.apps)
+                                                for key in rng.sample(KEYS, 4)})
+
+        def typist():
+            rng = random.Random(3)
+            while not done.is_set():
+                self.source.tap(rng.choice(KEYS))
+
+        def reader():
+            while not done.is_set():
+                for key_combo, app_path in self.mapper.get_all_mappings().items():
+                    self.assertIn(app_path, self.apps)
+
+        def edit():
+            try:
+                self.run_threads([lambda: editor(1), lambda: editor(2)])
+            finally:
+                done.set()
+
+        self.run_threads([edit, typist, reader])
+
+        self.assertEqual(self.errors.records, [])
+        self.assertEqual(set(self.mapper.dispatcher.table.combos), set(self.mapper.mappings))
+        self.assertEqual(set(self.mapper.active_hooks), set(self.mapper.mappings))
+        self.assertTrue(set(self.launched) <= set(self.apps))
+
+    def test_edits_with_watcher_reloads(self):
+        """Test that watcher reloads racing real saves never revert an edit"""
+        mapper = KeyMapper(config_file=self.config_file, save_delay=0.001,
+                           executor=LaunchExecutor(workers=0, debounce=0))
+        self.addCleanup(mapper.shutdown)
+        mapper.start_watching(interval=0.001, max_interval=0.005)
+        done = threading.Event()
+        expected = {}
+
+        def editor():
+            # Like the GUI: edit, then schedule the save a moment later
+            rng = random.Random(4)
+            for _ in range(300):
+                key_combo = rng.choice(KEYS)
+                if rng.random() < 0.7:
+                    app_path = rng.choice(self.apps)
+                    self.assertTrue(mapper.add_mapping(key_combo, app_path))
+                    expected[key_combo] = app_path
+                elif mapper.remove_mapping(key_combo):
+                    del expected[key_combo]
+                time.sleep(rng.random() * 0.004)
+                mapper.schedule_save()
+
+        def toucher():
+            # Make the watcher reload the file as it is on disk, over and over
+            while not done.is_set():
+                if os.path.exists(self.config_file):
+                    os.utime(self.config_file, ns=(time.time_ns(), time.time_ns()))
+                mapper.watcher.wake()
+                time.sleep(0.001)
+
+        def edit():
+            try:
+                editor()
+            finally:
+                done.set()
+
+        self.run_threads([edit, toucher])
+        self.assertTrue(mapper.flush_mappings())
+        mapper.stop_watching()
+
+        self.assertEqual(self.errors.records, [])
+        self.assertEqual(dict(mapper.mappings), expected)
+        with open(self.config_file) as f:
+            self.assertEqual(json.load(f)['mappings'], expected)
+        mapper.shutdown()
+
+    def test_nested_calls_under_the_lock(self):
+        """Test that a public method can be called while the lock is held"""
+        with self.mapper.lock:
+            self.assertTrue(self.mapper.add_mapping('alt+f1', self.apps[0]))
+            self.assertTrue(self.mapper.start_mapping())
+            self.assertTrue(self.mapper.stop_mapping())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+"""
+Unit tests for the headless daemon and its control socket
+"""
+
+import unittest
+import asyncio
+import os
+import socket
+import subprocess
+import tempfile
+import threading
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from daemon import ControlServer, load_token, send_command
+from dispatcher import SyntheticEventSource
+from executor import LaunchExecutor
+from key_mapper import KeyMapper, DISPATCH_HOOK
+
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), "Unix sockets not available")
+class TestControlServer(unittest.TestCase):
+    """Test the control channel against a running server"""
+
+    def setUp(self):
+        """Start a server on a Unix socket in a background event loop"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_file = os.path.join(self.temp_dir, 'test_mappings.json')
+        self.socket_path = os.path.join(self.temp_dir, 'control.sock')
+        self.temp_app = os.path.join(self.temp_dir, 'test_app.exe')
+        with open(self.temp_app, 'w') as f:
+            f.write('test')
+
+        self.source = SyntheticEventSource()
+        self.mapper = KeyMapper(config_file=self.config_file, dispatch_mode=DISPATCH_HOOK,
+                                event_source=self.source,
+                                executor=LaunchExecutor(workers=0, debounce=0))
+        self.launched = []
+        self.mapper.launch_application = self.launched.append
+
+        self.server = ControlServer(self.mapper, socket_path=self.socket_path)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(self.server.start(), self.loop).result(5)
+
+    def tearDown(self):
+        """Stop the server and clean up"""
+        asyncio.run_coroutine_threadsafe(self.server.close(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+        self.loop.close()
+        self.mapper.shutdown()
+        for name in os.listdir(self.temp_dir):
+            os.remove(os.path.join(self.temp_dir, name))
+        os.rmdir(self.temp_dir)
+
+    def send(self, cmd, **kwargs):
+        """Send one command over the socket"""
+        return send_command(dict(cmd=cmd, **kwargs), socket_path=self.socket_path)
+
+    def test_add_start_and_trigger(self):
+        """Test managing mappings and mapping state over the socket"""
+        self.assertEqual(self.send('ping'), {'ok': True, 'result': 'pong'})
+        self.assertTrue(self.send('add', key='ctrl+shift+a', path=self.temp_app)['ok'])
+        self.assertEqual(self.send('list')['result'], {'ctrl+shift+a': self.temp_app})
+        self.assertTrue(self.send('start')['result'])
+        self.assertTrue(self.send('status')['result']['active'])
+
+        self.source.tap('ctrl+shift+a')
+        self.assertEqual(self.launched, [self.temp_app])
+        stats = self.send('stats')['result']
+        self.assertEqual(stats['latency']['ctrl+shift+a']['total']['count'], 1)
+
+        self.assertTrue(self.send('remove', key='ctrl+shift+a')['ok'])
+        self.assertTrue(self.send('stop')['result'])
+        self.assertFalse(self.send('status')['result']['active'])
+
+    def test_errors_are_reported(self):
+        """Test that bad requests get an error response, not a dropped connection"""
+        self.assertFalse(self.send('bogus')['ok'])
+        response = self.send('add', key='ctrl+a', path=os.path.join(self.temp_dir, 'missing'))
+        self.assertFalse(response['ok'])
+        self.assertIn('error', response)
+        self.assertFalse(self.send('remove', key='ctrl+a')['ok'])
+
+    def test_concurrent_clients(self):
+        """Test that many clients can issue commands at the same time"""
+        results = []
+
+        def client(i):
+            results.append(self.send('add', key=f'ctrl+f{i}', path=self.temp_app)['ok'])
+
+        threads = [threading.Thread(target=client, args=(i,)) for i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        self.assertEqual(results, [True] * 20)
+        self.assertEqual(len(self.send('list')['result']), 20)
+
+    def test_socket_is_owner_only(self):
+        """Test that the control socket is created without group or other access"""
+        self.assertEqual(os.stat(self.socket_path).st_mode & 0o077, 0)
+
+
+class TestTcpControlServer(unittest.TestCase):
+    """Test the token-protected TCP control channel"""
+
+    def setUp(self):
+        """Start a server on an ephemeral loopback port with a temporary token file"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_file = os.path.join(self.temp_dir, 'test_mappings.json')
+        self.token_path = os.path.join(self.temp_dir, 'token')
+        self.mapper = KeyMapper(config_file=self.config_file,
+                                executor=LaunchExecutor(workers=0, debounce=0))
+        self.server = ControlServer(self.mapper, port=0, token_path=self.token_path)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(self.server.start(), self.loop).result(5)
+
+    def tearDown(self):
+        """Stop the server and clean up"""
+        asyncio.run_coroutine_threadsafe(self.server.close(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+        self.loop.close()
+        self.mapper.shutdown()
+        for name in os.listdir(self.temp_dir):
+            os.remove(os.path.join(self.temp_dir, name))
+        os.rmdir(self.temp_dir)
+
+    def test_token_required(self):
+        """Test that requests need the token from the owner-only token file"""
+        token = load_token(self.token_path)
+        if os.name == 'posix':
+            self.assertEqual(os.stat(self.token_path).st_mode & 0o077, 0)
+        self.assertEqual(send_command({'cmd': 'ping'}, port=self.server.port, token=token),
+                         {'ok': True, 'result': 'pong'})
+        response = send_command({'cmd': 'ping'}, port=self.server.port, token='wrong')
+        self.assertFalse(response['ok'])
+
+    def test_cross_protocol_request_is_rejected(self):
+        """Test that an HTTP request with a JSON body cannot run commands"""
+        with socket.create_connection(('127.0.0.1', self.server.port), timeout=5) as sock:
+            sock.sendall(b'POST / HTTP/1.1\r\nContent-Type: text/plain\r\n\r\n'
+                         b'{"cmd": "stop"}\n{"cmd": "ping"}\n')
+            with sock.makefile('rb') as f:
+                lines = f.read().splitlines()
+        self.assertTrue(lines)
+        self.assertFalse(any(b'"ok": true' in line for line in lines))
+
+
+class TestDaemonImports(unittest.TestCase):
+    """Test that the daemon stays headless"""
+
+    def test_tkinter_not_imported(self):
+        """Test that importing the daemon does not pull in tkinter"""
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        code = "import sys, daemon; sys.exit('tkinter' in sys.modules)"
+        result = subprocess.run([sys.executable, '-c', code], cwd=root)
+        self.assertEqual(result.returncode, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
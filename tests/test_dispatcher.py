@@ -0,0 +1,272 @@
+"""
+Unit tests for the hotkey dispatcher
+"""
+
+import unittest
+import os
+import tempfile
+import time
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dispatcher import (DispatchTable, HotkeyDispatcher, KeyEvent, SyntheticEventSource,
+                        KEY_DOWN, MODIFIER_BITS, parse_combo, parse_sequence)
+from executor import LaunchExecutor
+from key_mapper import KeyMapper, DISPATCH_HOOK
+
+
+class TestParseCombo(unittest.TestCase):
+    """Test cases for key combination parsing"""
+
+    def test_modifier_order_and_case_ignored(self):
+        """Test that equivalent combinations parse identically"""
+        expected = parse_combo('ctrl+shift+a')
+        self.assertEqual(parse_combo('Shift+Ctrl+A'), expected)
+        self.assertEqual(parse_combo('shift + control + a'), expected)
+        self.assertEqual(expected, (MODIFIER_BITS['ctrl'] | MODIFIER_BITS['shift'], 'a'))
+
+    def test_modifier_only_combo(self):
+        """Test that the last modifier is the trigger of a modifier-only combo"""
+        self.assertEqual(parse_combo('ctrl+shift'), (MODIFIER_BITS['ctrl'], 'shift'))
+
+    def test_invalid_combos(self):
+        """Test that unsupported combinations are rejected"""
+        for combo in ('', 'a+b', 'ctrl+k, n'):
+            with self.assertRaises(ValueError):
+                parse_combo(combo)
+
+    def test_shifted_character_is_its_key_with_shift(self):
+        """Test that a shifted character parses as its unshifted key plus shift"""
+        self.assertEqual(parse_combo('ctrl+!'), parse_combo('ctrl+shift+1'))
+        self.assertEqual(parse_combo('ctrl+shift+1'),
+                         (MODIFIER_BITS['ctrl'] | MODIFIER_BITS['shift'], '1'))
+
+    def test_parse_sequence(self):
+        """Test that sequences parse to one step per combination"""
+        self.assertEqual(parse_sequence('ctrl+k, n'),
+                         ((MODIFIER_BITS['ctrl'], 'k'), (0, 'n')))
+        self.assertEqual(parse_sequence('alt+f1'), (parse_combo('alt+f1'),))
+        for combo in ('ctrl+k,', ', n', 'ctrl+k, a+b'):
+            with self.assertRaises(ValueError):
+                parse_sequence(combo)
+
+
+class TestHotkeyDispatcher(unittest.TestCase):
+    """Test cases for HotkeyDispatcher with a synthetic event source"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.fired = []
+        self.source = SyntheticEventSource()
+        self.dispatcher = HotkeyDispatcher(self.source)
+        self.dispatcher.set_table(DispatchTable.compile({
+            'ctrl+shift+a': lambda received: self.fired.append('a'),
+            'alt+f1': lambda received: self.fired.append('f1'),
+            'ctrl+shift': lambda received: self.fired.append('mods'),
+        }))
+        self.dispatcher.start()
+
+    def test_combo_fires_handler(self):
+        """Test that pressing a registered combination fires its handler"""
+        self.source.tap('left shift+right ctrl+a')
+        self.source.tap('alt+f1')
+        self.source.tap('ctrl+shift')
+        self.assertEqual(self.fired, ['a', 'f1', 'mods'])
+
+    def test_shifted_digit_fires(self):
+        """Test that shift+1 reported as '!' matches a shifted-digit combination"""
+        self.dispatcher.set_table(DispatchTable.compile({
+            'ctrl+shift+1': lambda received: self.fired.append('1'),
+            'ctrl+@': lambda received: self.fired.append('2'),
+        }))
+        for char in ('!', '@'):
+            self.source.press('ctrl')
+            self.source.press('shift')
+            self.source.press(char)
+            self.source.release(char)
+            self.source.release('shift')
+            self.source.release('ctrl')
+        self.source.tap('ctrl+1')
+        self.assertEqual(self.fired, ['1', '2'])
+
+    def test_extra_modifier_does_not_match(self):
+        """Test that additional held modifiers prevent a match"""
+        self.source.tap('ctrl+alt+f1')
+        self.assertEqual(self.fired, [])
+
+    def test_released_modifier_clears_mask(self):
+        """Test that releasing a modifier removes it from later lookups"""
+        self.source.press('alt')
+        self.source.release('alt')
+        self.source.tap('f1')
+        self.assertEqual(self.fired, [])
+
+    def test_stop_detaches_source(self):
+        """Test that a stopped dispatcher no longer receives events"""
+        self.dispatcher.stop()
+        self.source.tap('alt+f1')
+        self.assertEqual(self.fired, [])
+
+    def test_handler_errors_are_contained(self):
+        """Test that a failing handler does not break dispatching"""
+        def fail(received):
+            raise RuntimeError('boom')
+        self.dispatcher.set_table(DispatchTable.compile({'f2': fail}))
+        self.assertTrue(self.dispatcher.handle_event(KeyEvent(KEY_DOWN, 'f2')))
+
+
+class TestKeySequences(unittest.TestCase):
+    """Test cases for leader-key sequences"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.fired = []
+        self.source = SyntheticEventSource()
+        self.dispatcher = HotkeyDispatcher(self.source)
+        self.table = DispatchTable.compile({
+            'ctrl+k, n': lambda received: self.fired.append('n'),
+            'ctrl+k, m': lambda received: self.fired.append('m'),
+            'ctrl+k, ctrl+d': lambda received: self.fired.append('d'),
+            'alt+g, g, g': lambda received: self.fired.append('ggg'),
+            'alt+f1': lambda received: self.fired.append('f1'),
+        })
+        self.dispatcher.set_table(self.table)
+        self.dispatcher.start()
+
+    def test_sequences_fire(self):
+        """Test that each sequence fires only after its last step"""
+        self.source.tap('ctrl+k')
+        self.assertEqual(self.fired, [])
+        self.source.tap('n')
+        self.source.tap('ctrl+k, m')
+        self.source.tap('ctrl+k, ctrl+d')
+        self.source.tap('alt+g, g, g')
+        self.assertEqual(self.fired, ['n', 'm', 'd', 'ggg'])
+
+    def test_wrong_step_restarts_matching(self):
+        """Test that a key outside the sequence abandons it and is matched normally"""
+        self.source.tap('ctrl+k, x')
+        self.source.tap('n')
+        self.source.tap('ctrl+k, alt+f1')
+        self.assertEqual(self.fired, ['f1'])
+
+    def test_timeout(self):
+        """Test that a step arriving after the state's timeout does not match"""
+        self.dispatcher.set_table(DispatchTable.compile(
+            {'ctrl+k, n': lambda received: self.fired.append('n')}, sequence_timeout=0.01))
+        self.source.tap('ctrl+k')
+        time.sleep(0.05)
+        self.source.tap('n')
+        self.assertEqual(self.fired, [])
+
+    def test_unbind_keeps_shared_prefix(self):
+        """Test that removing one sequence leaves its siblings and the old table intact"""
+        self.dispatcher.set_table(self.table.updated({}, ['ctrl+k, n']))
+        self.source.tap('ctrl+k, n')
+        self.source.tap('ctrl+k, m')
+        self.assertEqual(self.fired, ['m'])
+        self.dispatcher.set_table(self.table)
+        self.source.tap('ctrl+k, n')
+        self.assertEqual(self.fired, ['m', 'n'])
+
+    def test_combo_and_sequence_sharing_a_step_both_fire(self):
+        """Test that a combo that starts a sequence fires and the sequence still
+        completes, whichever was bound first"""
+        combo = {'ctrl+j': lambda received: self.fired.append('j')}
+        sequence = {'ctrl+j, n': lambda received: self.fired.append('jn')}
+        for first, second in ((combo, sequence), (sequence, combo)):
+            self.fired.clear()
+            with self.assertLogs('dispatcher', 'WARNING'):
+                table = DispatchTable.compile(first).updated(second)
+            self.dispatcher.set_table(table)
+            self.source.tap('ctrl+j, n')
+            self.source.tap('ctrl+j')
+            self.assertEqual(self.fired, ['j', 'jn', 'j'])
+
+            self.fired.clear()
+            self.dispatcher.set_table(table.updated({}, ['ctrl+j, n']))
+            self.source.tap('ctrl+j, n')
+            self.dispatcher.set_table(table.updated({}, ['ctrl+j']))
+            self.source.tap('ctrl+j, n')
+            self.assertEqual(self.fired, ['j', 'jn'])
+
+
+class TestKeyMapperHookMode(unittest.TestCase):
+    """Test KeyMapper running on a single dispatcher hook"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_file = os.path.join(self.temp_dir, 'test_mappings.json')
+        self.temp_app = os.path.join(self.temp_dir, 'test_app.exe')
+        with open(self.temp_app, 'w') as f:
+            f.write('test')
+        self.source = SyntheticEventSource()
+        self.mapper = KeyMapper(config_file=self.config_file,
+                                dispatch_mode=DISPATCH_HOOK,
+                                event_source=self.source,
+                                executor=LaunchExecutor(workers=0))
+        self.launched = []
+        self.mapper.launch_application = self.launched.append
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.mapper.stop_mapping()
+        os.remove(self.temp_app)
+        os.rmdir(self.temp_dir)
+
+    def test_start_and_stop_mapping(self):
+        """Test that mappings fire only while mapping is active"""
+        self.mapper.add_mapping('ctrl+shift+a', self.temp_app)
+        self.assertTrue(self.mapper.start_mapping())
+        self.assertTrue(self.mapper.is_mapping_active())
+        self.assertEqual(list(self.mapper.active_hooks), ['ctrl+shift+a'])
+
+        self.source.tap('ctrl+shift+a')
+        self.assertEqual(self.launched, [self.temp_app])
+
+        self.assertTrue(self.mapper.stop_mapping())
+        self.source.tap('ctrl+shift+a')
+        self.assertEqual(self.launched, [self.temp_app])
+        self.assertEqual(len(self.mapper.active_hooks), 0)
+
+    def test_start_twice(self):
+        """Test that starting an active mapper is rejected"""
+        self.mapper.add_mapping('ctrl+shift+a', self.temp_app)
+        self.assertTrue(self.mapper.start_mapping())
+        self.assertFalse(self.mapper.start_mapping())
+
+    def test_edits_apply_while_active(self):
+        """Test that single edits rebind without stopping the hook"""
+        self.mapper.add_mapping('ctrl+shift+a', self.temp_app)
+        self.mapper.start_mapping()
+        hooked_table = self.mapper.dispatcher.table
+
+        self.mapper.add_mapping('alt+f1', self.temp_app)
+        self.assertIsNot(self.mapper.dispatcher.table, hooked_table)
+        self.assertNotIn('alt+f1', hooked_table)
+        self.source.tap('alt+f1')
+        self.mapper.remove_mapping('ctrl+shift+a')
+        self.source.tap('ctrl+shift+a')
+
+        self.assertEqual(self.launched, [self.temp_app])
+        self.assertTrue(self.mapper.dispatcher.is_running)
+        self.assertEqual(list(self.mapper.active_hooks), ['alt+f1'])
+
+    def test_sequence_mapping(self):
+        """Test that a sequence mapping launches through the mapper"""
+        self.mapper.add_mapping('ctrl+k, n', self.temp_app)
+        self.mapper.start_mapping()
+        self.source.tap('ctrl+k, n')
+        self.assertEqual(self.launched, [self.temp_app])
+
+    def test_invalid_dispatch_mode(self):
+        """Test that unknown dispatch modes are rejected"""
+        with self.assertRaises(ValueError):
+            KeyMapper(config_file=self.config_file, dispatch_mode='bogus')
+
+
+if __name__ == '__main__':
+    unittest.main()
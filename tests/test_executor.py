@@ -0,0 +1,113 @@
+"""
+Unit tests for the launch executor
+"""
+
+import unittest
+import os
+import threading
+import sys
+from unittest import mock
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from executor import LaunchExecutor, POLICY_DROP, POLICY_DROP_OLDEST
+
+
+class TestLaunchExecutor(unittest.TestCase):
+    """Test cases for LaunchExecutor"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.launched = []
+        self.gate = threading.Event()
+        self.started = threading.Event()
+
+    def blocking_launch(self, name):
+        """Launch stand-in that holds its worker until the gate opens"""
+        self.started.set()
+        self.gate.wait(5)
+        self.launched.append(name)
+
+    def test_inline_execution(self):
+        """Test that workers=0 runs launches on the calling thread"""
+        executor = LaunchExecutor(workers=0, debounce=0)
+        self.assertTrue(executor.submit('a', self.launched.append, 'a'))
+        self.assertEqual(self.launched, ['a'])
+        self.assertEqual(executor.stats['completed'], 1)
+
+    def test_debounce_repeated_triggers(self):
+        """Test that a held-down key only launches once per debounce window"""
+        executor = LaunchExecutor(workers=0, debounce=60)
+        for _ in range(10):
+            executor.submit('a', self.launched.append, 'a')
+        executor.submit('b', self.launched.append, 'b')
+        self.assertEqual(self.launched, ['a', 'b'])
+        self.assertEqual(executor.stats['debounced'], 9)
+
+    def test_held_key_launches_once(self):
+        """Test that auto-repeat triggers keep extending the debounce window"""
+        executor = LaunchExecutor(workers=0, debounce=0.3)
+        clock = [100.0]
+        with mock.patch('executor.time.monotonic', lambda: clock[0]):
+            for _ in range(60):  # held for 2 s at 30 Hz auto-repeat
+                executor.submit('a', self.launched.append, 'a')
+                clock[0] += 1 / 30
+            clock[0] += 0.5  # released, then pressed again
+            executor.submit('a', self.launched.append, 'a')
+        self.assertEqual(self.launched, ['a', 'a'])
+        self.assertEqual(executor.stats['debounced'], 59)
+
+    def test_coalesce_queued_key(self):
+        """Test that a trigger for an already queued key is coalesced"""
+        executor = LaunchExecutor(workers=1, debounce=0)
+        executor.submit('busy', self.blocking_launch, 'busy')
+        self.assertTrue(self.started.wait(5))
+        self.assertTrue(executor.submit('a', self.launched.append, 'a'))
+        self.assertFalse(executor.submit('a', self.launched.append, 'a'))
+        self.gate.set()
+        executor.shutdown()
+        self.assertEqual(self.launched, ['busy', 'a'])
+        self.assertEqual(executor.stats['coalesced'], 1)
+
+    def test_drop_when_saturated(self):
+        """Test that the drop policy rejects launches when the queue is full"""
+        executor = LaunchExecutor(workers=1, queue_size=1, policy=POLICY_DROP, debounce=0)
+        executor.submit('busy', self.blocking_launch, 'busy')
+        self.assertTrue(self.started.wait(5))
+        self.assertTrue(executor.submit('a', self.launched.append, 'a'))
+        self.assertFalse(executor.submit('b', self.launched.append, 'b'))
+        self.gate.set()
+        executor.shutdown()
+        self.assertEqual(self.launched, ['busy', 'a'])
+        self.assertEqual(executor.stats['dropped'], 1)
+
+    def test_drop_oldest_when_saturated(self):
+        """Test that the drop_oldest policy evicts the oldest queued launch"""
+        executor = LaunchExecutor(workers=1, queue_size=1, policy=POLICY_DROP_OLDEST,
+                                  debounce=0)
+        executor.submit('busy', self.blocking_launch, 'busy')
+        self.assertTrue(self.started.wait(5))
+        executor.submit('a', self.launched.append, 'a')
+        self.assertTrue(executor.submit('b', self.launched.append, 'b'))
+        self.gate.set()
+        executor.shutdown()
+        self.assertEqual(self.launched, ['busy', 'b'])
+        self.assertEqual(executor.stats['dropped'], 1)
+
+    def test_failed_launch_is_counted(self):
+        """Test that launch errors are contained and counted"""
+        def fail():
+            raise OSError('boom')
+        executor = LaunchExecutor(workers=0, debounce=0)
+        executor.submit('a', fail)
+        self.assertEqual(executor.stats['failed'], 1)
+
+    def test_invalid_policy(self):
+        """Test that unknown policies are rejected"""
+        with self.assertRaises(ValueError):
+            LaunchExecutor(policy='bogus')
+
+
+if __name__ == '__main__':
+    unittest.main()
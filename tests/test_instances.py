@@ -0,0 +1,151 @@
+"""
+Unit tests for process reuse
+"""
+
+import unittest
+import os
+import json
+import tempfile
+import subprocess
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from executor import LaunchExecutor
+from instances import INSTANCE_FOCUS, INSTANCE_IGNORE, INSTANCE_MULTI, InstanceTracker
+from key_mapper import KeyMapper
+
+
+class FakeProcess:
+    """Stand-in for Popen whose exit is controlled by the test"""
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.returncode = None
+
+    def poll(self):
+        """Return the exit code, or None while running"""
+        return self.returncode
+
+
+class TestInstanceTracker(unittest.TestCase):
+    """Test cases for InstanceTracker"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tracker = InstanceTracker(reap_interval=0)
+
+    def test_running_returns_live_process(self):
+        """Test that exited processes are skipped and dropped"""
+        first, second = FakeProcess(1), FakeProcess(2)
+        self.tracker.track('app.exe', first)
+        self.tracker.track('app.exe', second)
+        self.tracker.track('app.exe', None)
+        self.assertIs(self.tracker.running('app.exe'), first)
+
+        first.returncode = 0
+        self.assertIs(self.tracker.running('app.exe'), second)
+        self.assertEqual(len(self.tracker), 1)
+        second.returncode = 0
+        self.assertIsNone(self.tracker.running('app.exe'))
+        self.assertIsNone(self.tracker.running('other.exe'))
+
+    def test_reap(self):
+        """Test that reaping drops every exited process"""
+        processes = [FakeProcess(pid) for pid in range(3)]
+        for process in processes:
+            self.tracker.track(f'app{process.pid}.exe', process)
+        processes[0].returncode = processes[2].returncode = 1
+        self.assertEqual(self.tracker.reap(), 2)
+        self.assertEqual(len(self.tracker), 1)
+
+    def test_background_reaper_waits_real_processes(self):
+        """Test that the reaper thread collects a real exited child"""
+        tracker = InstanceTracker(reap_interval=0.01)
+        process = subprocess.Popen([sys.executable, '-c', 'pass'])
+        tracker.track(sys.executable, process)
+        process.wait()
+        for _ in range(200):
+            if not len(tracker):
+                break
+            tracker._stop.wait(0.01)
+        tracker.stop()
+        self.assertEqual(len(tracker), 0)
+
+
+class TestKeyMapperInstanceModes(unittest.TestCase):
+    """Test single-instance modes through KeyMapper"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_file = os.path.join(self.temp_dir, 'test_mappings.json')
+        self.temp_app = os.path.join(self.temp_dir, 'test_app.exe')
+        with open(self.temp_app, 'w') as f:
+            f.write('test')
+        self.mapper = KeyMapper(config_file=self.config_file,
+                                executor=LaunchExecutor(workers=0, debounce=0))
+        self.spawned = []
+        self.mapper.launch_application = self.fake_launch
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.mapper.shutdown()
+        for name in os.listdir(self.temp_dir):
+            os.remove(os.path.join(self.temp_dir, name))
+        os.rmdir(self.temp_dir)
+
+    def fake_launch(self, app_path):
+        """Record a launch as a fake process the mapper tracks"""
+        process = FakeProcess(len(self.spawned) + 100)
+        self.spawned.append(process)
+        self.mapper.instances.track(app_path, process)
+
+    def trigger(self, key_combo):
+        """Fire a mapping's hotkey handler"""
+        self.mapper._create_hotkey_handler(self.mapper.mappings.record(key_combo))()
+
+    def test_ignore_mode_spawns_only_when_needed(self):
+        """Test that a running instance suppresses new launches until it exits"""
+        self.mapper.add_mapping('alt+f1', self.temp_app, instance_mode=INSTANCE_IGNORE)
+        self.trigger('alt+f1')
+        self.trigger('alt+f1')
+        self.assertEqual(len(self.spawned), 1)
+        self.spawned[0].returncode = 0
+        self.trigger('alt+f1')
+        self.assertEqual(len(self.spawned), 2)
+
+    def test_focus_mode_does_not_spawn(self):
+        """Test that focus mode reuses the running instance"""
+        self.mapper.add_mapping('alt+f1', self.temp_app)
+        self.assertTrue(self.mapper.set_instance_mode('alt+f1', INSTANCE_FOCUS))
+        self.trigger('alt+f1')
+        self.trigger('alt+f1')
+        self.assertEqual(len(self.spawned), 1)
+
+    def test_multi_mode_always_spawns(self):
+        """Test that the default mode starts an instance per trigger"""
+        self.mapper.add_mapping('alt+f1', self.temp_app)
+        self.trigger('alt+f1')
+        self.trigger('alt+f1')
+        self.assertEqual(len(self.spawned), 2)
+
+    def test_modes_round_trip_and_are_dropped_with_mapping(self):
+        """Test that modes are saved, validated and forgotten with their mapping"""
+        self.assertFalse(self.mapper.set_instance_mode('alt+f1', INSTANCE_FOCUS))
+        self.mapper.add_mapping('alt+f1', self.temp_app, instance_mode=INSTANCE_FOCUS)
+        self.assertFalse(self.mapper.set_instance_mode('alt+f1', 'bogus'))
+        self.mapper.save_mappings()
+        with open(self.config_file) as f:
+            self.assertEqual(json.load(f)['instance_modes'], {'alt+f1': INSTANCE_FOCUS})
+
+        reloaded = KeyMapper(config_file=self.config_file)
+        self.assertEqual(reloaded.get_instance_mode('alt+f1'), INSTANCE_FOCUS)
+        reloaded.remove_mapping('alt+f1')
+        self.assertEqual(reloaded.get_instance_mode('alt+f1'), INSTANCE_MULTI)
+        reloaded.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
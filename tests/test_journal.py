@@ -0,0 +1,278 @@
+"""
+Unit tests for the change journal
+"""
+
+import unittest
+import os
+import json
+import tempfile
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from journal import Journal, apply_changes, diff_state, invert
+from key_mapper import KeyMapper
+
+
+class TestJournal(unittest.TestCase):
+    """Test cases for Journal and its change helpers"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_file = os.path.join(self.temp_dir, 'test_mappings.json')
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        for name in os.listdir(self.temp_dir):
+            os.remove(os.path.join(self.temp_dir, name))
+        os.rmdir(self.temp_dir)
+
+    def test_diff_and_invert(self):
+        """Test that inverted changes restore the previous config"""
+        config = {'mappings': {'alt+a': 'a.exe'}, 'original_mappings': {},
+                  'profiles': {}, 'active_profile': 'default'}
+        changes = diff_state({('mappings', 'alt+a'): 'a.exe'},
+                             {('mappings', 'alt+b'): 'b.exe'})
+        apply_changes(config, changes)
+        self.assertEqual(config['mappings'], {'alt+b': 'b.exe'})
+        apply_changes(config, invert(changes))
+        self.assertEqual(config['mappings'], {'alt+a': 'a.exe'})
+
+    def test_torn_line_is_skipped(self):
+        """Test that a partly written last record is ignored"""
+        journal = Journal(self.config_file)
+        journal.append('add', [{'s': 'mappings', 'k': 'alt+a', 'n': 'a.exe'}])
+        journal.close()
+        with open(journal.path, 'ab') as f:
+            f.write(b'{"seq": 2, "op": "ad')
+        journal = Journal(self.config_file)
+        self.assertEqual(journal.last_seq, 1)
+        self.assertEqual(len(journal.records), 1)
+        journal.close()
+
+    def test_matches_needs_epoch_and_every_newer_record(self):
+        """Test that a journal only continues configs that name it and it covers"""
+        journal = Journal(self.config_file, history=1)
+        for i in range(3):
+            journal.append('add', [{'s': 'mappings', 'k': f'alt+{i}', 'n': 'a.exe'}])
+        journal.compact(2)
+        self.assertTrue(journal.matches({'journal_epoch': journal.epoch, 'journal_seq': 2}))
+        self.assertTrue(journal.matches({'journal_epoch': journal.epoch, 'journal_seq': 1}))
+        self.assertFalse(journal.matches({'journal_epoch': journal.epoch, 'journal_seq': 0}))
+        self.assertFalse(journal.matches({'journal_epoch': journal.epoch, 'journal_seq': 4}))
+        self.assertFalse(journal.matches({'journal_seq': 2}))
+        journal.close()
+        self.assertEqual(Journal(self.config_file).epoch, journal.epoch)
+
+    def test_compact_keeps_history(self):
+        """Test that compaction keeps only the recent covered records and newer ones"""
+        journal = Journal(self.config_file, history=2)
+        for i in range(5):
+            journal.append('add', [{'s': 'mappings', 'k': f'alt+{i}', 'n': 'a.exe'}])
+        journal.compact(4)
+        self.assertEqual([record['seq'] for record in journal.records], [3, 4, 5])
+        journal.close()
+        self.assertEqual(len(Journal(self.config_file).records), 3)
+
+
+class TestKeyMapperJournal(unittest.TestCase):
+    """Test journaled edits through KeyMapper"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_file = os.path.join(self.temp_dir, 'test_mappings.json')
+        self.apps = []
+        for i in range(2):
+            app = os.path.join(self.temp_dir, f'app{i}.exe')
+            with open(app, 'w') as f:
+                f.write('test')
+            self.apps.append(app)
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        for name in os.listdir(self.temp_dir):
+            os.remove(os.path.join(self.temp_dir, name))
+        os.rmdir(self.temp_dir)
+
+    def create_mapper(self, **kwargs):
+        """Create a journaled mapper that is shut down after the test"""
+        mapper = KeyMapper(config_file=self.config_file, journal=True, **kwargs)
+        self.addCleanup(mapper.shutdown)
+        return mapper
+
+    def crash(self, mapper):
+        """Stop a mapper the way a crash would, without its shutdown save"""
+        mapper.journal.close()
+        mapper.journal = None
+        mapper.shutdown()
+
+    def test_edits_replay_after_restart(self):
+        """Test that edits only appended to the journal are there after a restart"""
+        mapper = self.create_mapper()
+        mapper.add_mapping('alt+a', self.apps[0])
+        mapper.add_mapping('alt+b', self.apps[1])
+        mapper.create_profile('work')
+        mapper.remove_mapping('alt+a', profile='work')
+        mapper.switch_profile('work')
+        mapper.set_instance_mode('alt+b', 'focus')
+        mapper.schedule_save()
+        self.crash(mapper)
+        self.assertFalse(os.path.exists(self.config_file))
+
+        mapper = self.create_mapper()
+        self.assertEqual(mapper.active_profile, 'work')
+        self.assertEqual(mapper.get_all_mappings(), {'alt+b': self.apps[1]})
+        self.assertEqual(mapper.get_instance_mode('alt+b'), 'focus')
+        mapper.switch_profile('default')
+        self.assertEqual(mapper.get_all_mappings(),
+                         {'alt+a': self.apps[0], 'alt+b': self.apps[1]})
+
+    def test_compaction_folds_journal_into_config(self):
+        """Test that enough edits write the config file and trim the journal"""
+        mapper = self.create_mapper(compact_threshold=3, save_delay=0)
+        for i in range(3):
+            mapper.add_mapping(f'alt+f{i + 1}', self.apps[0])
+        self.assertTrue(mapper.flush_mappings())
+        with open(self.config_file) as f:
+            data = json.load(f)
+        self.assertEqual(data['journal_seq'], 3)
+        self.assertEqual(len(data['mappings']), 3)
+        self.assertEqual(mapper.journal_seq, 3)
+
+        mapper.add_mapping('alt+f9', self.apps[1])
+        mapper.shutdown()
+        mapper = self.create_mapper()
+        self.assertEqual(len(mapper.get_all_mappings()), 4)
+        self.assertEqual([record['op'] for record in mapper.get_history()], ['add'] * 4)
+
+    def test_foreign_config_is_not_replayed_onto(self):
+        """Test that a config written without the journal drops its records"""
+        mapper = self.create_mapper()
+        mapper.add_mapping('ctrl+a', self.apps[0])
+        mapper.add_mapping('ctrl+b', self.apps[1])
+        self.assertTrue(mapper.save_mappings())
+        mapper.shutdown()
+        with open(self.config_file, 'w') as f:
+            json.dump({'mappings': {'ctrl+b': self.apps[1]}, 'original_mappings': {}}, f)
+
+        mapper = self.create_mapper()
+        self.assertEqual(mapper.get_all_mappings(), {'ctrl+b': self.apps[1]})
+        self.assertEqual(mapper.get_history(), [])
+        with open(self.config_file) as f:
+            self.assertEqual(json.load(f)['journal_epoch'], mapper.journal.epoch)
+
+        # The new journal continues the config from here on
+        mapper.add_mapping('ctrl+c', self.apps[0])
+        mapper.shutdown()
+        mapper = self.create_mapper()
+        self.assertEqual(sorted(mapper.get_all_mappings()), ['ctrl+b', 'ctrl+c'])
+
+    def test_external_change_rotates_journal(self):
+        """Test that reloading a file pushed by someone else starts a new journal"""
+        mapper = self.create_mapper()
+        mapper.add_mapping('ctrl+a', self.apps[0])
+        self.assertTrue(mapper.save_mappings())
+        epoch = mapper.journal.epoch
+        with open(self.config_file, 'w') as f:
+            json.dump({'mappings': {'ctrl+b': self.apps[1]}, 'original_mappings': {}}, f)
+        mapper._on_config_changed()
+        self.assertEqual(mapper.get_all_mappings(), {'ctrl+b': self.apps[1]})
+        self.assertNotEqual(mapper.journal.epoch, epoch)
+        self.assertIsNone(mapper.undo())
+        self.assertEqual(mapper.get_all_mappings(), {'ctrl+b': self.apps[1]})
+
+    def test_mappers_without_journal_see_edits(self):
+        """Test that edits survive a journaled, a plain and a journaled mapper in turn"""
+        mapper = self.create_mapper()
+        mapper.add_mapping('ctrl+a', self.apps[0])
+        mapper.add_mapping('ctrl+b', self.apps[1])
+        mapper.shutdown()
+
+        plain = KeyMapper(config_file=self.config_file)
+        self.addCleanup(plain.shutdown)
+        self.assertEqual(sorted(plain.get_all_mappings()), ['ctrl+a', 'ctrl+b'])
+        plain.add_mapping('ctrl+c', self.apps[0])
+        self.assertTrue(plain.save_mappings())
+        plain.shutdown()
+
+        mapper = self.create_mapper()
+        self.assertEqual(sorted(mapper.get_all_mappings()), ['ctrl+a', 'ctrl+b', 'ctrl+c'])
+
+    def test_unsaved_edits_are_merged_into_foreign_config(self):
+        """Test that rotating the journal keeps edits that never reached a config file"""
+        mapper = self.create_mapper()
+        mapper.add_mapping('ctrl+a', self.apps[0])
+        mapper.add_mapping('ctrl+b', self.apps[1])
+        self.crash(mapper)
+
+        plain = KeyMapper(config_file=self.config_file)
+        self.addCleanup(plain.shutdown)
+        plain.add_mapping('ctrl+c', self.apps[0])
+        self.assertTrue(plain.save_mappings())
+        plain.shutdown()
+
+        with self.assertLogs('key_mapper', 'ERROR'):
+            mapper = self.create_mapper()
+        self.assertEqual(sorted(mapper.get_all_mappings()), ['ctrl+a', 'ctrl+b', 'ctrl+c'])
+        mapper.shutdown()
+        with open(self.config_file) as f:
+            self.assertEqual(sorted(json.load(f)['mappings']), ['ctrl+a', 'ctrl+b', 'ctrl+c'])
+
+    def test_undo(self):
+        """Test that undo reverts edits newest first and is journaled"""
+        mapper = self.create_mapper()
+        mapper.add_mapping('alt+a', self.apps[0])
+        mapper.add_mapping('alt+a', self.apps[1])
+        self.assertEqual(mapper.undo()['op'], 'add')
+        self.assertEqual(mapper.get_all_mappings(), {'alt+a': self.apps[0]})
+        mapper.undo()
+        self.assertEqual(mapper.get_all_mappings(), {})
+        self.assertIsNone(mapper.undo())
+        mapper.shutdown()
+
+        mapper = self.create_mapper()
+        self.assertEqual(mapper.get_all_mappings(), {})
+        self.assertEqual([record['op'] for record in mapper.get_history()],
+                         ['undo', 'undo', 'add', 'add'])
+
+    def test_undo_stops_at_unjournaled_changes(self):
+        """Test that undo does not reach past an import, apply or restore"""
+        import_file = os.path.join(self.temp_dir, 'import.jsonl')
+        with open(import_file, 'w') as f:
+            f.write(json.dumps({'key': 'ctrl+a', 'path': self.apps[1]}) + '\n')
+        mapper = self.create_mapper()
+        mapper.add_mapping('ctrl+a', self.apps[0])
+        self.assertTrue(mapper.import_mappings(import_file).committed)
+        self.assertIsNone(mapper.undo())
+        self.assertEqual(mapper.get_all_mappings(), {'ctrl+a': self.apps[1]})
+        self.assertTrue(mapper.get_history()[0]['barrier'])
+
+        mapper.add_mapping('ctrl+b', self.apps[0])
+        mapper.apply_mappings({'ctrl+c': self.apps[0]})
+        self.assertIsNone(mapper.undo())
+        self.assertEqual(mapper.get_all_mappings(), {'ctrl+c': self.apps[0]})
+
+        mapper.add_mapping('ctrl+d', self.apps[0])
+        mapper.restore_original()
+        self.assertIsNone(mapper.undo())
+        self.assertEqual(mapper.get_all_mappings(), {})
+
+    def test_edit_appends_without_rewriting_config(self):
+        """Test that an edit to a large config only appends to the journal"""
+        mapper = self.create_mapper()
+        mapper.apply_mappings({f'ctrl+alt+f{i % 12 + 1}, {i}': self.apps[0]
+                               for i in range(2000)})
+        self.assertTrue(mapper.save_mappings())
+        size = os.path.getsize(self.config_file)
+        mapper.add_mapping('alt+a', self.apps[1])
+        mapper.schedule_save()
+        self.assertFalse(mapper.writer.pending)
+        self.assertEqual(os.path.getsize(self.config_file), size)
+        self.assertLess(os.path.getsize(mapper.journal.path), 500)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,11 +8,16 @@ import json
 import tempfile
 from pathlib import Path
 import sys
+from unittest import mock
 
 # Add parent directory to path to import modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from benchmarks import fake_keyboard
+from dispatcher import KeyEvent, KEY_DOWN, KEY_UP
+from executor import LaunchExecutor
 from key_mapper import KeyMapper
+from mapping_table import MappingTable
 
 
 class TestKeyMapper(unittest.TestCase):
@@ -35,7 +40,7 @@ class TestKeyMapper(unittest.TestCase):
     def test_initialization(self):
         """Test KeyMapper initialization"""
         self.assertIsNotNone(self.mapper)
-        self.assertIsInstance(self.mapper.mappings, dict)
+        self.assertIsInstance(self.mapper.mappings, MappingTable)
         self.assertEqual(len(self.mapper.mappings), 0)
         self.assertFalse(self.mapper.is_mapping_active())
         
@@ -133,8 +138,9 @@ class TestKeyMapper(unittest.TestCase):
         self.assertIn('ctrl+shift+a', mappings)
         self.assertIn('ctrl+shift+b', mappings)
         
-        # Ensure it's a copy, not the original
-        mappings['ctrl+shift+c'] = temp_app
+        # Ensure it is read-only
+        with self.assertRaises(TypeError):
+            mappings['ctrl+shift+c'] = temp_app
         self.assertEqual(len(self.mapper.mappings), 2)
         
         # Clean up
@@ -163,6 +169,126 @@ class TestKeyMapper(unittest.TestCase):
         os.remove(temp_app)
 
 
+class TestIncrementalBindings(unittest.TestCase):
+    """Test that edits while active only touch the affected hotkeys"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_file = os.path.join(self.temp_dir, 'test_mappings.json')
+        self.temp_app = os.path.join(self.temp_dir, 'test_app.exe')
+        self.other_app = os.path.join(self.temp_dir, 'other_app.exe')
+        for path in (self.temp_app, self.other_app):
+            with open(path, 'w') as f:
+                f.write('test')
+                
+        patcher = mock.patch('key_mapper.keyboard')
+        self.keyboard = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.keyboard.add_hotkey.side_effect = lambda combo, handler, **kwargs: ('hook', combo, handler)
+        
+        self.mapper = KeyMapper(config_file=self.config_file)
+        self.mapper.add_mapping('ctrl+shift+a', self.temp_app)
+        self.mapper.add_mapping('ctrl+shift+b', self.temp_app)
+        self.mapper.start_mapping()
+        self.keyboard.reset_mock()
+        
+    def tearDown(self):
+        """Clean up test fixtures"""
+        for path in (self.config_file, self.temp_app, self.other_app):
+            if os.path.exists(path):
+                os.remove(path)
+        os.rmdir(self.temp_dir)
+        
+    def test_add_registers_only_new_hotkey(self):
+        """Test that adding a mapping registers a single hotkey"""
+        self.mapper.add_mapping('ctrl+shift+c', self.other_app)
+        self.keyboard.add_hotkey.assert_called_once()
+        self.assertEqual(self.keyboard.add_hotkey.call_args[0][0], 'ctrl+shift+c')
+        self.keyboard.remove_hotkey.assert_not_called()
+        
+    def test_replace_removes_before_registering(self):
+        """Test that replacing a mapping drops the old hotkey before adding the new one"""
+        old_hook = self.mapper.active_hooks['ctrl+shift+a']
+        self.mapper.add_mapping('ctrl+shift+a', self.other_app)
+        self.assertEqual([c[0] for c in self.keyboard.method_calls],
+                         ['remove_hotkey', 'add_hotkey'])
+        self.keyboard.remove_hotkey.assert_called_once_with(old_hook)
+        
+    def test_remove_unregisters_only_that_hotkey(self):
+        """Test that removing a mapping unregisters a single hotkey"""
+        hook = self.mapper.active_hooks['ctrl+shift+b']
+        self.mapper.remove_mapping('ctrl+shift+b')
+        self.keyboard.remove_hotkey.assert_called_once_with(hook)
+        self.keyboard.add_hotkey.assert_not_called()
+        self.assertEqual(list(self.mapper.active_hooks), ['ctrl+shift+a'])
+        
+    def test_reload_applies_delta(self):
+        """Test that reloading the config only rebinds changed mappings"""
+        with open(self.config_file, 'w') as f:
+            json.dump({'mappings': {'ctrl+shift+a': self.temp_app,
+                                    'ctrl+shift+c': self.other_app},
+                       'original_mappings': {}}, f)
+        self.assertTrue(self.mapper.reload_mappings())
+        
+        added = [c[0][0] for c in self.keyboard.add_hotkey.call_args_list]
+        self.assertEqual(added, ['ctrl+shift+c'])
+        self.keyboard.remove_hotkey.assert_called_once()
+        self.assertEqual(sorted(self.mapper.active_hooks), ['ctrl+shift+a', 'ctrl+shift+c'])
+
+
+class TestHotkeyRegistry(unittest.TestCase):
+    """Test hotkey replacement against keyboard's own handle bookkeeping"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        fake_keyboard.install()
+        self.addCleanup(fake_keyboard.uninstall)
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_file = os.path.join(self.temp_dir, 'test_mappings.json')
+        self.apps = []
+        for i in range(2):
+            app = os.path.join(self.temp_dir, f'app{i}.exe')
+            with open(app, 'w') as f:
+                f.write('test')
+            self.apps.append(app)
+        self.mapper = KeyMapper(config_file=self.config_file,
+                                executor=LaunchExecutor(workers=0, debounce=0))
+        self.launches = []
+        self.mapper.launch_application = self.launches.append
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.mapper.shutdown()
+        for name in os.listdir(self.temp_dir):
+            os.remove(os.path.join(self.temp_dir, name))
+        os.rmdir(self.temp_dir)
+
+    def press(self, *keys):
+        """Press and release keys through the fake keyboard"""
+        for key in keys:
+            fake_keyboard.feed(KeyEvent(KEY_DOWN, key))
+        for key in reversed(keys):
+            fake_keyboard.feed(KeyEvent(KEY_UP, key))
+
+    def test_replacing_keeps_one_registration(self):
+        """Test that repeated replacements leave exactly the newest hotkey registered"""
+        self.mapper.add_mapping('ctrl+shift+a', self.apps[0])
+        self.mapper.start_mapping()
+        with mock.patch('key_mapper.logger') as logger:
+            for app in (self.apps[1], self.apps[0], self.apps[1]):
+                self.mapper.add_mapping('ctrl+shift+a', app)
+        logger.error.assert_not_called()
+        self.assertEqual(len(fake_keyboard._hotkeys), 3)
+        self.press('ctrl', 'shift', 'a')
+        self.assertEqual(self.launches, [self.apps[1]])
+
+        self.assertTrue(self.mapper.remove_mapping('ctrl+shift+a'))
+        self.assertEqual(fake_keyboard._hotkeys, {})
+        self.press('ctrl', 'shift', 'a')
+        self.assertEqual(self.launches, [self.apps[1]])
+
+
 class TestKeyMapperEdgeCases(unittest.TestCase):
     """Test edge cases for KeyMapper"""
     
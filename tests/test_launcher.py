@@ -0,0 +1,88 @@
+"""
+Unit tests for launch plans
+"""
+
+import unittest
+import os
+import tempfile
+import sys
+from unittest import mock
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from launcher import (LaunchPlanCache, build_plan, execute_plan,
+                      LAUNCHER_EXEC, LAUNCHER_STARTFILE)
+from key_mapper import KeyMapper
+
+
+class TestLaunchPlans(unittest.TestCase):
+    """Test cases for building and caching launch plans"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.temp_app = os.path.join(self.temp_dir, 'test_app.exe')
+        self.shortcut = os.path.join(self.temp_dir, 'test_app.lnk')
+        for path in (self.temp_app, self.shortcut):
+            with open(path, 'w') as f:
+                f.write('test')
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        for name in os.listdir(self.temp_dir):
+            os.remove(os.path.join(self.temp_dir, name))
+        os.rmdir(self.temp_dir)
+
+    def test_exe_plan(self):
+        """Test that executables are launched directly from their folder"""
+        plan = build_plan(self.temp_app)
+        self.assertEqual(plan.launcher, LAUNCHER_EXEC)
+        self.assertEqual(plan.argv, (os.path.abspath(self.temp_app),))
+        self.assertEqual(plan.cwd, self.temp_dir)
+        self.assertIsNone(plan.env)
+
+    def test_shortcut_plan(self):
+        """Test that shortcuts go through the shell association"""
+        self.assertEqual(build_plan(self.shortcut).launcher, LAUNCHER_STARTFILE)
+
+    def test_missing_path(self):
+        """Test that a plan cannot be built for a missing file"""
+        with self.assertRaises(OSError):
+            build_plan(os.path.join(self.temp_dir, 'missing.exe'))
+
+    def test_execute_skips_shell(self):
+        """Test that exec plans start the process without a shell"""
+        plan = build_plan(self.temp_app)
+        with mock.patch('launcher.subprocess.Popen') as popen:
+            execute_plan(plan)
+        popen.assert_called_once_with([plan.path], cwd=plan.cwd, env=None)
+
+    def test_cache_reuses_plan(self):
+        """Test that an unchanged file reuses its cached plan"""
+        cache = LaunchPlanCache()
+        plan = cache.get(self.temp_app)
+        self.assertIs(cache.get(self.temp_app), plan)
+
+    def test_cache_invalidated_by_mtime(self):
+        """Test that touching the file rebuilds its plan"""
+        cache = LaunchPlanCache()
+        plan = cache.get(self.temp_app)
+        os.utime(self.temp_app, ns=(plan.mtime_ns + 10**9, plan.mtime_ns + 10**9))
+        rebuilt = cache.get(self.temp_app)
+        self.assertIsNot(rebuilt, plan)
+        self.assertEqual(rebuilt.mtime_ns, plan.mtime_ns + 10**9)
+
+    def test_mapper_prepares_plans(self):
+        """Test that KeyMapper resolves plans when mappings are added"""
+        mapper = KeyMapper(config_file=os.path.join(self.temp_dir, 'test_mappings.json'))
+        mapper.add_mapping('ctrl+shift+a', self.temp_app)
+        self.assertIn(self.temp_app, mapper.launch_plans)
+
+        with mock.patch('launcher.subprocess.Popen') as popen:
+            mapper.launch_application(self.temp_app)
+        self.assertNotIn('shell', popen.call_args[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Unit tests for lazy imports and startup timing
+"""
+
+import unittest
+import os
+import json
+import subprocess
+import tempfile
+import sys
+from unittest import mock
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import startup
+from lazy import LazyModule, is_loaded
+
+
+class TestLazyModule(unittest.TestCase):
+    """Test cases for LazyModule"""
+
+    def test_import_on_first_use(self):
+        """Test that the module is imported only when an attribute is read"""
+        module = LazyModule('colorsys')
+        self.assertFalse(is_loaded(module))
+        self.assertEqual(module.rgb_to_hsv(0, 0, 0), (0, 0, 0))
+        self.assertTrue(is_loaded(module))
+        self.assertIs(module._load(), sys.modules['colorsys'])
+
+    def test_patching_forwards_to_module(self):
+        """Test that mock.patch through the proxy patches the real module"""
+        module = LazyModule('colorsys')
+        with mock.patch.object(module, 'rgb_to_hsv', return_value='patched'):
+            self.assertEqual(sys.modules['colorsys'].rgb_to_hsv(0, 0, 0), 'patched')
+        self.assertEqual(module.rgb_to_hsv(0, 0, 0), (0, 0, 0))
+
+    def test_missing_module_fails_on_use(self):
+        """Test that a missing module raises when used, not when declared"""
+        module = LazyModule('no_such_module_for_key_mapper')
+        with self.assertRaises(ImportError):
+            module.anything
+
+    def test_mapper_import_is_minimal(self):
+        """Test that importing the mapper does not load the deferred modules"""
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        code = ("import sys, key_mapper; "
+                "sys.exit(any(m in sys.modules for m in ('keyboard', 'subprocess', 'json')))")
+        result = subprocess.run([sys.executable, '-c', code], cwd=root)
+        self.assertEqual(result.returncode, 0)
+
+
+class TestStartupReport(unittest.TestCase):
+    """Test cases for startup milestones"""
+
+    def test_mark_keeps_first_time(self):
+        """Test that only the first occurrence of a milestone is kept"""
+        startup.mark('test_milestone')
+        first = startup.milestones['test_milestone']
+        startup.mark('test_milestone')
+        self.assertEqual(startup.milestones['test_milestone'], first)
+        self.assertGreaterEqual(first, 0)
+
+    def test_write_report(self):
+        """Test that the report is written as JSON"""
+        startup.mark('test_milestone')
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'report.json')
+            self.assertTrue(startup.write_report(path))
+            with open(path) as f:
+                report = json.load(f)
+        self.assertIn('test_milestone', report['milestones'])
+        self.assertGreater(report['modules_loaded'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Unit tests for the mapping list model behind the virtualized view
+"""
+
+import unittest
+import os
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from mapping_list import MappingListModel
+from mapping_table import MappingTable
+
+
+class TestMappingListModel(unittest.TestCase):
+    """Test cases for MappingListModel"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.model = MappingListModel()
+
+    def test_set_keeps_sort_order(self):
+        """Test that inserts land in key order and updates keep their place"""
+        self.assertEqual(self.model.set('ctrl+b', 'b.exe'), 0)
+        self.assertEqual(self.model.set('alt+a', 'a.exe'), 0)
+        self.assertEqual(self.model.set('shift+c', 'c.exe'), 2)
+        self.assertEqual(self.model.set('ctrl+b', 'other.exe'), 1)
+        self.assertEqual(self.model.keys, ['alt+a', 'ctrl+b', 'shift+c'])
+        self.assertEqual(self.model.rows['ctrl+b'], 'other.exe')
+
+    def test_remove(self):
+        """Test removing existing and missing rows"""
+        self.model.set('alt+a', 'a.exe')
+        self.model.set('ctrl+b', 'b.exe')
+        self.assertEqual(self.model.remove('ctrl+b'), 1)
+        self.assertEqual(self.model.remove('ctrl+b'), -1)
+        self.assertEqual(len(self.model), 1)
+        self.assertNotIn('ctrl+b', self.model)
+
+    def test_window(self):
+        """Test that a window returns only the requested slice"""
+        for i in range(100):
+            self.model.set(f'ctrl+f{i:03d}', f'app{i}.exe')
+        rows = self.model.window(10, 3)
+        self.assertEqual(rows, [('ctrl+f010', 'app10.exe'),
+                                ('ctrl+f011', 'app11.exe'),
+                                ('ctrl+f012', 'app12.exe')])
+        self.assertEqual(len(self.model.window(98, 10)), 2)
+
+    def test_sync_small_change(self):
+        """Test incremental sync reports what changed"""
+        self.model.sync({'alt+a': 'a.exe', 'ctrl+b': 'b.exe'})
+        counts = self.model.sync({'alt+a': 'new.exe', 'shift+c': 'c.exe'})
+        self.assertEqual(counts, (1, 1, 1))
+        self.assertEqual(self.model.window(0, 10), [('alt+a', 'new.exe'), ('shift+c', 'c.exe')])
+
+    def test_sync_large_change(self):
+        """Test that a bulk sync rebuilds the same order as sorting"""
+        mappings = {f'ctrl+k{i}': f'app{i}.exe' for i in range(1000)}
+        self.model.sync(mappings)
+        self.assertEqual(self.model.keys, sorted(mappings))
+        del mappings['ctrl+k5']
+        mappings['alt+z'] = 'z.exe'
+        self.model.sync(mappings)
+        self.assertEqual(self.model.keys, sorted(mappings))
+
+    def test_sync_keeps_table_by_reference(self):
+        """Test that a synced table is shared, and copied before a row edit"""
+        table = MappingTable({'alt+a': 'a.exe', 'ctrl+b': 'b.exe'})
+        self.model.sync(table)
+        self.assertIs(self.model.rows, table)
+        self.assertEqual(self.model.sync(table), (0, 0, 0))
+
+        newer = table.updated({'ctrl+b': 'other.exe', 'shift+c': 'c.exe'}, ['alt+a'])
+        self.assertEqual(self.model.sync(newer), (1, 1, 1))
+        self.assertIs(self.model.rows, newer)
+        self.assertEqual(self.model.keys, ['ctrl+b', 'shift+c'])
+
+        self.model.set('alt+d', 'd.exe')
+        self.assertNotIn('alt+d', newer)
+        self.assertEqual(self.model.rows['alt+d'], 'd.exe')
+
+    def test_filter(self):
+        """Test that a filter replaces the visible rows and follows removals"""
+        self.model.sync({'alt+a': 'a.exe', 'ctrl+b': 'b.exe', 'shift+c': 'c.exe'})
+        self.model.set_filter(['shift+c', 'alt+a'])
+        self.assertEqual(self.model.window(0, 10), [('shift+c', 'c.exe'), ('alt+a', 'a.exe')])
+        self.model.remove('shift+c')
+        self.assertEqual(self.model.visible(), ['alt+a'])
+        self.model.set_filter(None)
+        self.assertEqual(self.model.visible(), ['alt+a', 'ctrl+b'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+"""
+Unit tests for slotted mapping records
+"""
+
+import unittest
+import os
+import tempfile
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dispatcher import SyntheticEventSource
+from executor import LaunchExecutor
+from key_mapper import KeyMapper, DISPATCH_HOOK
+from mapping_table import Mapping, MappingTable
+
+
+class TestMappingTable(unittest.TestCase):
+    """Test cases for MappingTable"""
+
+    def test_reads_like_a_dict(self):
+        """Test lookups, iteration and equality against plain dicts"""
+        table = MappingTable({'alt+a': 'a.exe', 'alt+b': 'b.exe'})
+        self.assertEqual(table, {'alt+a': 'a.exe', 'alt+b': 'b.exe'})
+        self.assertEqual(table['alt+a'], 'a.exe')
+        self.assertIsNone(table.get('alt+c'))
+        self.assertEqual(sorted(table), ['alt+a', 'alt+b'])
+        self.assertEqual(table.copy(), {'alt+a': 'a.exe', 'alt+b': 'b.exe'})
+        with self.assertRaises(TypeError):
+            table['alt+c'] = 'c.exe'
+
+    def test_items_and_values_are_views(self):
+        """Test that items() and values() read the records instead of building lists"""
+        table = MappingTable({'alt+a': 'a.exe', 'alt+b': 'b.exe'})
+        self.assertNotIsInstance(table.items(), list)
+        self.assertEqual(list(table.items()), [('alt+a', 'a.exe'), ('alt+b', 'b.exe')])
+        self.assertIn(('alt+b', 'b.exe'), table.items())
+        self.assertEqual(list(table.values()), ['a.exe', 'b.exe'])
+        self.assertEqual(len(table.values()), 2)
+
+    def test_updated_leaves_table_untouched(self):
+        """Test that updated() returns a new table sharing unchanged records"""
+        table = MappingTable({'alt+a': 'a.exe', 'alt+b': 'b.exe'})
+        newer = table.updated({'alt+c': 'c.exe'}, ['alt+b'])
+        self.assertEqual(table, {'alt+a': 'a.exe', 'alt+b': 'b.exe'})
+        self.assertEqual(newer, {'alt+a': 'a.exe', 'alt+c': 'c.exe'})
+        self.assertIs(newer.record('alt+a'), table.record('alt+a'))
+
+    def test_records_have_no_dict(self):
+        """Test that records are slotted"""
+        self.assertFalse(hasattr(Mapping('alt+a', 'a.exe'), '__dict__'))
+
+
+class TestKeyMapperRecords(unittest.TestCase):
+    """Test mapping records through KeyMapper"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_file = os.path.join(self.temp_dir, 'test_mappings.json')
+        self.apps = []
+        for i in range(2):
+            app = os.path.join(self.temp_dir, f'app{i}.exe')
+            with open(app, 'w') as f:
+                f.write('test')
+            self.apps.append(app)
+        self.source = SyntheticEventSource()
+        self.mapper = KeyMapper(config_file=self.config_file, dispatch_mode=DISPATCH_HOOK,
+                                event_source=self.source,
+                                executor=LaunchExecutor(workers=0, debounce=0))
+        self.launched = []
+        self.mapper.launch_application = self.launched.append
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.mapper.shutdown()
+        for name in os.listdir(self.temp_dir):
+            os.remove(os.path.join(self.temp_dir, name))
+        os.rmdir(self.temp_dir)
+
+    def test_trigger_counts_on_record(self):
+        """Test that triggers are counted on the mapping's record"""
+        self.mapper.add_mapping('alt+a', self.apps[0])
+        self.mapper.start_mapping()
+        self.source.tap('alt+a')
+        self.source.tap('alt+a')
+        record = self.mapper.mappings.record('alt+a')
+        self.assertEqual(record.triggers, 2)
+        self.assertIsNotNone(record.last_triggered)
+
+    def test_unchanged_records_survive_apply(self):
+        """Test that re-applying mappings keeps records whose path did not change"""
+        self.mapper.apply_mappings({'alt+a': self.apps[0], 'alt+b': self.apps[0]})
+        kept = self.mapper.mappings.record('alt+a')
+        replaced = self.mapper.mappings.record('alt+b')
+        self.mapper.apply_mappings({'alt+a': self.apps[0], 'alt+b': self.apps[1]})
+        self.assertIs(self.mapper.mappings.record('alt+a'), kept)
+        self.assertIsNot(self.mapper.mappings.record('alt+b'), replaced)
+
+    def test_snapshots_are_not_modified(self):
+        """Test that get_all_mappings returns a snapshot later edits do not touch"""
+        mappings = self.mapper.get_all_mappings()
+        self.mapper.add_mapping('alt+a', self.apps[0])
+        self.assertEqual(mappings, {})
+        self.assertEqual(self.mapper.get_all_mappings(), {'alt+a': self.apps[0]})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+Unit tests for latency metrics
+"""
+
+import unittest
+import os
+import json
+import tempfile
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dispatcher import SyntheticEventSource
+from executor import LaunchExecutor
+from key_mapper import KeyMapper, DISPATCH_HOOK
+from metrics import LatencyMetrics, LatencyRing, MetricsReporter, percentiles, STAGES
+
+
+class TestLatencyRing(unittest.TestCase):
+    """Test cases for LatencyRing and percentiles"""
+
+    def test_ring_keeps_latest_samples(self):
+        """Test that the ring overwrites its oldest samples"""
+        ring = LatencyRing(size=4)
+        for value in range(10):
+            ring.record(float(value))
+        self.assertEqual(len(ring), 4)
+        self.assertEqual(sorted(ring.snapshot()), [6.0, 7.0, 8.0, 9.0])
+
+    def test_percentiles(self):
+        """Test nearest-rank percentiles"""
+        result = percentiles(float(v) for v in range(1, 101))
+        self.assertEqual(result, {'p50': 50.0, 'p95': 95.0, 'p99': 99.0})
+        self.assertEqual(percentiles([]), {'p50': 0.0, 'p95': 0.0, 'p99': 0.0})
+
+
+class TestLatencyMetrics(unittest.TestCase):
+    """Test cases for LatencyMetrics and the mapper integration"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        for name in os.listdir(self.temp_dir):
+            os.remove(os.path.join(self.temp_dir, name))
+        os.rmdir(self.temp_dir)
+
+    def test_record_trigger_stages(self):
+        """Test that each stage is derived from the trigger timestamps"""
+        metrics = LatencyMetrics()
+        metrics.record_trigger('ctrl+a', 1.000, 1.001, 1.004, 1.010)
+        stages = metrics.summary()['ctrl+a']
+        self.assertEqual(set(stages), set(STAGES))
+        self.assertAlmostEqual(stages['match']['p50'], 1.0)
+        self.assertAlmostEqual(stages['dispatch']['p50'], 3.0)
+        self.assertAlmostEqual(stages['spawn']['p50'], 6.0)
+        self.assertAlmostEqual(stages['total']['p99'], 10.0)
+        self.assertEqual(stages['total']['count'], 1)
+
+    def test_mapper_records_triggers(self):
+        """Test that triggering a hotkey records its latency"""
+        temp_app = os.path.join(self.temp_dir, 'test_app.exe')
+        with open(temp_app, 'w') as f:
+            f.write('test')
+        source = SyntheticEventSource()
+        mapper = KeyMapper(config_file=os.path.join(self.temp_dir, 'test_mappings.json'),
+                           dispatch_mode=DISPATCH_HOOK, event_source=source,
+                           executor=LaunchExecutor(workers=0, debounce=0))
+        mapper.launch_application = lambda app_path: None
+        mapper.add_mapping('ctrl+shift+a', temp_app)
+        mapper.start_mapping()
+        for _ in range(3):
+            source.tap('ctrl+shift+a')
+        mapper.stop_mapping()
+
+        stats = mapper.get_latency_stats()
+        self.assertEqual(stats['ctrl+shift+a']['total']['count'], 3)
+
+        mapper.remove_mapping('ctrl+shift+a')
+        self.assertEqual(mapper.get_latency_stats(), {})
+
+    def test_reporter_writes_json(self):
+        """Test that the reporter dumps the summary as JSON"""
+        metrics = LatencyMetrics()
+        metrics.record_trigger('ctrl+a', 0.0, 0.0, 0.0, 0.002)
+        path = os.path.join(self.temp_dir, 'metrics.json')
+        MetricsReporter(metrics, path=path).report()
+        with open(path, 'r') as f:
+            data = json.load(f)
+        self.assertEqual(data['ctrl+a']['total']['count'], 1)
+
+    def test_shutdown_stops_reporter(self):
+        """Test that shutdown stops the mapper's reporter after a final dump"""
+        mapper = KeyMapper(config_file=os.path.join(self.temp_dir, 'test_mappings.json'))
+        mapper.metrics.record_trigger('ctrl+a', 0.0, 0.0, 0.0, 0.002)
+        path = os.path.join(self.temp_dir, 'metrics.json')
+        mapper.start_metrics_reporter(interval=3600, path=path)
+        thread = mapper.metrics_reporter._thread
+        self.assertTrue(thread.is_alive())
+        mapper.shutdown()
+        self.assertFalse(thread.is_alive())
+        self.assertIsNone(mapper.metrics_reporter)
+        with open(path, 'r') as f:
+            self.assertEqual(json.load(f)['ctrl+a']['total']['count'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+Unit tests for cached application path validation
+"""
+
+import unittest
+import os
+import shutil
+import tempfile
+import threading
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from executor import LaunchExecutor
+from key_mapper import KeyMapper
+from pathcheck import PathValidator
+
+
+class TestPathValidator(unittest.TestCase):
+    """Test cases for PathValidator"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.apps_dir = os.path.join(self.temp_dir, 'apps')
+        os.mkdir(self.apps_dir)
+        self.apps = []
+        for i in range(3):
+            app = os.path.join(self.apps_dir, f'app{i}.exe')
+            with open(app, 'w') as f:
+                f.write('test')
+            self.apps.append(app)
+        self.changes = []
+        self.validator = PathValidator(ttl=60, batch_size=1)
+        self.validator.callback = self.changes.append
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_check_caches_positive_results(self):
+        """Test that fresh positive results skip the stat, negative ones do not"""
+        self.assertTrue(self.validator.check(self.apps[0]))
+        self.assertTrue(self.validator.check(self.apps[0]))
+        missing = os.path.join(self.apps_dir, 'missing.exe')
+        self.assertFalse(self.validator.check(missing))
+        self.assertFalse(self.validator.check(missing))
+        self.assertEqual(self.validator.stats['file_stats'], 3)
+
+    def test_unchanged_directory_skips_file_stats(self):
+        """Test that only files in changed directories are stat'ed again"""
+        self.assertEqual(self.validator.revalidate(self.apps), {})
+        self.assertEqual(self.validator.stats['file_stats'], 3)
+        self.validator.revalidate(self.apps)
+        self.assertEqual(self.validator.stats['file_stats'], 3)
+
+        os.remove(self.apps[1])
+        os.utime(self.apps_dir, ns=(0, 0))  # coarse filesystem clocks may not tick
+        self.assertEqual(self.validator.revalidate(self.apps), {self.apps[1]: False})
+        self.assertEqual(self.validator.stats['file_stats'], 6)
+        self.assertEqual(self.validator.broken(), {self.apps[1]})
+        self.assertEqual(self.changes, [{self.apps[1]: False}])
+
+    def test_missing_directory_marks_its_files(self):
+        """Test that an unreachable directory marks every file missing without file stats"""
+        self.validator.revalidate(self.apps)
+        shutil.rmtree(self.apps_dir)
+        self.assertEqual(self.validator.revalidate(self.apps), dict.fromkeys(self.apps, False))
+        self.assertEqual(self.validator.stats['file_stats'], 3)
+
+    def test_first_pass_reports_missing_and_prunes(self):
+        """Test that paths missing on their first check are reported and unmapped paths forgotten"""
+        missing = os.path.join(self.temp_dir, 'gone', 'app.exe')
+        self.assertEqual(self.validator.revalidate([self.apps[0], missing]), {missing: False})
+        self.validator.revalidate([self.apps[0]])
+        self.assertIsNone(self.validator.status(missing))
+        self.assertEqual(self.validator.broken(), set())
+
+
+class TestKeyMapperPathChecks(unittest.TestCase):
+    """Test background path checks through KeyMapper"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_file = os.path.join(self.temp_dir, 'test_mappings.json')
+        self.temp_app = os.path.join(self.temp_dir, 'test_app.exe')
+        with open(self.temp_app, 'w') as f:
+            f.write('test')
+        self.mapper = KeyMapper(config_file=self.config_file,
+                                executor=LaunchExecutor(workers=0))
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.mapper.shutdown()
+        shutil.rmtree(self.temp_dir)
+
+    def test_background_check_reports_missing_app(self):
+        """Test that a removed application is reported by the background thread"""
+        self.mapper.add_mapping('alt+f1', self.temp_app)
+        reported = threading.Event()
+        self.mapper.start_path_checks(callback=lambda changed: reported.set(), interval=0.01)
+        os.remove(self.temp_app)
+        self.assertTrue(reported.wait(5))
+        self.assertEqual(self.mapper.get_broken_paths(), {self.temp_app})
+
+    def test_failed_launch_marks_path(self):
+        """Test that a launch failing on a missing file updates the cache"""
+        self.mapper.add_mapping('alt+f1', self.temp_app)
+        os.remove(self.temp_app)
+        self.mapper.launch_application(self.temp_app)
+        self.assertEqual(self.mapper.get_broken_paths(), {self.temp_app})
+
+
+if __name__ == '__main__':
+    unittest.main()
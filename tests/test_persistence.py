@@ -0,0 +1,228 @@
+"""
+Unit tests for config persistence
+"""
+
+import unittest
+import os
+import json
+import tempfile
+import time
+import threading
+import sys
+from unittest import mock
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from persistence import ConfigCache, DebouncedWriter, atomic_write_json, validate_config
+from key_mapper import KeyMapper
+
+
+class TestAtomicWrite(unittest.TestCase):
+    """Test cases for atomic_write_json"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'config.json')
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        for name in os.listdir(self.temp_dir):
+            os.remove(os.path.join(self.temp_dir, name))
+        os.rmdir(self.temp_dir)
+
+    def test_write_replaces_file(self):
+        """Test that the document is written and no temp file is left"""
+        atomic_write_json(self.path, {'a': 1})
+        atomic_write_json(self.path, {'a': 2})
+        with open(self.path, 'r') as f:
+            self.assertEqual(json.load(f), {'a': 2})
+        self.assertEqual(os.listdir(self.temp_dir), ['config.json'])
+
+    def test_failed_write_keeps_original(self):
+        """Test that a crash mid-write leaves the previous file intact"""
+        atomic_write_json(self.path, {'a': 1})
+        with mock.patch('persistence.os.fsync', side_effect=OSError('disk full')):
+            with self.assertRaises(OSError):
+                atomic_write_json(self.path, {'a': 2})
+        with open(self.path, 'r') as f:
+            self.assertEqual(json.load(f), {'a': 1})
+        self.assertEqual(os.listdir(self.temp_dir), ['config.json'])
+
+
+class TestDebouncedWriter(unittest.TestCase):
+    """Test cases for DebouncedWriter"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.writes = 0
+        self.written = threading.Event()
+
+    def write(self):
+        """Count writes"""
+        self.writes += 1
+        self.written.set()
+        return True
+
+    def test_burst_is_coalesced(self):
+        """Test that a burst of requests produces one background write"""
+        writer = DebouncedWriter(self.write, delay=0.05)
+        for _ in range(1000):
+            writer.schedule()
+        self.assertTrue(self.written.wait(5))
+        writer.close()
+        self.assertEqual(self.writes, 1)
+
+    def test_close_flushes_pending(self):
+        """Test that closing writes state that is still pending"""
+        writer = DebouncedWriter(self.write, delay=60)
+        writer.schedule()
+        self.assertTrue(writer.pending)
+        writer.close()
+        self.assertEqual(self.writes, 1)
+        self.assertFalse(writer.pending)
+
+    def test_flush_waits_for_write_in_progress(self):
+        """Test that flush returns only after a background write has finished"""
+        finished = []
+
+        def slow_write():
+            self.written.set()
+            time.sleep(0.05)
+            finished.append(True)
+            return True
+
+        writer = DebouncedWriter(slow_write, delay=0)
+        writer.schedule()
+        self.assertTrue(self.written.wait(5))
+        self.assertTrue(writer.flush())
+        self.assertEqual(finished, [True])
+        writer.close()
+
+    def test_flush_without_pending_does_nothing(self):
+        """Test that flushing a clean writer does not write"""
+        writer = DebouncedWriter(self.write, delay=60)
+        self.assertTrue(writer.flush())
+        self.assertEqual(self.writes, 0)
+
+
+class TestKeyMapperPersistence(unittest.TestCase):
+    """Test KeyMapper's scheduled saves"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_file = os.path.join(self.temp_dir, 'test_mappings.json')
+        self.temp_app = os.path.join(self.temp_dir, 'test_app.exe')
+        with open(self.temp_app, 'w') as f:
+            f.write('test')
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        for name in os.listdir(self.temp_dir):
+            os.remove(os.path.join(self.temp_dir, name))
+        os.rmdir(self.temp_dir)
+
+    def test_shutdown_flushes_scheduled_save(self):
+        """Test that edits scheduled for saving are written on shutdown"""
+        mapper = KeyMapper(config_file=self.config_file, save_delay=60)
+        for i in range(50):
+            mapper.add_mapping(f'ctrl+shift+f{i}', self.temp_app)
+            mapper.schedule_save()
+        self.assertFalse(os.path.exists(self.config_file))
+
+        mapper.shutdown()
+        self.assertEqual(len(KeyMapper(config_file=self.config_file).mappings), 50)
+
+    def test_save_clears_scheduled_save(self):
+        """Test that an explicit save covers previously scheduled ones"""
+        mapper = KeyMapper(config_file=self.config_file, save_delay=60)
+        mapper.add_mapping('ctrl+shift+a', self.temp_app)
+        mapper.schedule_save()
+        self.assertTrue(mapper.save_mappings())
+        self.assertFalse(mapper.writer.pending)
+        mapper.shutdown()
+
+
+class TestConfigCache(unittest.TestCase):
+    """Test the sidecar config cache"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_file = os.path.join(self.temp_dir, 'test_mappings.json')
+        self.temp_app = os.path.join(self.temp_dir, 'test_app.exe')
+        with open(self.temp_app, 'w') as f:
+            f.write('test')
+        self.write_config({'ctrl+shift+a': self.temp_app})
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        for name in os.listdir(self.temp_dir):
+            os.remove(os.path.join(self.temp_dir, name))
+        os.rmdir(self.temp_dir)
+
+    def write_config(self, mappings):
+        """Write a config file as an external editor would"""
+        with open(self.config_file, 'w') as f:
+            json.dump({'mappings': mappings, 'original_mappings': {}}, f)
+
+    def load(self):
+        """Load a mapper with the cache enabled"""
+        return KeyMapper(config_file=self.config_file, use_cache=True)
+
+    def test_warm_load_skips_parsing(self):
+        """Test that a fresh cache is used instead of parsing the JSON"""
+        self.load()
+        self.assertTrue(os.path.exists(self.config_file + '.cache'))
+        with mock.patch('storage.json.loads', side_effect=AssertionError('parsed')):
+            mapper = self.load()
+        self.assertEqual(mapper.mappings, {'ctrl+shift+a': self.temp_app})
+
+    def test_touched_but_unchanged_file_hits_cache(self):
+        """Test that a new mtime with identical contents still hits the cache"""
+        self.load()
+        stat = os.stat(self.config_file)
+        os.utime(self.config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        with mock.patch('storage.json.loads', side_effect=AssertionError('parsed')):
+            self.assertEqual(len(self.load().mappings), 1)
+
+    def test_external_edit_rebuilds_cache(self):
+        """Test that a changed config file is parsed again"""
+        self.load()
+        self.write_config({'ctrl+shift+b': self.temp_app, 'ctrl+shift+c': self.temp_app})
+        self.assertEqual(sorted(self.load().mappings), ['ctrl+shift+b', 'ctrl+shift+c'])
+        with mock.patch('storage.json.loads', side_effect=AssertionError('parsed')):
+            self.assertEqual(len(self.load().mappings), 2)
+
+    def test_save_refreshes_cache(self):
+        """Test that saving through the mapper keeps the cache fresh"""
+        mapper = self.load()
+        mapper.add_mapping('alt+f1', self.temp_app)
+        mapper.save_mappings()
+        with mock.patch('storage.json.loads', side_effect=AssertionError('parsed')):
+            self.assertIn('alt+f1', self.load().mappings)
+
+    def test_corrupt_cache_is_ignored(self):
+        """Test that an unreadable cache falls back to the JSON file"""
+        self.load()
+        with open(self.config_file + '.cache', 'wb') as f:
+            f.write(b'garbage')
+        self.assertIsNone(ConfigCache(self.config_file).load())
+        self.assertEqual(len(self.load().mappings), 1)
+
+    def test_validate_config_drops_invalid_entries(self):
+        """Test that malformed entries are skipped during validation"""
+        mappings, original = validate_config({
+            'mappings': {'ctrl+a': 'C:/app.exe', 'ctrl+b': 42},
+            'original_mappings': {'ctrl+a': None, 'ctrl+b': ['x']},
+        })
+        self.assertEqual(mappings, {'ctrl+a': 'C:/app.exe'})
+        self.assertEqual(original, {'ctrl+a': None})
+        with self.assertRaises(ValueError):
+            validate_config(['not', 'a', 'dict'])
+
+
+if __name__ == '__main__':
+    unittest.main()
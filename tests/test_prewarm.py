@@ -0,0 +1,181 @@
+"""
+Unit tests for prewarmed launches
+"""
+
+import unittest
+import os
+import json
+import tempfile
+import time
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dispatcher import SyntheticEventSource
+from executor import LaunchExecutor
+from key_mapper import KeyMapper, DISPATCH_HOOK
+from launcher import LAUNCHER_EXEC, LaunchPlan
+from persistence import validate_prewarm
+from prewarm import PrewarmPool, PrewarmSettings
+
+
+class FakeProcess:
+    """Stand-in for a prewarmed Popen"""
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.returncode = None
+
+    def poll(self):
+        """Return the exit code, or None while running"""
+        return self.returncode
+
+    def terminate(self):
+        """Mark the process as stopped"""
+        self.returncode = -15
+
+    def wait(self, timeout=None):
+        """Return the exit code"""
+        return self.returncode
+
+
+class TestPrewarmPool(unittest.TestCase):
+    """Test cases for PrewarmPool, maintained by hand"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.mtime = 1
+        self.spawned = []
+        self.pool = PrewarmPool(self.plan_for, spawn=self.spawn, interval=0)
+
+    def plan_for(self, app_path):
+        """Return a plan whose mtime the test controls"""
+        return LaunchPlan(app_path, (app_path,), '', None, LAUNCHER_EXEC, self.mtime)
+
+    def spawn(self, plan):
+        """Record a fake spawn"""
+        process = FakeProcess(len(self.spawned))
+        self.spawned.append(process)
+        return process
+
+    def test_acquire_hands_out_and_replenishes(self):
+        """Test that a hand-out is a pop and the pool is topped up afterwards"""
+        self.pool.sync({'tool.exe': PrewarmSettings(size=2)})
+        self.assertIsNone(self.pool.acquire('other.exe'))
+        self.pool.maintain()
+        self.assertEqual(self.pool.idle_count('tool.exe'), 2)
+
+        self.assertIs(self.pool.acquire('tool.exe'), self.spawned[0])
+        self.assertEqual(len(self.spawned), 2)
+        self.pool.maintain()
+        self.assertEqual(self.pool.idle_count('tool.exe'), 2)
+        self.assertEqual(self.pool.stats['handed_out'], 1)
+
+    def test_dead_and_stale_instances_are_replaced(self):
+        """Test that exited instances and instances of an old binary are not handed out"""
+        self.pool.sync({'tool.exe': PrewarmSettings(size=1)})
+        self.pool.maintain()
+        self.spawned[0].returncode = 1
+        self.assertIsNone(self.pool.acquire('tool.exe'))
+
+        self.pool.maintain()
+        self.mtime = 2
+        self.pool.maintain()
+        self.assertEqual(self.spawned[1].returncode, -15)
+        self.assertIs(self.pool.acquire('tool.exe'), self.spawned[2])
+
+    def test_idle_timeout_evicts_until_next_use(self):
+        """Test that an unused pool is emptied and warmed again on demand"""
+        self.pool.sync({'tool.exe': PrewarmSettings(size=1, idle_timeout=0.01)})
+        self.pool.maintain()
+        time.sleep(0.03)
+        self.pool.maintain()
+        self.assertEqual(self.pool.idle_count('tool.exe'), 0)
+        self.assertEqual(self.spawned[0].returncode, -15)
+
+        self.assertIsNone(self.pool.acquire('tool.exe'))
+        self.pool.maintain()
+        self.assertEqual(self.pool.idle_count('tool.exe'), 1)
+
+    def test_dropped_pools_are_emptied(self):
+        """Test that pools no longer configured are terminated"""
+        self.pool.sync({'tool.exe': PrewarmSettings(size=1)})
+        self.pool.maintain()
+        self.pool.sync({})
+        self.pool.maintain()
+        self.assertEqual(self.spawned[0].returncode, -15)
+        self.assertIsNone(self.pool.acquire('tool.exe'))
+
+
+class TestKeyMapperPrewarm(unittest.TestCase):
+    """Test prewarmed launches through KeyMapper"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_file = os.path.join(self.temp_dir, 'test_mappings.json')
+        self.temp_app = os.path.join(self.temp_dir, 'tool.exe')
+        with open(self.temp_app, 'w') as f:
+            f.write('test')
+        self.source = SyntheticEventSource()
+        self.mapper = KeyMapper(config_file=self.config_file, dispatch_mode=DISPATCH_HOOK,
+                                event_source=self.source,
+                                executor=LaunchExecutor(workers=0, debounce=0))
+        self.spawned = []
+        self.mapper.prewarm = PrewarmPool(self.mapper.launch_plans.get,
+                                          spawn=self.spawn, interval=0)
+        self.cold = []
+        self.mapper.launch_application = self.cold.append
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.mapper.shutdown()
+        for name in os.listdir(self.temp_dir):
+            os.remove(os.path.join(self.temp_dir, name))
+        os.rmdir(self.temp_dir)
+
+    def spawn(self, plan):
+        """Record a fake spawn"""
+        process = FakeProcess(len(self.spawned))
+        self.spawned.append(process)
+        return process
+
+    def test_trigger_uses_prewarmed_instance(self):
+        """Test that a trigger hands out a warm instance and falls back to a cold start"""
+        self.mapper.add_mapping('alt+t', self.temp_app)
+        self.assertTrue(self.mapper.set_prewarm('alt+t', 1))
+        self.mapper.prewarm.maintain()
+        self.assertEqual(self.spawned, [])  # nothing is warmed while mapping is stopped
+
+        self.mapper.start_mapping()
+        self.mapper.prewarm.maintain()
+        self.source.tap('alt+t')
+        self.assertEqual(self.cold, [])
+        self.assertIs(self.mapper.instances.running(self.temp_app), self.spawned[0])
+        self.source.tap('alt+t')
+        self.assertEqual(self.cold, [self.temp_app])
+
+        self.mapper.stop_mapping()
+        self.mapper.prewarm.maintain()
+        self.assertEqual(self.spawned[0].returncode, None)  # handed out, not ours to stop
+
+    def test_settings_round_trip(self):
+        """Test that prewarm settings are saved and validated on load"""
+        self.mapper.add_mapping('alt+t', self.temp_app)
+        self.assertFalse(self.mapper.set_prewarm('alt+x', 1))
+        self.mapper.set_prewarm('alt+t', 2, idle_timeout=30)
+        self.mapper.save_mappings()
+        with open(self.config_file) as f:
+            self.assertEqual(json.load(f)['prewarm'],
+                             {'alt+t': {'size': 2, 'idle_timeout': 30.0}})
+
+        reloaded = KeyMapper(config_file=self.config_file)
+        self.assertEqual(reloaded.prewarm_settings['alt+t'], PrewarmSettings(2, 30.0))
+        reloaded.shutdown()
+        self.assertEqual(validate_prewarm({'prewarm': {'a': {'size': 0}, 'b': 'x', 'c': {}}}),
+                         {'c': {'size': 1, 'idle_timeout': 600.0}})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+"""
+Unit tests for mapping profiles
+"""
+
+import unittest
+import os
+import json
+import tempfile
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dispatcher import SyntheticEventSource
+from executor import LaunchExecutor
+from key_mapper import KeyMapper, DISPATCH_HOOK
+from profiles import (DEFAULT_PROFILE, Profile, ProfileError, build_profiles, effective_value,
+                      profile_chain, resolve_mappings)
+
+
+class TestProfileResolution(unittest.TestCase):
+    """Test cases for profile inheritance"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.base = {'alt+f1': 'base.exe', 'alt+f2': 'shared.exe'}
+        self.profiles = {
+            'work': Profile('work', DEFAULT_PROFILE, {'alt+f1': 'work.exe', 'alt+f3': 'mail.exe'}),
+            'meeting': Profile('meeting', 'work', {'alt+f2': None}),
+        }
+
+    def test_chain(self):
+        """Test that chains list a profile and its ancestors"""
+        self.assertEqual(profile_chain(self.profiles, 'meeting'), ['meeting', 'work'])
+        self.assertEqual(profile_chain(self.profiles, DEFAULT_PROFILE), [])
+        with self.assertRaises(ProfileError):
+            profile_chain(self.profiles, 'missing')
+
+    def test_resolve_overlays_and_hides(self):
+        """Test that layers override their parents and None hides a binding"""
+        self.assertEqual(resolve_mappings(self.base, self.profiles, 'meeting'),
+                         {'alt+f1': 'work.exe', 'alt+f3': 'mail.exe'})
+        self.assertEqual(effective_value(self.base, self.profiles, 'work', 'alt+f2'), 'shared.exe')
+        self.assertIsNone(effective_value(self.base, self.profiles, 'meeting', 'alt+f2'))
+
+    def test_cycles_are_dropped(self):
+        """Test that profiles in an inheritance cycle are skipped"""
+        profiles = build_profiles({
+            'a': {'inherits': 'b', 'mappings': {}},
+            'b': {'inherits': 'a', 'mappings': {}},
+            'c': {'inherits': DEFAULT_PROFILE, 'mappings': {}},
+        })
+        self.assertEqual(list(profiles), ['c'])
+
+
+class TestKeyMapperProfiles(unittest.TestCase):
+    """Test profiles through KeyMapper in hook mode"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_file = os.path.join(self.temp_dir, 'test_mappings.json')
+        self.apps = {}
+        for name in ('base', 'work', 'mail'):
+            self.apps[name] = os.path.join(self.temp_dir, f'{name}.exe')
+            with open(self.apps[name], 'w') as f:
+                f.write('test')
+        with open(self.config_file, 'w') as f:
+            json.dump({
+                'mappings': {'alt+f1': self.apps['base'], 'alt+f2': self.apps['base']},
+                'original_mappings': {},
+                'profiles': {'work': {'inherits': DEFAULT_PROFILE,
+                                      'mappings': {'alt+f1': self.apps['work'],
+                                                   'ctrl+k, m': self.apps['mail']}}},
+            }, f)
+        self.source = SyntheticEventSource()
+        self.mapper = KeyMapper(config_file=self.config_file, dispatch_mode=DISPATCH_HOOK,
+                                event_source=self.source,
+                                executor=LaunchExecutor(workers=0, debounce=0))
+        self.launched = []
+        self.mapper.launch_application = self.launched.append
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.mapper.shutdown()
+        for name in os.listdir(self.temp_dir):
+            os.remove(os.path.join(self.temp_dir, name))
+        os.rmdir(self.temp_dir)
+
+    def test_switch_swaps_table(self):
+        """Test that switching swaps precompiled tables without touching the hook"""
+        self.mapper.start_mapping()
+        work_table = self.mapper.profile_tables['work']
+        self.assertTrue(self.mapper.switch_profile('work'))
+        self.assertIs(self.mapper.dispatcher.table, work_table)
+        self.assertTrue(self.mapper.dispatcher.is_running)
+
+        self.source.tap('alt+f1')
+        self.source.tap('alt+f2')
+        self.source.tap('ctrl+k, m')
+        self.assertEqual(self.launched, [self.apps['work'], self.apps['base'], self.apps['mail']])
+
+        self.assertTrue(self.mapper.switch_profile(DEFAULT_PROFILE))
+        self.source.tap('alt+f1')
+        self.assertEqual(self.launched[-1], self.apps['base'])
+        self.assertFalse(self.mapper.switch_profile('missing'))
+
+    def test_base_edit_reaches_inactive_profile(self):
+        """Test that a shared binding edited once applies to inheriting profiles"""
+        self.mapper.start_mapping()
+        self.mapper.add_mapping('alt+f5', self.apps['mail'], profile=DEFAULT_PROFILE)
+        self.mapper.switch_profile('work')
+        self.source.tap('alt+f5')
+        self.assertEqual(self.launched, [self.apps['mail']])
+
+    def test_remove_in_profile_hides_inherited(self):
+        """Test that removing an inherited binding hides it only in that profile"""
+        self.mapper.switch_profile('work')
+        self.assertTrue(self.mapper.remove_mapping('alt+f2'))
+        self.assertNotIn('alt+f2', self.mapper.mappings)
+        self.assertIn('alt+f2', self.mapper.base_mappings)
+        self.assertFalse(self.mapper.remove_mapping('alt+f2'))
+
+        # Removing an override also hides what the parent binds, in this profile only
+        self.assertTrue(self.mapper.remove_mapping('alt+f1'))
+        self.assertNotIn('alt+f1', self.mapper.mappings)
+        self.mapper.switch_profile(DEFAULT_PROFILE)
+        self.assertEqual(self.mapper.mappings['alt+f1'], self.apps['base'])
+
+    def test_profiles_round_trip(self):
+        """Test that profiles and the active profile are saved and reloaded"""
+        self.assertTrue(self.mapper.create_profile('meeting', inherits='work'))
+        self.mapper.add_mapping('alt+f9', self.apps['mail'], profile='meeting')
+        self.mapper.switch_profile('meeting')
+        self.mapper.save_mappings()
+
+        reloaded = KeyMapper(config_file=self.config_file)
+        self.assertEqual(reloaded.active_profile, 'meeting')
+        self.assertEqual(reloaded.get_profiles(),
+                         {DEFAULT_PROFILE: None, 'work': DEFAULT_PROFILE, 'meeting': 'work'})
+        self.assertEqual(reloaded.mappings['alt+f1'], self.apps['work'])
+        self.assertEqual(reloaded.mappings['alt+f9'], self.apps['mail'])
+        reloaded.shutdown()
+
+    def test_delete_profile(self):
+        """Test that only unused profiles can be deleted"""
+        self.mapper.create_profile('meeting', inherits='work')
+        self.assertFalse(self.mapper.delete_profile('work'))
+        self.assertFalse(self.mapper.delete_profile(DEFAULT_PROFILE))
+        self.assertTrue(self.mapper.delete_profile('meeting'))
+        self.assertNotIn('meeting', self.mapper.get_profiles())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Unit tests for the mapping search index
+"""
+
+import unittest
+import os
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from search import MappingSearchIndex, trigrams
+
+
+class TestMappingSearchIndex(unittest.TestCase):
+    """Test cases for MappingSearchIndex"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.index = MappingSearchIndex()
+        self.index.sync({
+            'ctrl+shift+n': r'C:\Windows\System32\notepad.exe',
+            'ctrl+shift+c': r'C:\Windows\System32\calc.exe',
+            'alt+f1': r'C:\Tools\note-manager.exe',
+            'alt+n': r'C:\Program Files\Browser\browser.exe',
+        })
+
+    def test_trigrams(self):
+        """Test trigram extraction"""
+        self.assertEqual(trigrams('abcd'), {'abc', 'bcd'})
+        self.assertEqual(trigrams('ab'), set())
+
+    def test_empty_query_returns_everything(self):
+        """Test that an empty query lists all mappings in key order"""
+        self.assertEqual(self.index.search('  '), sorted(self.index.documents))
+
+    def test_prefix_ranks_first(self):
+        """Test that key and application name prefixes rank above substrings"""
+        self.assertEqual(self.index.search('alt'), ['alt+f1', 'alt+n'])
+        results = self.index.search('note')
+        self.assertEqual(set(results), {'ctrl+shift+n', 'alt+f1'})
+        self.assertEqual(self.index.search('calc'), ['ctrl+shift+c'])
+
+    def test_substring_matches_paths(self):
+        """Test matching anywhere in the application path"""
+        self.assertEqual(sorted(self.index.search('system32')), ['ctrl+shift+c', 'ctrl+shift+n'])
+        self.assertEqual(self.index.search('+f'), ['alt+f1'])
+
+    def test_fuzzy_matches_after_exact(self):
+        """Test that near misses are found after exact matches"""
+        self.assertEqual(self.index.search('notepda')[:1], ['ctrl+shift+n'])
+        self.assertEqual(self.index.search('browsr'), ['alt+n'])
+        self.assertEqual(self.index.search('zzzzzz'), [])
+
+    def test_narrowing_query_sees_updates(self):
+        """Test that refining a query still reflects edits made in between"""
+        self.assertEqual(self.index.search('calc'), ['ctrl+shift+c'])
+        self.index.set('alt+c', r'C:\Tools\calculator.exe')
+        self.assertEqual(self.index.search('calcu')[0], 'alt+c')
+        self.index.remove('alt+c')
+        self.assertNotIn('alt+c', self.index.search('calcul'))
+
+    def test_sync_reindexes_changes_only(self):
+        """Test that sync adds, updates and drops mappings"""
+        self.index.sync({'alt+n': r'C:\Tools\calc.exe', 'alt+x': r'C:\x.exe'})
+        self.assertEqual(len(self.index), 2)
+        self.assertEqual(self.index.search('calc'), ['alt+n'])
+        self.assertNotIn('sys', self.index.postings)
+
+    def test_limit(self):
+        """Test limiting the number of results"""
+        self.assertEqual(len(self.index.search('exe', limit=2)), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+"""
+Unit tests for mapping storage backends
+"""
+
+import unittest
+import os
+import json
+import sqlite3
+import tempfile
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from key_mapper import KeyMapper
+from storage import JsonStore, SqliteStore, copy_store, open_store
+
+
+class TestSqliteStore(unittest.TestCase):
+    """Test cases for SqliteStore"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_file = os.path.join(self.temp_dir, 'test_mappings.db')
+        self.apps = []
+        for i in range(2):
+            app = os.path.join(self.temp_dir, f'app{i}.exe')
+            with open(app, 'w') as f:
+                f.write('test')
+            self.apps.append(app)
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        for name in os.listdir(self.temp_dir):
+            os.remove(os.path.join(self.temp_dir, name))
+        os.rmdir(self.temp_dir)
+
+    def create_mapper(self):
+        """Create a mapper on the test database that is shut down after the test"""
+        mapper = KeyMapper(config_file=self.db_file)
+        self.addCleanup(mapper.shutdown)
+        return mapper
+
+    def test_open_store_picks_backend(self):
+        """Test that the config file suffix selects the backend"""
+        self.assertIsInstance(open_store(self.db_file), SqliteStore)
+        self.assertIsInstance(open_store('key_mappings.json'), JsonStore)
+
+    def test_round_trip_in_wal_mode(self):
+        """Test that a mapper's state survives a restart from the database"""
+        mapper = self.create_mapper()
+        self.assertIsNone(mapper.journal)
+        mapper.add_mapping('Alt+A', self.apps[0])
+        mapper.create_profile('work', mappings={'alt+b': self.apps[1], 'alt+a': None})
+        mapper.switch_profile('work')
+        mapper.set_instance_mode('alt+b', 'focus')
+        self.assertTrue(mapper.save_mappings())
+        mapper.shutdown()
+
+        with sqlite3.connect(self.db_file) as conn:
+            self.assertEqual(conn.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+        mapper = self.create_mapper()
+        self.assertEqual(mapper.active_profile, 'work')
+        self.assertEqual(mapper.get_all_mappings(), {'alt+b': self.apps[1]})
+        self.assertEqual(mapper.get_instance_mode('alt+b'), 'focus')
+        mapper.switch_profile('default')
+        self.assertEqual(mapper.get_all_mappings(), {'alt+a': self.apps[0]})
+
+    def test_inactive_profiles_load_on_demand(self):
+        """Test that only the active profile's chain is read at startup"""
+        mapper = self.create_mapper()
+        for name in ('work', 'gaming'):
+            mapper.create_profile(name, mappings={'alt+f1': self.apps[1]})
+        mapper.save_mappings()
+        mapper.shutdown()
+
+        mapper = self.create_mapper()
+        self.assertFalse(mapper.profiles['work'].loaded)
+        self.assertTrue(mapper.switch_profile('work'))
+        self.assertTrue(mapper.profiles['work'].loaded)
+        self.assertFalse(mapper.profiles['gaming'].loaded)
+        self.assertEqual(mapper.get_all_mappings(), {'alt+f1': self.apps[1]})
+        mapper.save_mappings()  # unread profiles are left as stored
+        self.assertEqual(SqliteStore(self.db_file).read_profile('gaming'),
+                         {'alt+f1': self.apps[1]})
+
+    def test_key_checks_do_not_load_profiles(self):
+        """Test that checking whether a key is bound queries unread profiles"""
+        mapper = self.create_mapper()
+        for i in range(5):
+            mapper.create_profile(f'profile{i}', mappings={f'alt+f{i + 1}': self.apps[1]})
+        mapper.save_mappings()
+        mapper.shutdown()
+
+        mapper = self.create_mapper()
+        mapper.add_mapping('alt+a', self.apps[0])
+        mapper.set_instance_mode('alt+a', 'focus')
+        self.assertTrue(mapper.remove_mapping('alt+a'))
+        self.assertEqual(mapper.get_instance_mode('alt+a'), 'multi')
+        self.assertTrue(mapper.set_instance_mode('alt+f3', 'focus'))
+        self.assertFalse(mapper.set_instance_mode('alt+f9', 'focus'))
+        self.assertFalse(any(mapper.profiles[f'profile{i}'].loaded for i in range(5)))
+
+    def test_editors_keep_each_others_changes(self):
+        """Test that two mappers on one database only write the rows they changed"""
+        first = self.create_mapper()
+        second = self.create_mapper()
+        first.add_mapping('alt+a', self.apps[0])
+        first.save_mappings()
+        second.add_mapping('alt+b', self.apps[1])
+        second.save_mappings()
+        self.assertTrue(first.reload_mappings())
+        self.assertEqual(first.get_all_mappings(),
+                         {'alt+a': self.apps[0], 'alt+b': self.apps[1]})
+
+    def test_watcher_sees_other_editors(self):
+        """Test that a commit from another connection changes the signature"""
+        mapper = self.create_mapper()
+        mapper.save_mappings()
+        signature = mapper.store.signature()
+        other = SqliteStore(self.db_file)
+        config = other.read()
+        config['mappings']['alt+c'] = self.apps[0]
+        other.write(config)
+        other.close()
+        self.assertNotEqual(mapper.store.signature(), signature)
+
+    def test_find_and_copy_from_json(self):
+        """Test copying a JSON config into SQLite and querying it by key and path"""
+        json_file = os.path.join(self.temp_dir, 'test_mappings.json')
+        with open(json_file, 'w') as f:
+            json.dump({'mappings': {'alt+a': self.apps[0]}, 'original_mappings': {},
+                       'profiles': {'work': {'inherits': 'default',
+                                             'mappings': {'alt+a': self.apps[1]}}}}, f)
+        store = SqliteStore(self.db_file)
+        self.addCleanup(store.close)
+        copy_store(JsonStore(json_file), store)
+        self.assertEqual(store.find(key_combo='alt+a'),
+                         [('default', 'alt+a', self.apps[0]), ('work', 'alt+a', self.apps[1])])
+        self.assertEqual(store.find(app_path=self.apps[1]), [('work', 'alt+a', self.apps[1])])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+"""
+Unit tests for config file watching
+"""
+
+import unittest
+import os
+import json
+import tempfile
+import threading
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dispatcher import SyntheticEventSource
+from executor import LaunchExecutor
+from key_mapper import KeyMapper, DISPATCH_HOOK
+from watcher import ConfigWatcher
+
+
+class TestConfigWatcher(unittest.TestCase):
+    """Test cases for ConfigWatcher and hot reload"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_file = os.path.join(self.temp_dir, 'test_mappings.json')
+        self.temp_app = os.path.join(self.temp_dir, 'test_app.exe')
+        with open(self.temp_app, 'w') as f:
+            f.write('test')
+        self.write_config({'ctrl+shift+a': self.temp_app})
+
+    def tearDown(self):
+        """Clean up test fixtures"""
+        for name in os.listdir(self.temp_dir):
+            os.remove(os.path.join(self.temp_dir, name))
+        os.rmdir(self.temp_dir)
+
+    def write_config(self, mappings):
+        """Write the config file as an external tool would"""
+        with open(self.config_file, 'w') as f:
+            json.dump({'mappings': mappings, 'original_mappings': {}}, f)
+        # Make the change visible even on filesystems with coarse mtimes
+        stat = os.stat(self.config_file)
+        os.utime(self.config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def test_check_detects_change(self):
+        """Test that a changed file triggers the callback once"""
+        changes = []
+        watcher = ConfigWatcher(self.config_file, lambda: changes.append(1))
+        self.assertFalse(watcher.check())
+        self.write_config({})
+        self.assertTrue(watcher.check())
+        self.assertFalse(watcher.check())
+        self.assertEqual(changes, [1])
+
+    def test_sync_ignores_own_writes(self):
+        """Test that a synced change does not trigger the callback"""
+        changes = []
+        watcher = ConfigWatcher(self.config_file, lambda: changes.append(1))
+        self.write_config({})
+        watcher.sync()
+        self.assertFalse(watcher.check())
+
+    def test_missing_file_is_not_a_reload(self):
+        """Test that a deleted config file does not clear mappings"""
+        changes = []
+        watcher = ConfigWatcher(self.config_file, lambda: changes.append(1))
+        os.remove(self.config_file)
+        self.assertFalse(watcher.check())
+        self.assertEqual(changes, [])
+
+    def test_mapper_hot_reload(self):
+        """Test that an external edit is applied while mapping stays live"""
+        source = SyntheticEventSource()
+        mapper = KeyMapper(config_file=self.config_file, dispatch_mode=DISPATCH_HOOK,
+                           event_source=source,
+                           executor=LaunchExecutor(workers=0, debounce=0))
+        launched = []
+        mapper.launch_application = launched.append
+        mapper.start_mapping()
+        reloaded = threading.Event()
+        mapper.start_watching(callback=reloaded.set, interval=0.01, max_interval=0.05)
+        try:
+            self.write_config({'ctrl+shift+a': self.temp_app, 'alt+f1': self.temp_app})
+            self.assertTrue(reloaded.wait(5))
+            source.tap('alt+f1')
+            source.tap('ctrl+shift+a')
+            self.assertEqual(launched, [self.temp_app, self.temp_app])
+        finally:
+            mapper.shutdown()
+
+    def test_own_save_does_not_reload(self):
+        """Test that saving through the mapper is not treated as an external edit"""
+        mapper = KeyMapper(config_file=self.config_file)
+        mapper.start_watching()
+        try:
+            mapper.add_mapping('alt+f1', self.temp_app)
+            mapper.save_mappings()
+            self.assertFalse(mapper.watcher.check())
+        finally:
+            mapper.shutdown()
+
+    def test_pending_local_edits_win(self):
+        """Test that an external edit does not discard unsaved local edits"""
+        mapper = KeyMapper(config_file=self.config_file, save_delay=60)
+        mapper.add_mapping('alt+f1', self.temp_app)
+        mapper.schedule_save()
+        self.write_config({})
+        mapper._on_config_changed()
+        self.assertIn('alt+f1', mapper.mappings)
+        mapper.shutdown()
+
+    def test_edit_before_scheduled_save_wins(self):
+        """Test that a reload between an edit and its schedule_save keeps the edit"""
+        mapper = KeyMapper(config_file=self.config_file)
+        mapper.add_mapping('alt+f1', self.temp_app)
+        self.write_config({})
+        mapper._on_config_changed()  # the GUI has not called schedule_save yet
+        self.assertIn('alt+f1', mapper.mappings)
+        self.assertTrue(mapper.save_mappings())
+
+        self.write_config({'alt+f2': self.temp_app})
+        mapper._on_config_changed()
+        self.assertEqual(dict(mapper.mappings), {'alt+f2': self.temp_app})
+        mapper.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+"""
+Config watcher - notice changes to the config file made outside Key Mapper
+"""
+
+import os
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # optional dependency
+    FileSystemEventHandler = object
+    Observer = None
+
+logger = logging.getLogger(__name__)
+
+Signature = Optional[tuple]
+
+
+def file_signature(path: Union[str, Path]) -> Signature:
+    """Return (mtime_ns, size, inode) for path, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class _WatchdogHandler(FileSystemEventHandler):
+    """Forwards events in the config file's directory to the watcher"""
+
+    def __init__(self, watcher: 'ConfigWatcher'):
+        super().__init__()
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        paths = {getattr(event, 'src_path', None), getattr(event, 'dest_path', None)}
+        if str(self.watcher.path) in {os.path.abspath(p) for p in paths if p}:
+            self.watcher.wake()
+
+
+class ConfigWatcher:
+    """Calls back when a file's stat signature changes
+
+    The file is polled with exponential backoff: every unchanged poll doubles
+    the interval up to ``max_interval`` and a change resets it. When the
+    optional ``watchdog`` package is installed, filesystem notifications wake
+    the poller immediately, so the backoff only bounds the worst case. A
+    signature function can replace the stat signature, e.g. for databases.
+    """
+
+    def __init__(self, path: Union[str, Path], callback: Callable[[], None],
+                 interval: float = 0.5, max_interval: float = 5.0,
+                 backoff: float = 2.0, use_notifications: bool = True,
+                 signature: Optional[Callable[[], Signature]] = None):
+        self.path = Path(os.path.abspath(path))
+        self.signature_of = signature or (lambda: file_signature(self.path))
+        self.callback = callback
+        self.interval = interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.use_notifications = use_notifications and Observer is not None
+        self.signature = self.signature_of()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._observer = None
+
+    def sync(self):
+        """Accept the file's current state, e.g. after writing it ourselves"""
+        self.signature = self.signature_of()
+
+    def wake(self):
+        """Poll now instead of waiting for the next interval"""
+        self._wake.set()
+
+    def check(self) -> bool:
+        """Poll once; call back and return True if the file changed"""
+        signature = self.signature_of()
+        if signature == self.signature:
+            return False
+        self.signature = signature
+        if signature is None:
+            logger.warning(f"Watched config file disappeared: {self.path}")
+            return False
+        try:
+            self.callback()
+        except Exception as e:
+            logger.error(f"Error handling change to {self.path}: {e}")
+        return True
+
+    def start(self):
+        """Start watching in the background"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+        self._thread.start()
+        if self.use_notifications:
+            try:
+                self._observer = Observer()
+                self._observer.schedule(_WatchdogHandler(self), str(self.path.parent))
+                self._observer.start()
+            except Exception as e:
+                logger.warning(f"File notifications unavailable, polling only: {e}")
+                self._observer = None
+
+    def stop(self):
+        """Stop watching"""
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        if self._thread is not None:
+            self._stop.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        delay = self.interval
+        while not self._stop.is_set():
+            self._wake.wait(delay)
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            if self.check():
+                delay = self.interval
+            else:
+                delay = min(delay * self.backoff, self.max_interval)